@@ -6,6 +6,16 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "micro_routine_db")
 
+# Mongo connection pool (explicit so pool sizing is a deployment decision)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+
 JWT_SECRET = os.getenv("JWT_SECRET", "super_secret_key")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
@@ -34,3 +44,160 @@ JIRA_CLIENT_ID = os.getenv("JIRA_CLIENT_ID")
 JIRA_CLIENT_SECRET = os.getenv("JIRA_CLIENT_SECRET")
 JIRA_BACKEND_CALLBACK = os.getenv("JIRA_BACKEND_CALLBACK", f"{BACKEND_ROOT_URL}/permissions/jira/callback")
 JIRA_SCOPES = "read:jira-user read:jira-work write:jira-work offline_access"
+JIRA_TOKEN_URL = "https://auth.atlassian.com/oauth/token"
+JIRA_RESOURCES_URL = "https://api.atlassian.com/oauth/token/accessible-resources"
+# Refresh the access token this many seconds before Atlassian expires it
+JIRA_TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("JIRA_TOKEN_REFRESH_MARGIN_SECONDS", "60"))
+# Accessible-resources (cloud_id) lookups rarely change, cache them for a day
+JIRA_CLOUD_ID_TTL_SECONDS = int(os.getenv("JIRA_CLOUD_ID_TTL_SECONDS", "86400"))
+
+# AI recommendations (stale-while-revalidate cache)
+AI_RECOMMENDATION_FRESH_SECONDS = int(os.getenv("AI_RECOMMENDATION_FRESH_SECONDS", "300"))
+AI_RECOMMENDATION_STALE_SECONDS = int(os.getenv("AI_RECOMMENDATION_STALE_SECONDS", "1800"))
+
+# Wellness: each component is recomputed only once its own TTL has passed
+WELLNESS_FITNESS_TTL_MINUTES = int(os.getenv("WELLNESS_FITNESS_TTL_MINUTES", "15"))
+WELLNESS_JIRA_TTL_MINUTES = int(os.getenv("WELLNESS_JIRA_TTL_MINUTES", "60"))
+WELLNESS_CALENDAR_TTL_MINUTES = int(os.getenv("WELLNESS_CALENDAR_TTL_MINUTES", "360"))
+
+# Google REST endpoints
+GOOGLE_AUTH_URI = "https://accounts.google.com/o/oauth2/auth"
+GOOGLE_TOKEN_URI = "https://oauth2.googleapis.com/token"
+GOOGLE_CALENDAR_API = "https://www.googleapis.com/calendar/v3"
+GOOGLE_FITNESS_API = "https://www.googleapis.com/fitness/v1/users/me"
+GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS", "60"))
+# OAuth token refreshes hold a lock shared by every worker (refresh tokens rotate):
+# it expires after TOKEN_REFRESH_LOCK_SECONDS; others wait up to TOKEN_REFRESH_WAIT_SECONDS
+TOKEN_REFRESH_LOCK_SECONDS = float(os.getenv("TOKEN_REFRESH_LOCK_SECONDS", "30"))
+TOKEN_REFRESH_WAIT_SECONDS = float(os.getenv("TOKEN_REFRESH_WAIT_SECONDS", "5"))
+
+# Shared async HTTP client used for every upstream provider call
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "1000"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "200"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "15"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+
+# Startup warm-up: upstream hosts to open pooled HTTP connections to
+WARMUP_UPSTREAM_URLS = [
+    url for url in os.getenv(
+        "WARMUP_UPSTREAM_URLS",
+        "https://oauth2.googleapis.com,https://www.googleapis.com,https://api.atlassian.com,https://auth.atlassian.com",
+    ).split(",") if url
+]
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+
+# Push invalidation (Calendar watch channels / Jira dynamic webhooks)
+CALENDAR_WEBHOOK_URL = os.getenv("CALENDAR_WEBHOOK_URL", f"{BACKEND_ROOT_URL}/webhooks/google/calendar")
+JIRA_WEBHOOK_URL = os.getenv("JIRA_WEBHOOK_URL", f"{BACKEND_ROOT_URL}/webhooks/jira")
+CALENDAR_CHANNEL_TTL_SECONDS = int(os.getenv("CALENDAR_CHANNEL_TTL_SECONDS", str(7 * 24 * 3600)))
+SUBSCRIPTION_RENEW_BEFORE_SECONDS = int(os.getenv("SUBSCRIPTION_RENEW_BEFORE_SECONDS", str(24 * 3600)))
+SUBSCRIPTION_RENEW_INTERVAL_SECONDS = int(os.getenv("SUBSCRIPTION_RENEW_INTERVAL_SECONDS", "3600"))
+# Long TTLs apply while a push subscription keeps the cache correct, short ones otherwise
+CALENDAR_EVENTS_TTL_SECONDS = int(os.getenv("CALENDAR_EVENTS_TTL_SECONDS", str(6 * 3600)))
+CALENDAR_EVENTS_POLL_TTL_SECONDS = int(os.getenv("CALENDAR_EVENTS_POLL_TTL_SECONDS", "300"))
+JIRA_TICKETS_TTL_SECONDS = int(os.getenv("JIRA_TICKETS_TTL_SECONDS", str(6 * 3600)))
+JIRA_TICKETS_POLL_TTL_SECONDS = int(os.getenv("JIRA_TICKETS_POLL_TTL_SECONDS", "300"))
+
+# Local Jira issue store: open issues plus those resolved within the window, synced page by page
+JIRA_SYNC_PAGE_SIZE = int(os.getenv("JIRA_SYNC_PAGE_SIZE", "100"))
+JIRA_DONE_WINDOW_DAYS = int(os.getenv("JIRA_DONE_WINDOW_DAYS", "14"))
+JIRA_TICKETS_LIMIT = int(os.getenv("JIRA_TICKETS_LIMIT", "5"))
+
+# Google Fit history (time-series backfill + daily sync)
+FIT_DEFAULT_TIMEZONE = os.getenv("FIT_DEFAULT_TIMEZONE", "Asia/Kolkata")
+FIT_BACKFILL_BATCH_DAYS = int(os.getenv("FIT_BACKFILL_BATCH_DAYS", "90"))
+FIT_BACKFILL_CONCURRENCY = int(os.getenv("FIT_BACKFILL_CONCURRENCY", "4"))
+# Longest range one backfill request may pull; it has to finish within the request deadline
+FIT_BACKFILL_MAX_DAYS = int(os.getenv("FIT_BACKFILL_MAX_DAYS", "366"))
+FIT_SYNC_INTERVAL_SECONDS = int(os.getenv("FIT_SYNC_INTERVAL_SECONDS", str(6 * 3600)))
+FIT_SYNC_USER_CONCURRENCY = int(os.getenv("FIT_SYNC_USER_CONCURRENCY", "20"))
+# Today's Fit totals (dashboard / post-connect warm-up) are reused for this long
+FIT_SNAPSHOT_TTL_SECONDS = int(os.getenv("FIT_SNAPSHOT_TTL_SECONDS", "300"))
+
+# Upstream rate limits (token buckets): whole provider and per user, requests/second
+RATE_LIMITS = {
+    "google": {
+        "rate": float(os.getenv("GOOGLE_RATE_PER_SECOND", "50")),
+        "burst": int(os.getenv("GOOGLE_RATE_BURST", "100")),
+        "user_rate": float(os.getenv("GOOGLE_USER_RATE_PER_SECOND", "5")),
+        "user_burst": int(os.getenv("GOOGLE_USER_RATE_BURST", "10")),
+    },
+    "jira": {
+        "rate": float(os.getenv("JIRA_RATE_PER_SECOND", "10")),
+        "burst": int(os.getenv("JIRA_RATE_BURST", "20")),
+        "user_rate": float(os.getenv("JIRA_USER_RATE_PER_SECOND", "2")),
+        "user_burst": int(os.getenv("JIRA_USER_RATE_BURST", "5")),
+    },
+}
+# Longest a request may queue for a token before it is rejected, by priority class
+RATE_LIMIT_MAX_WAIT_INTERACTIVE_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_INTERACTIVE_SECONDS", "2"))
+RATE_LIMIT_MAX_WAIT_BACKGROUND_SECONDS = float(os.getenv("RATE_LIMIT_MAX_WAIT_BACKGROUND_SECONDS", "30"))
+
+# Time budget for one API request, shared by every upstream call it makes
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "10"))
+# Longest a single upstream call made inside a request may take (kept under the deadline,
+# so a slow provider is counted against its circuit and the request can still fall back)
+UPSTREAM_CALL_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_CALL_TIMEOUT_SECONDS", "4"))
+# Consecutive upstream failures that open a provider's circuit, and how long it stays open
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+
+# Shared cache: "memory" (per-process LRU) or "redis" (shared by every worker)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_PREFIX = os.getenv("CACHE_PREFIX", "micro-routine")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+# With Redis, hot keys are also held in-process for this long; invalidations are broadcast
+CACHE_NEAR_TTL_SECONDS = float(os.getenv("CACHE_NEAR_TTL_SECONDS", "5"))
+CACHE_NEAR_MAX_ENTRIES = int(os.getenv("CACHE_NEAR_MAX_ENTRIES", "1000"))
+# How long expired events/tickets are kept as last-known data for degraded answers
+CACHE_LAST_KNOWN_SECONDS = int(os.getenv("CACHE_LAST_KNOWN_SECONDS", "86400"))
+
+# Admission control: concurrent requests and queue depth per route cost class
+ADMISSION_LIMITS = {
+    # DB-only routes (attendance, auth, permission status)
+    "cheap": {
+        "concurrency": int(os.getenv("ADMISSION_CHEAP_CONCURRENCY", "200")),
+        "queue": int(os.getenv("ADMISSION_CHEAP_QUEUE", "400")),
+    },
+    # One upstream provider (events, Fit, Jira tickets, OAuth callbacks)
+    "upstream": {
+        "concurrency": int(os.getenv("ADMISSION_UPSTREAM_CONCURRENCY", "50")),
+        "queue": int(os.getenv("ADMISSION_UPSTREAM_QUEUE", "100")),
+    },
+    # Several providers per request (wellness, AI recommendations, dashboard)
+    "aggregate": {
+        "concurrency": int(os.getenv("ADMISSION_AGGREGATE_CONCURRENCY", "20")),
+        "queue": int(os.getenv("ADMISSION_AGGREGATE_QUEUE", "40")),
+    },
+}
+# Longest a request waits in its class queue before it is shed
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "2"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "2"))
+
+# Response compression: bodies smaller than this are sent as-is
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Calendar interval index: working window for focus blocks, and the gap that still counts as back-to-back
+WORKDAY_START_HOUR = int(os.getenv("WORKDAY_START_HOUR", "9"))
+WORKDAY_END_HOUR = int(os.getenv("WORKDAY_END_HOUR", "18"))
+BACK_TO_BACK_GAP_MINUTES = int(os.getenv("BACK_TO_BACK_GAP_MINUTES", "5"))
+
+# Admin bulk user import: rows per bulk_write batch, bcrypt threads (bcrypt releases the GIL)
+USER_IMPORT_BATCH_SIZE = int(os.getenv("USER_IMPORT_BATCH_SIZE", "500"))
+USER_IMPORT_HASH_WORKERS = int(os.getenv("USER_IMPORT_HASH_WORKERS", str(os.cpu_count() or 4)))
+USER_IMPORT_MAX_ERRORS = int(os.getenv("USER_IMPORT_MAX_ERRORS", "1000"))
+
+# Opt-in write-behind for wellness/attendance upserts: coalesced per document, flushed by size or interval
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() in ("1", "true", "yes")
+WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "500"))
+WRITE_BEHIND_FLUSH_SECONDS = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "1"))
+
+# On-demand request profiling (admin-only, per request via X-Profile header or ?profile=1)
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_TTL_SECONDS = int(os.getenv("PROFILE_TTL_SECONDS", "3600"))
+
+# Bearer token Prometheus sends to scrape /metrics; unset, the endpoint is closed
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
@@ -1,10 +1,113 @@
-from pymongo import MongoClient
-from app.config import MONGO_URI, DB_NAME
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from pymongo import AsyncMongoClient
+from pymongo.errors import CollectionInvalid, DuplicateKeyError
+from app.config import (
+    MONGO_URI,
+    DB_NAME,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_READ_PREFERENCE,
+)
 
-client = MongoClient(MONGO_URI)
+# Async client: Mongo waits are awaited on the event loop instead of
+# occupying threadpool slots. Connections are opened lazily on first use.
+client = AsyncMongoClient(
+    MONGO_URI,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    readPreference=MONGO_READ_PREFERENCE,
+)
 db = client[DB_NAME]
 
 users_collection = db["users"]
 tokens_collection = db["user_tokens"]
 wellness_collection = db["wellness_scores"]
-attendance_collection = db["attendance_logs"]
\ No newline at end of file
+attendance_collection = db["attendance_logs"]
+calendar_channels_collection = db["calendar_channels"]
+jira_webhooks_collection = db["jira_webhooks"]
+fitness_daily_collection = db["fitness_daily"]
+job_leases_collection = db["job_leases"]
+jira_issues_collection = db["jira_issues"]
+
+
+# Per-day upserts into the fitness_daily time-series collection need this server version
+MIN_SERVER_VERSION = (7, 0)
+
+
+async def ensure_collections():
+    """Create collections that need options up front (time-series)."""
+    info = await client.admin.command("buildInfo")
+    if tuple(info["versionArray"][:2]) < MIN_SERVER_VERSION:
+        logging.error(
+            f"MongoDB {info['version']} is older than {'.'.join(map(str, MIN_SERVER_VERSION))}; "
+            "Google Fit history writes to fitness_daily will fail"
+        )
+    try:
+        await db.create_collection(
+            "fitness_daily",
+            timeseries={"timeField": "day", "metaField": "user_id", "granularity": "hours"},
+        )
+    except CollectionInvalid:
+        pass  # already exists
+
+
+async def ensure_indexes():
+    """Create the indexes the hot-path queries rely on (no-op when they exist)."""
+    await ensure_collections()
+    await users_collection.create_index("email")
+    # Department rescoring and department goal defaults
+    await users_collection.create_index("department_id")
+    await tokens_collection.create_index([("user_id", 1), ("provider", 1)])
+    await wellness_collection.create_index([("user_id", 1), ("date", 1)])
+    # Whole-day batch rescoring
+    await wellness_collection.create_index("date")
+    await attendance_collection.create_index([("employee_id", 1), ("date", 1)])
+    # Serves the "latest record for employee" lookup sorted by _id
+    await attendance_collection.create_index([("employee_id", 1), ("_id", -1)])
+    await calendar_channels_collection.create_index("channel_id")
+    await calendar_channels_collection.create_index([("user_id", 1), ("expiration", 1)])
+    await jira_webhooks_collection.create_index("user_id")
+    await jira_webhooks_collection.create_index("webhook_ids")
+    await jira_webhooks_collection.create_index("expiration")
+    await fitness_daily_collection.create_index([("user_id", 1), ("day", 1)])
+    await jira_issues_collection.create_index([("user_id", 1), ("key", 1)], unique=True)
+    # Serves the open-tickets list ordered by priority
+    await jira_issues_collection.create_index([("user_id", 1), ("state", 1), ("priority_rank", 1)])
+
+
+async def warm_pool(connections: int = MONGO_MIN_POOL_SIZE):
+    """Open `connections` pooled connections up front with concurrent pings."""
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(max(connections, 1))))
+
+
+async def close_database():
+    await client.close()
+
+
+async def try_acquire_lease(name: str, seconds: int) -> bool:
+    """
+    Take a named, time-bounded lease so only one worker runs a periodic job.
+    Returns False while another worker holds an unexpired lease.
+    """
+    now = datetime.utcnow()
+    try:
+        await job_leases_collection.update_one(
+            {"_id": name, "locked_until": {"$lt": now}},
+            {"$set": {"locked_until": now + timedelta(seconds=seconds)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return False
+    return True
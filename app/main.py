@@ -1,31 +1,81 @@
-from fastapi import FastAPI
+from app.utils.startup_report import (
+    FirstRequestTimer,
+    mark_app_ready,
+    startup_report,
+    timed_import,
+)
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import auth_routes, permission_routes
-from app.routes import google_calendar_route
-from app.routes.google_fitness import router as google_fitness_router
-from app.routes import jira_tasks,wellness_router,ai_agent_routes
-from app.routes import attendance_routes
+from app.utils.responses import FastJSONResponse
+from app.utils.admission import AdmissionControl
+from app.utils.auth_utils import require_admin
+from app.utils.compression import CompressionMiddleware
+from app.utils.profiling import RequestProfiler
+from app.routes import health_routes
+from app.services import lifecycle
+from app.services.resilience import RequestBudget
+
+# Routers are imported through timed_import so cold-start cost is reported per router
+ROUTER_MODULES = [
+    "app.routes.auth_routes",
+    "app.routes.permission_routes",
+    "app.routes.google_calendar_route",
+    "app.routes.google_fitness",
+    "app.routes.jira_tasks",
+    "app.routes.wellness_router",
+    "app.routes.ai_agent_routes",
+    "app.routes.attendance_routes",
+    "app.routes.webhook_routes",
+    "app.routes.dashboard_routes",
+    "app.routes.admin_routes",
+]
+routers = {name: timed_import(name).router for name in ROUTER_MODULES}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await lifecycle.startup()
+    yield
+    await lifecycle.shutdown()
+
 
-app = FastAPI(title="Micro Routine AI Agent")
+app = FastAPI(
+    title="Micro Routine AI Agent",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
+)
 
+# Innermost, so a profile covers only the route itself
+app.add_middleware(RequestProfiler)
+# Inside CORS, so shed 503s still get CORS headers
+app.add_middleware(AdmissionControl)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Degraded", "ETag", "X-Profile-Id"],
 )
+app.add_middleware(RequestBudget)
+app.add_middleware(FirstRequestTimer, prefixes={router.prefix: name for name, router in routers.items()})
+app.add_middleware(CompressionMiddleware)
 
-app.include_router(auth_routes.router)
-app.include_router(permission_routes.router)
-app.include_router(google_calendar_route.router)
-app.include_router(google_fitness_router)
-app.include_router(jira_tasks.router)
-app.include_router(wellness_router.router)
-app.include_router(ai_agent_routes.router)
-app.include_router(attendance_routes.router)
+app.include_router(health_routes.router)
+for router in routers.values():
+    app.include_router(router)
 
 
 @app.get("/")
 def root():
     return {"message": "Welcome to Micro Routine AI Agent API 🚀"}
+
+
+@app.get("/startup-report", dependencies=[Depends(require_admin)])
+def get_startup_report():
+    """Import time and first-request latency per router for this process. Admin only."""
+    return startup_report()
+
+
+mark_app_ready()
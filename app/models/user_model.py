@@ -1,6 +1,7 @@
 def user_entity(user) -> dict:
+    """Public user view; ObjectId/datetime values are encoded by FastJSONResponse."""
     return {
-        "id": str(user["_id"]),
+        "id": user["_id"],
         "username": user.get("username"),
         "email": user.get("email"),
 
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from app.schemas.user_schema import BulkGoalUpdate
+from app.services import cache
+from app.services.user_import_service import bulk_update_goals, import_users
+from app.utils.auth_utils import require_admin
+from app.utils.profiling import profile_key
+from app.utils.responses import FastJSONResponse
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+# Content types that select a format when `format` isn't given
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+@router.post("/users/import")
+async def import_users_route(request: Request, format: str = Query(None)):
+    """Stream a CSV (with header) or NDJSON body of users; returns counts and per-row errors."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = format or IMPORT_CONTENT_TYPES.get(content_type, "csv")
+    report = await import_users(request.stream(), fmt)
+    return FastJSONResponse({"message": "User import finished", "data": report})
+
+
+@router.put("/users/goals")
+async def update_goals_route(update: BulkGoalUpdate):
+    """Per-department goal defaults and per-user goals in two batched writes."""
+    result = await bulk_update_goals(update)
+    return FastJSONResponse({"message": "Goals updated successfully", "data": result})
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = Query("json")):
+    """A stored request profile (see `X-Profile-Id`); `format=collapsed` returns flame-graph input only."""
+    profile = await cache.get(profile_key(profile_id))
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+    if format == "collapsed":
+        return PlainTextResponse(profile["collapsed"] + "\n")
+    return FastJSONResponse(profile)
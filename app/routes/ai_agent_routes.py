@@ -1,20 +1,26 @@
-from fastapi import APIRouter, HTTPException, Query
-from app.services.ai_agent_service import generate_recommendations
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
+from app.services.ai_agent_service import get_recommendations
 
 router = APIRouter(prefix="/api/ai", tags=["AI Agent"])
 
 @router.get("/recommendations")
-def get_ai_recommendations(user_id: str = Query(..., description="User ID")):
+async def get_ai_recommendations(
+    background_tasks: BackgroundTasks,
+    user_id: str = Query(..., description="User ID"),
+):
     """
     Generate real-time, intelligent AI recommendations for a user.
     Combines Google Fit + Jira + Calendar + Goal data.
-    Always computes fresh results.
+    Served from a per-user cache; `source` is `cached`, `stale`
+    (recomputing in the background) or `fresh`.
     Example: GET /api/ai/recommendations?user_id=abc123
     """
     try:
-        result = generate_recommendations(user_id)
+        result = await get_recommendations(user_id, background_tasks)
         if "error" in result:
             raise HTTPException(status_code=500, detail=result["error"])
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 import logging
 from app.utils.auth_utils import get_current_user
 from app.utils.serializers import attendance_entity
+from app.utils.responses import FastJSONResponse
 from app.models.attendance_model import (
     CheckinRequest,
     AttendanceResponse,
@@ -16,23 +17,24 @@ router = APIRouter(prefix="/api/attendance", tags=["Attendance"])
 
 
 # ✅ GET TODAY'S ATTENDANCE
+# `response_model` only documents the shape; the route returns FastJSONResponse directly
 @router.get("/today", response_model=AttendanceResponse)
-def fetch_today_attendance(current_user=Depends(get_current_user)):
+async def fetch_today_attendance(current_user=Depends(get_current_user)):
     try:
         employee_id = current_user["employee_id"]
-        record = get_today_attendance(employee_id)
+        record = await get_today_attendance(employee_id)
 
         if not record:
-            return {
+            return FastJSONResponse({
                 "id": None,
                 "employee_id": employee_id,
                 "date": None,
                 "checkin_time": None,
                 "checkout_time": None,
                 "mood": None,
-            }
+            })
 
-        return attendance_entity(record)
+        return FastJSONResponse(attendance_entity(record))
 
     except Exception as e:
         logging.exception("Error getting today's attendance")
@@ -41,14 +43,14 @@ def fetch_today_attendance(current_user=Depends(get_current_user)):
 
 # ✅ CHECK-IN
 @router.post("/checkin")
-def check_in(data: CheckinRequest, current_user=Depends(get_current_user)):
+async def check_in(data: CheckinRequest, current_user=Depends(get_current_user)):
     try:
         employee_id = current_user["employee_id"]
-        record = checkin(employee_id, data.mood)
-        return {
+        record = await checkin(employee_id, data.mood)
+        return FastJSONResponse({
             "message": "Checked in",
             "log": attendance_entity(record)
-        }
+        })
 
     except Exception as e:
         logging.exception("Error during check-in")
@@ -57,18 +59,18 @@ def check_in(data: CheckinRequest, current_user=Depends(get_current_user)):
 
 # ✅ CHECK-OUT
 @router.post("/checkout")
-def check_out(current_user=Depends(get_current_user)):
+async def check_out(current_user=Depends(get_current_user)):
     try:
         employee_id = current_user["employee_id"]
-        record = checkout(employee_id)
+        record = await checkout(employee_id)
 
         if not record:
             raise HTTPException(status_code=404, detail="No check-in found")
 
-        return {
+        return FastJSONResponse({
             "message": "Checked out",
             "log": attendance_entity(record)
-        }
+        })
 
     except HTTPException:
         raise
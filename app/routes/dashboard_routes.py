@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from app.utils.auth_utils import get_current_user
+from app.utils.responses import FastJSONResponse, ndjson_line
+from app.services.dashboard_service import build_dashboard, iter_dashboard
+
+router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
+
+
+@router.get("")
+async def get_dashboard(
+    stream: bool = Query(False, description="Stream sections as NDJSON as they complete"),
+    current_user=Depends(get_current_user),
+):
+    """
+    Fitness, calendar, Jira, attendance, wellness and the top recommendation
+    in one round trip.
+    With `stream=true` every section is sent as its own
+    `{"section": ..., "data": ...}` line as soon as it is ready.
+    """
+    if not stream:
+        return FastJSONResponse(await build_dashboard(current_user))
+
+    async def sections():
+        async for name, payload in iter_dashboard(current_user):
+            yield ndjson_line({"section": name, "data": payload})
+
+    return StreamingResponse(sections(), media_type="application/x-ndjson")
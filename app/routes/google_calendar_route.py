@@ -1,17 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.utils.auth_utils import get_current_user
 from app.services.google_service import get_month_events
+from app.services.resilience import degraded_providers
+from app.utils.responses import conditional_response
 
 router = APIRouter(prefix="/api/google", tags=["Google Calendar"])
 
 @router.get("/events")
-def fetch_google_events(current_user=Depends(get_current_user)):
+async def fetch_google_events(request: Request, current_user=Depends(get_current_user)):
     """
     Fetch current month's Google Calendar events for authenticated user.
+    Served with an ETag; a matching If-None-Match gets an empty 304.
     """
     try:
         user_id = str(current_user["_id"])
-        events = get_month_events(user_id)
-        return {"events": events}
+        events = await get_month_events(user_id)
+        if "google" in degraded_providers():
+            return conditional_response(request, {"events": events, "degraded": True})
+        return conditional_response(request, {"events": events})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
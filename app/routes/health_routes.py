@@ -0,0 +1,38 @@
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.config import METRICS_TOKEN
+from app.services.lifecycle import readiness
+from app.utils import metrics
+from app.utils.responses import FastJSONResponse
+
+router = APIRouter(tags=["Health"])
+
+
+def require_scrape_token(authorization: str = Header(None)):
+    """Metrics carry per-provider and per-user labels, so only the configured scraper may read them."""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=403, detail="Metrics are disabled; set METRICS_TOKEN to enable them")
+    if not secrets.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+
+@router.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+def readyz():
+    """Readiness: green only once warm-up has finished and until shutdown begins."""
+    state = readiness()
+    if not state["ready"]:
+        return FastJSONResponse({"status": "not ready", **state}, status_code=503)
+    return {"status": "ready", **state}
+
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_scrape_token)])
+def get_metrics():
+    """Process metrics in Prometheus text format (rate limiter queues, throttles, ...)."""
+    return metrics.render()
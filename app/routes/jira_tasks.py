@@ -1,8 +1,5 @@
-import requests
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Query, Request
 from fastapi.responses import RedirectResponse 
-from app.services.token_store import get_token
-from datetime import datetime
 
 # Import the functions you need from the service
 from app.services.jira_service import (
@@ -10,19 +7,22 @@ from app.services.jira_service import (
     handle_jira_callback,
     make_frontend_redirect_after_success
 )
+from app.services.dashboard_service import warm_user_after_connect
+from app.utils.responses import conditional_response
 
 router = APIRouter(prefix="/api/jira", tags=["Jira"])
 
 @router.get("/tickets/high-priority")
-def get_high_priority_tickets(user_id: str = Query(...)):
-    return get_high_priority_tickets_for_user(user_id)
+async def get_high_priority_tickets(request: Request, user_id: str = Query(...)):
+    return conditional_response(request, await get_high_priority_tickets_for_user(user_id))
 
 
 @router.get("/callback")
-def jira_oauth_callback(code: str, state: str):
+async def jira_oauth_callback(code: str, state: str, background_tasks: BackgroundTasks):
     try:
         user_id = state
-        handle_jira_callback(code, user_id)
+        await handle_jira_callback(code, user_id)
+        background_tasks.add_task(warm_user_after_connect, user_id, "jira")
         redirect_url = make_frontend_redirect_after_success(
             provider="jira", 
             status="success", 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
 from fastapi.responses import RedirectResponse
 from app.utils.auth_utils import get_current_user
 from app.services.google_service import (
@@ -11,7 +11,9 @@ from app.services.jira_service import (
     handle_jira_callback,
     make_frontend_redirect_after_success as jira_frontend_redirect
 )
+from app.services.dashboard_service import warm_user_after_connect
 from app.database import tokens_collection  # ✅ NEW IMPORT
+from app.utils.projections import TOKEN_PROVIDER
 
 router = APIRouter(prefix="/permissions", tags=["Permissions"])
 
@@ -34,7 +36,7 @@ def jira_connect(current_user=Depends(get_current_user)):
 
 # --- GOOGLE CALLBACK (REDIRECTS TO FRONTEND) ---
 @router.get("/google/callback")
-def google_callback(request: Request):
+async def google_callback(request: Request, background_tasks: BackgroundTasks):
     code = request.query_params.get("code")
     state = request.query_params.get("state")
     error = request.query_params.get("error")
@@ -60,7 +62,7 @@ def google_callback(request: Request):
 
     try:
         print("Attempting to handle_google_callback...") # ✅ DEBUG
-        handle_google_callback(code, state)
+        await handle_google_callback(code, state)
         print("Callback successful, token saved.") # ✅ DEBUG
     except Exception as e:
         # ✅ --- THIS IS THE MOST IMPORTANT PART ---
@@ -73,6 +75,8 @@ def google_callback(request: Request):
             url=google_frontend_redirect("google", status="error", msg=str(e), user_id=state)
         )
 
+    # Runs after the redirect is sent, so the first dashboard view is served warm
+    background_tasks.add_task(warm_user_after_connect, state, "google")
     print("Redirecting to frontend (success)...") # ✅ DEBUG
     return RedirectResponse(
         url=google_frontend_redirect("google", status="success", user_id=state)
@@ -81,7 +85,7 @@ def google_callback(request: Request):
 
 # --- JIRA CALLBACK (REDIRECTS TO FRONTEND) ---
 @router.get("/jira/callback")
-def jira_callback(request: Request):
+async def jira_callback(request: Request, background_tasks: BackgroundTasks):
     code = request.query_params.get("code")
     state = request.query_params.get("state")
     error = request.query_params.get("error")
@@ -97,12 +101,13 @@ def jira_callback(request: Request):
         )
 
     try:
-        handle_jira_callback(code, state)
+        await handle_jira_callback(code, state)
     except Exception as e:
         return RedirectResponse(
             url=jira_frontend_redirect("jira", status="error", msg=str(e), user_id=state)
         )
 
+    background_tasks.add_task(warm_user_after_connect, state, "jira")
     return RedirectResponse(
         url=jira_frontend_redirect("jira", status="success", user_id=state)
     )
@@ -110,21 +115,19 @@ def jira_callback(request: Request):
 
 # --- ✅ NEW: CONNECTION STATUS ENDPOINT ---
 @router.get("/status")
-def get_connection_status(current_user=Depends(get_current_user)):
+async def get_connection_status(current_user=Depends(get_current_user)):
     """
     Returns whether Google and Jira are connected for the current user.
     Looks up tokens in the `tokens_collection`.
     """
     user_id = str(current_user["_id"])
 
-    google_connected = tokens_collection.find_one({
-        "user_id": user_id,
-        "provider": "google"
-    }) is not None
-
-    jira_connected = tokens_collection.find_one({
-        "user_id": user_id,
-        "provider": "jira"
-    }) is not None
+    connected = {
+        doc["provider"]
+        async for doc in tokens_collection.find(
+            {"user_id": user_id, "provider": {"$in": ["google", "jira"]}},
+            TOKEN_PROVIDER,
+        )
+    }
 
-    return {"google": google_connected, "jira": jira_connected}
+    return {"google": "google" in connected, "jira": "jira" in connected}
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException, Request
+from app.services.webhook_service import (
+    handle_calendar_notification,
+    handle_jira_event,
+    verify_jira_signature,
+)
+
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+
+@router.post("/google/calendar")
+async def google_calendar_notification(request: Request):
+    """Receiver for Google Calendar `events.watch` push notifications."""
+    handled = await handle_calendar_notification(
+        channel_id=request.headers.get("X-Goog-Channel-ID"),
+        channel_token=request.headers.get("X-Goog-Channel-Token"),
+        resource_id=request.headers.get("X-Goog-Resource-ID"),
+        resource_state=request.headers.get("X-Goog-Resource-State"),
+    )
+    if not handled:
+        raise HTTPException(status_code=404, detail="Unknown calendar channel")
+    return {"status": "ok"}
+
+
+@router.post("/jira")
+async def jira_issue_webhook(request: Request):
+    """Receiver for Jira dynamic issue webhooks."""
+    if not verify_jira_signature(request.headers.get("Authorization")):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    user_ids = await handle_jira_event(await request.json())
+    return {"status": "ok", "users_updated": len(user_ids)}
@@ -1,32 +1,29 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query, Request
 from app.services.wellness_service import (
     compute_and_store_daily_score,
     compute_overall_wellness_score,
 )
-from bson import ObjectId
+from app.services.batch_scoring import rescore_stored_day
+from app.utils.auth_utils import require_admin
+from app.utils.responses import FastJSONResponse, conditional_response
 
 router = APIRouter(prefix="/api/wellness", tags=["Wellness"])
 
 
-def convert_objectid(obj):
-    """Recursively convert ObjectIds to strings for JSON response."""
-    if isinstance(obj, list):
-        return [convert_objectid(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: convert_objectid(v) for k, v in obj.items()}
-    elif isinstance(obj, ObjectId):
-        return str(obj)
-    else:
-        return obj
-
-
 @router.get("/daily")
-async def get_daily_wellness(user_id: str = Query(...)):
+async def get_daily_wellness(request: Request, user_id: str = Query(...)):
     result = await compute_and_store_daily_score(user_id)
-    return {"message": "Wellness score computed successfully", "data": convert_objectid(result)}
+    return conditional_response(request, {"message": "Wellness score computed successfully", "data": result})
 
 
 @router.get("/overall")
-async def get_overall_wellness(user_id: str = Query(...)):
+async def get_overall_wellness(request: Request, user_id: str = Query(...)):
     result = await compute_overall_wellness_score(user_id)
-    return {"message": "Overall wellness score computed successfully", "data": convert_objectid(result)}
+    return conditional_response(request, {"message": "Overall wellness score computed successfully", "data": result})
+
+
+@router.post("/rescore", dependencies=[Depends(require_admin)])
+async def rescore_wellness(date: str = Query(...), department_id: str = Query(None)):
+    """Rescore a stored day (optionally one department) in one vectorized pass. Admin only."""
+    result = await rescore_stored_day(date, department_id)
+    return FastJSONResponse({"message": "Wellness scores recomputed successfully", "data": result})
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, EmailStr
+from typing import Dict, Optional
+from pydantic import BaseModel, EmailStr, Field
 
 class UserSignup(BaseModel):
     username: str
@@ -8,3 +9,31 @@ class UserSignup(BaseModel):
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
+
+class GoalValues(BaseModel):
+    step_goal: Optional[float] = Field(None, gt=0)
+    calorie_goal: Optional[float] = Field(None, gt=0)
+    active_minute_goal: Optional[float] = Field(None, gt=0)
+
+class UserImportRow(UserSignup, GoalValues):
+    """
+    One row of a bulk import (CSV column / NDJSON key per field).
+
+    `role` is the job title only; admin access (`is_admin`) is not a column and
+    unknown keys are dropped, so an import can never grant it.
+    """
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    employee_id: Optional[str] = None
+    department_id: Optional[str] = None
+    role: Optional[str] = None
+    employment_type: Optional[str] = None
+    location: Optional[str] = None
+    hire_date: Optional[str] = None
+
+class BulkGoalUpdate(BaseModel):
+    # department_id -> goals; applied only where a user has no goal yet unless `overwrite`
+    departments: Dict[str, GoalValues] = {}
+    # user_id -> goals; always applied, after the department defaults
+    users: Dict[str, GoalValues] = {}
+    overwrite: bool = False
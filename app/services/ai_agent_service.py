@@ -1,117 +1,136 @@
+import asyncio
+import logging
+import time
 from datetime import datetime
 from bson import ObjectId
-from fastapi import HTTPException
-from app.database import db, users_collection
+from fastapi import HTTPException, BackgroundTasks
+from app.config import AI_RECOMMENDATION_FRESH_SECONDS, AI_RECOMMENDATION_STALE_SECONDS
+from app.database import users_collection
+from app.services import cache
+from app.services.rate_limiter import background_priority
+from app.utils.projections import USER_GOALS
+from app.utils.timezone_utils import today_utc
+from app.services.scoring import (
+    RECOMMENDATION_GOAL_DEFAULTS,
+    goals_with_defaults,
+    top_recommendation,
+)
+from app.services.calendar_index import empty_day
 from app.services.jira_service import get_high_priority_tickets_for_user
 from app.services.google_service import (
-    get_month_events,
+    get_calendar_day,
     get_daily_steps_from_google,
     get_daily_calories_from_google,
     get_daily_active_minutes_from_google,
 )
 
-def generate_recommendations(user_id: str):
-    """Generate and return only the highest-priority AI recommendation."""
-    if not ObjectId.is_valid(user_id):
-        raise HTTPException(status_code=400, detail="Invalid user_id")
+# Seconds a background revalidation holds its per-user claim
+REVALIDATE_CLAIM_SECONDS = 60
 
-    user = users_collection.find_one({"_id": ObjectId(user_id)}) or {}
 
-    # === Fetch live data ===
-    try:
-        jira_tasks = get_high_priority_tickets_for_user(user_id).get("tickets", [])
-    except Exception:
-        jira_tasks = []
+def _recommendation_key(user_id: str) -> str:
+    # {"computed_at": epoch_seconds, "result": {...}}
+    return cache.cache_key("ai", "recommendation", user_id)
 
-    try:
-        calendar_events = get_month_events(user_id)
-    except Exception:
-        calendar_events = []
 
+async def get_recommendations(user_id: str, background_tasks: BackgroundTasks = None):
+    """
+    Serve the user's recommendation with stale-while-revalidate semantics.
+
+    - younger than the fresh window → served from cache (`source: cached`)
+    - younger than the stale window → served from cache (`source: stale`)
+      while a background task recomputes it
+    - otherwise → computed inline (`source: fresh`)
+    """
+    cached = await cache.get(_recommendation_key(user_id))
+    if cached:
+        result = cached["result"]
+        age = time.time() - cached["computed_at"]
+        if age < AI_RECOMMENDATION_FRESH_SECONDS:
+            return {**result, "source": "cached"}
+        if age < AI_RECOMMENDATION_STALE_SECONDS and background_tasks is not None:
+            # One revalidation per user across all workers
+            if await cache.add(cache.cache_key("ai", "revalidating", user_id), True, REVALIDATE_CLAIM_SECONDS):
+                background_tasks.add_task(_revalidate_recommendations, user_id)
+            return {**result, "source": "stale"}
+
+    return await refresh_recommendations(user_id)
+
+
+async def refresh_recommendations(user_id: str, snapshot: dict = None):
+    """Recompute the recommendation and store it in the cache."""
+    result = await generate_recommendations(user_id, snapshot)
+    await cache.put(
+        _recommendation_key(user_id),
+        {"computed_at": time.time(), "result": result},
+        AI_RECOMMENDATION_STALE_SECONDS,
+    )
+    return result
+
+
+async def _revalidate_recommendations(user_id: str):
+    background_priority()
     try:
-        steps = get_daily_steps_from_google(user_id)
-        calories = get_daily_calories_from_google(user_id)
-        active_min = get_daily_active_minutes_from_google(user_id)
-    except Exception:
-        steps = calories = active_min = 0
-
-    # === User goals ===
-    step_goal = user.get("step_goal", 8000)
-    calorie_goal = user.get("calorie_goal", 2000)
-    active_min_goal = user.get("active_minute_goal", 60)
-
-    recommendations = []
-
-    # === Jira ===
-    high = sum(1 for t in jira_tasks if "High" in t["priority"])
-    med = sum(1 for t in jira_tasks if "Medium" in t["priority"])
-    low = sum(1 for t in jira_tasks if "Low" in t["priority"])
-
-    if high > 0:
-        recommendations.append({
-            "priority": 1,
-            "type": "jira",
-            "message": f"⚡ {high} high-priority task(s) pending — complete them first!"
-        })
-    elif med > 0:
-        recommendations.append({
-            "priority": 2,
-            "type": "jira",
-            "message": f"📋 {med} medium-priority task(s) left — plan before meetings."
-        })
-    elif low > 0:
-        recommendations.append({
-            "priority": 4,
-            "type": "jira",
-            "message": f"🧩 {low} low-priority tasks can wait till you have free time."
-        })
-
-    # === Calendar ===
-    today = datetime.utcnow().date().isoformat()
-    today_meetings = [e for e in calendar_events if e["start"].startswith(today)]
-    meeting_count = len(today_meetings)
-
-    if meeting_count > 6:
-        recommendations.append({
-            "priority": 1,
-            "type": "calendar",
-            "message": "📅 Too many meetings — block 1h for deep work."
-        })
-    elif 3 <= meeting_count <= 6:
-        recommendations.append({
-            "priority": 3,
-            "type": "calendar",
-            "message": "🗓 Balanced meeting day — schedule short recovery breaks."
-        })
-    else:
-        recommendations.append({
-            "priority": 4,
-            "type": "calendar",
-            "message": "🌤 Light meeting day — perfect for deep work."
-        })
+        await refresh_recommendations(user_id)
+    except Exception as e:
+        logging.error(f"Error revalidating recommendations for user {user_id}: {e}")
+    finally:
+        await cache.delete(cache.cache_key("ai", "revalidating", user_id))
+
+
+async def _fetch_live_data(user_id: str) -> dict:
+    """Fetch everything the recommendation looks at, concurrently, in snapshot form."""
+    user, jira_data, calendar, steps, calories, active_min = await asyncio.gather(
+        users_collection.find_one({"_id": ObjectId(user_id)}, USER_GOALS),
+        get_high_priority_tickets_for_user(user_id),
+        get_calendar_day(user_id),
+        get_daily_steps_from_google(user_id),
+        get_daily_calories_from_google(user_id),
+        get_daily_active_minutes_from_google(user_id),
+        return_exceptions=True,
+    )
+
+    snapshot = {"user": None if isinstance(user, Exception) else user}
+    if not isinstance(jira_data, Exception):
+        snapshot["jira"] = jira_data["counts"]
+    if not isinstance(calendar, Exception):
+        snapshot["calendar"] = calendar
+    if not any(isinstance(v, Exception) for v in (steps, calories, active_min)):
+        snapshot["fitness"] = {"steps": steps, "calories": calories, "active_minutes": active_min}
+    return snapshot
+
+
+async def generate_recommendations(user_id: str, snapshot: dict = None):
+    """Generate and return only the highest-priority AI recommendation.
+
+    `snapshot` holds already-fetched data (see `compute_and_store_daily_score`);
+    sources missing from it, or stored as an exception, are treated as empty.
+    """
+    if not ObjectId.is_valid(user_id):
+        raise HTTPException(status_code=400, detail="Invalid user_id")
+
+    # === Fetch live data (concurrently) unless the caller already did ===
+    if snapshot is None:
+        snapshot = await _fetch_live_data(user_id)
+
+    snapshot = {name: value for name, value in snapshot.items() if not isinstance(value, Exception)}
+    user = snapshot.get("user") or {}
+    goals = goals_with_defaults(user, RECOMMENDATION_GOAL_DEFAULTS)
+    counts = snapshot.get("jira") or {"high": 0, "medium": 0, "low": 0}
+
+    # === Calendar (today's interval index) ===
+    calendar = snapshot.get("calendar") or empty_day(today_utc())
 
     # === Fitness ===
-    if steps < 0.7 * step_goal:
-        recommendations.append({
-            "priority": 2,
-            "type": "fitness",
-            "message": f"🚶 Only {steps}/{step_goal} steps — take a 10-min walk."
-        })
-
-    if active_min < 0.7 * active_min_goal:
-        recommendations.append({
-            "priority": 2,
-            "type": "fitness",
-            "message": f"⏱️ Only {active_min}/{active_min_goal} active minutes — move a bit!"
-        })
-
-    # === Sort and select top ===
-    recommendations.sort(key=lambda x: x["priority"])
-    top_rec = recommendations[0] if recommendations else {
-        "priority": 5,
-        "type": "general",
-        "message": "🌿 No major issues — stay consistent today!"
-    }
+    fitness = snapshot.get("fitness") or {"steps": 0, "calories": 0, "active_minutes": 0}
+
+    # === Highest-priority rule ===
+    top_rec = top_recommendation(
+        counts["high"], counts["medium"], counts["low"],
+        calendar["meeting_minutes"], calendar["longest_focus_minutes"], calendar["back_to_back_chains"],
+        fitness["steps"], goals["step_goal"],
+        fitness["active_minutes"], goals["active_minute_goal"],
+    )
 
     # === Return only top priority ===
     return {
@@ -1,8 +1,8 @@
 import logging
-from datetime import datetime
 from app.database import attendance_collection
 from app.utils.timezone_utils import now_ist   # <-- use IST
-from bson import ObjectId
+from app.utils.projections import ATTENDANCE_VIEW, ATTENDANCE_STALE_CHECK
+from app.services.write_behind import attendance_writes
 
 
 def _today_ist():
@@ -10,48 +10,40 @@ def _today_ist():
     return now_ist().strftime("%Y-%m-%d")
 
 
-def get_today_attendance(employee_id: str):
+async def get_today_attendance(employee_id: str):
     """Fetch today's attendance and auto-fix stale previous-day checkins."""
     today = _today_ist()
 
     # Find latest attendance record (could be stale)
-    record = attendance_collection.find_one(
+    record = await attendance_collection.find_one(
         {"employee_id": employee_id},
+        ATTENDANCE_STALE_CHECK,
         sort=[("_id", -1)]
     )
 
-    if not record:
-        return None
-
-    record_date = record.get("date")
-
     # If record is stale AND no checkout → auto-close using checkin_time
-    if record_date != today and record.get("checkout_time") is None:
-        attendance_collection.update_one(
+    if record and record.get("date") != today and record.get("checkout_time") is None:
+        await attendance_collection.update_one(
             {"_id": record["_id"]},
             {"$set": {"checkout_time": record["checkin_time"]}}
         )
         record["checkout_time"] = record["checkin_time"]
 
-    # Now fetch today's valid attendance record
-    today_record = attendance_collection.find_one({
-        "employee_id": employee_id,
-        "date": today
-    })
+    # Now fetch today's valid attendance record (a buffered check-in counts)
+    key = {"employee_id": employee_id, "date": today}
+    today_record = await attendance_collection.find_one(key, ATTENDANCE_VIEW)
 
-    return today_record
+    return attendance_writes.overlay(key, today_record)
 
 
-def checkin(employee_id: str, mood: int):
+async def checkin(employee_id: str, mood: int):
     """Create a check-in entry in IST."""
     try:
         today = _today_ist()
 
         # Prevent double check-ins
-        existing = attendance_collection.find_one({
-            "employee_id": employee_id,
-            "date": today,
-        })
+        key = {"employee_id": employee_id, "date": today}
+        existing = attendance_writes.overlay(key, await attendance_collection.find_one(key, ATTENDANCE_VIEW))
 
         if existing:
             return existing
@@ -64,7 +56,10 @@ def checkin(employee_id: str, mood: int):
             "mood": mood,
         }
 
-        attendance_collection.insert_one(record)
+        # With write-behind on, the id is only assigned once the buffer flushes
+        record_id = await attendance_writes.upsert(key, record)
+        if record_id:
+            record["_id"] = record_id
         return record
 
     except Exception as e:
@@ -72,15 +67,15 @@ def checkin(employee_id: str, mood: int):
         raise
 
 
-def checkout(employee_id: str):
+async def checkout(employee_id: str):
     """Record checkout in IST."""
     try:
         today = _today_ist()
 
-        updated = attendance_collection.find_one_and_update(
+        updated = await attendance_writes.update(
             {"employee_id": employee_id, "date": today},
-            {"$set": {"checkout_time": now_ist()}},  # ⭐ stored in IST
-            return_document=True,
+            {"checkout_time": now_ist()},  # ⭐ stored in IST
+            ATTENDANCE_VIEW,
         )
 
         return updated
@@ -0,0 +1,207 @@
+"""
+Vectorized versions of the rules in `app.services.scoring`.
+
+Each function takes equal-length NumPy columns (one entry per user) and
+returns exactly what the scalar function would return for every row.
+Thousands of users are scored in one pass, e.g. to rescore a whole day or
+department from stored wellness records after a rule or goal change.
+"""
+import logging
+import numpy as np
+from fastapi import HTTPException
+from pymongo import UpdateOne
+from app.database import users_collection, wellness_collection
+from app.utils.projections import USER_GOALS_BY_ID, WELLNESS_INPUTS
+from app.services.write_behind import wellness_writes
+from app.services.scoring import (
+    WEIGHTS,
+    BUSY_MEETING_MINUTES,
+    BALANCED_MEETING_MINUTES,
+    MIN_FOCUS_MINUTES,
+    HEAVY_MEETING_MINUTES,
+    MAX_MEETING_MINUTES,
+    FULL_FOCUS_MINUTES,
+    WELLNESS_GOAL_DEFAULTS,
+    RULES,
+    GENERAL_RECOMMENDATION,
+    goals_with_defaults,
+    render_rule,
+)
+
+_NO_RULE = np.inf
+
+
+def _round(values: np.ndarray) -> np.ndarray:
+    return np.round(values, 2)
+
+
+# ----------------------- COMPONENT SCORES -----------------------
+
+def fitness_scores(steps, calories, active_minutes, step_goal, calorie_goal, active_goal) -> np.ndarray:
+    steps_ratio = np.minimum(np.asarray(steps) / np.asarray(step_goal), 1.0)
+    calories_ratio = np.minimum(np.asarray(calories) / np.asarray(calorie_goal), 1.0)
+    active_ratio = np.minimum(np.asarray(active_minutes) / np.asarray(active_goal), 1.0)
+    return _round((steps_ratio * 0.5 + calories_ratio * 0.3 + active_ratio * 0.2) * 100)
+
+
+def jira_scores(total_tickets, completed_tickets, in_progress_tickets) -> np.ndarray:
+    total = np.asarray(total_tickets, dtype=np.float64)
+    has_tickets = total > 0
+    completion_ratio = np.divide(completed_tickets, total, out=np.zeros_like(total), where=has_tickets)
+    progress_ratio = np.divide(in_progress_tickets, total, out=np.zeros_like(total), where=has_tickets)
+    return np.where(has_tickets, _round((completion_ratio * 0.8 + progress_ratio * 0.2) * 100), 100.0)
+
+
+def calendar_scores(meeting_minutes, longest_focus_minutes, back_to_back_chains, overlapping_meetings) -> np.ndarray:
+    minutes = np.clip(np.asarray(meeting_minutes, dtype=np.float64), HEAVY_MEETING_MINUTES, MAX_MEETING_MINUTES)
+    load = 100 - (minutes - HEAVY_MEETING_MINUTES) * 0.25
+    focus = 40 + 60 * np.minimum(np.asarray(longest_focus_minutes, dtype=np.float64) / FULL_FOCUS_MINUTES, 1.0)
+    penalty = (
+        np.minimum(np.asarray(back_to_back_chains) * 5, 20)
+        + np.minimum(np.asarray(overlapping_meetings) * 2.5, 10)
+    )
+    return _round(np.clip(load * 0.6 + focus * 0.4 - penalty, 0.0, 100.0))
+
+
+def total_scores(fitness, jira, calendar) -> np.ndarray:
+    return _round(
+        np.asarray(fitness) * WEIGHTS["fitness"]
+        + np.asarray(jira) * WEIGHTS["jira"]
+        + np.asarray(calendar) * WEIGHTS["calendar"]
+    )
+
+
+def score_batch(columns: dict) -> dict:
+    """
+    Score every row of `columns` (steps, calories, active_minutes, step_goal,
+    calorie_goal, active_minute_goal, total_tickets, completed_tickets,
+    in_progress_tickets, meeting_minutes, longest_focus_minutes,
+    back_to_back_chains, overlapping_meetings) and return the component and
+    total columns. Rows with `has_calendar_index` False keep `calendar_score`.
+    """
+    fitness = fitness_scores(
+        columns["steps"], columns["calories"], columns["active_minutes"],
+        columns["step_goal"], columns["calorie_goal"], columns["active_minute_goal"],
+    )
+    jira = jira_scores(columns["total_tickets"], columns["completed_tickets"], columns["in_progress_tickets"])
+    calendar = calendar_scores(
+        columns["meeting_minutes"], columns["longest_focus_minutes"],
+        columns["back_to_back_chains"], columns["overlapping_meetings"],
+    )
+    if "has_calendar_index" in columns:
+        calendar = np.where(columns["has_calendar_index"], calendar, columns["calendar_score"])
+    return {"fitness": fitness, "jira": jira, "calendar": calendar, "total": total_scores(fitness, jira, calendar)}
+
+
+# ----------------------- RECOMMENDATION RULES -----------------------
+
+def recommend_batch(columns: dict) -> list:
+    """
+    Top recommendation per row from columns (high, medium, low,
+    meeting_minutes, longest_focus_minutes, back_to_back_chains, steps,
+    step_goal, active_minutes, active_minute_goal). Rules are evaluated
+    as priority columns; the first minimum per row wins, as in the scalar path.
+    """
+    high, medium, low = (np.asarray(columns[k]) for k in ("high", "medium", "low"))
+    minutes, focus = np.asarray(columns["meeting_minutes"]), np.asarray(columns["longest_focus_minutes"])
+    chains = np.asarray(columns["back_to_back_chains"])
+    steps, step_goal = np.asarray(columns["steps"]), np.asarray(columns["step_goal"])
+    active, active_goal = np.asarray(columns["active_minutes"]), np.asarray(columns["active_minute_goal"])
+
+    jira_rule = np.select([high > 0, medium > 0, low > 0], ["jira_high", "jira_medium", "jira_low"], default="")
+    calendar_rule = np.select(
+        [(minutes >= BUSY_MEETING_MINUTES) | (focus < MIN_FOCUS_MINUTES), minutes >= BALANCED_MEETING_MINUTES],
+        ["calendar_busy", "calendar_balanced"],
+        default="calendar_light",
+    )
+    chain_rule = np.where(chains > 0, "calendar_back_to_back", "")
+    steps_rule = np.where(steps < 0.7 * step_goal, "fitness_steps", "")
+    active_rule = np.where(active < 0.7 * active_goal, "fitness_active", "")
+    rule_names = np.stack([jira_rule, calendar_rule, chain_rule, steps_rule, active_rule], axis=1)
+
+    rule_priority = {name: priority for name, (priority, _) in RULES.items()}
+    priorities = np.vectorize(lambda name: rule_priority.get(name, _NO_RULE), otypes=[np.float64])(rule_names)
+    chosen = np.argmin(priorities, axis=1)
+    rows = np.arange(len(chosen))
+    fired = np.isfinite(priorities[rows, chosen])
+    chosen_names = rule_names[rows, chosen]
+
+    # Only the messages are built per row
+    return [
+        render_rule(
+            str(chosen_names[i]),
+            high=int(high[i]), medium=int(medium[i]), low=int(low[i]),
+            meeting_minutes=minutes[i].item(), longest_focus_minutes=focus[i].item(),
+            back_to_back_chains=int(chains[i]),
+            steps=steps[i].item(), step_goal=step_goal[i].item(),
+            active_minutes=active[i].item(), active_minute_goal=active_goal[i].item(),
+        ) if fired[i] else dict(GENERAL_RECOMMENDATION)
+        for i in range(len(chosen))
+    ]
+
+
+# ----------------------- STORED RESCORING -----------------------
+
+def _columns_from_records(records: list, goals_by_user: dict) -> dict:
+    def column(section, field, dtype=np.float64):
+        return np.array([r.get(section, {}).get(field, 0) for r in records], dtype=dtype)
+
+    goals = [goals_by_user[r["user_id"]] for r in records]
+    return {
+        "steps": column("fitness", "steps"),
+        "calories": column("fitness", "calories"),
+        "active_minutes": column("fitness", "active_minutes"),
+        "step_goal": np.array([g["step_goal"] for g in goals], dtype=np.float64),
+        "calorie_goal": np.array([g["calorie_goal"] for g in goals], dtype=np.float64),
+        "active_minute_goal": np.array([g["active_minute_goal"] for g in goals], dtype=np.float64),
+        "total_tickets": column("jira", "total_tickets", np.int64),
+        "completed_tickets": column("jira", "completed_tickets", np.int64),
+        "in_progress_tickets": column("jira", "in_progress_tickets", np.int64),
+        "meeting_minutes": column("calendar", "meeting_minutes"),
+        "longest_focus_minutes": column("calendar", "longest_focus_minutes"),
+        "back_to_back_chains": column("calendar", "back_to_back_chains", np.int64),
+        "overlapping_meetings": column("calendar", "overlapping_meetings", np.int64),
+        # Records stored before the calendar index keep their calendar score
+        "has_calendar_index": np.array(["meeting_minutes" in r.get("calendar", {}) for r in records]),
+        "calendar_score": column("calendar", "score"),
+    }
+
+
+async def rescore_stored_day(day: str, department_id: str = None) -> dict:
+    """
+    Rescore every stored wellness record for `day` (optionally one department)
+    from its stored inputs and the users' current goals, without any upstream call.
+    """
+    try:
+        # Scores still in the write-behind buffer would otherwise overwrite the rescore
+        await wellness_writes.flush()
+        user_filter = {"department_id": department_id} if department_id else {}
+        users = await users_collection.find(user_filter, USER_GOALS_BY_ID).to_list()
+        goals_by_user = {str(u["_id"]): goals_with_defaults(u, WELLNESS_GOAL_DEFAULTS) for u in users}
+
+        record_filter = {"date": day, "fitness": {"$exists": True}, "jira": {"$exists": True}, "calendar": {"$exists": True}}
+        if department_id:
+            record_filter["user_id"] = {"$in": list(goals_by_user)}
+        records = [
+            r for r in await wellness_collection.find(record_filter, WELLNESS_INPUTS).to_list()
+            if r["user_id"] in goals_by_user
+        ]
+        if not records:
+            return {"date": day, "records_rescored": 0}
+
+        scores = score_batch(_columns_from_records(records, goals_by_user))
+        updates = [
+            UpdateOne({"_id": record["_id"]}, {"$set": {
+                "fitness.score": float(scores["fitness"][i]),
+                "jira.score": float(scores["jira"][i]),
+                "calendar.score": float(scores["calendar"][i]),
+                "total_score": float(scores["total"][i]),
+            }})
+            for i, record in enumerate(records)
+        ]
+        await wellness_collection.bulk_write(updates, ordered=False)
+        return {"date": day, "records_rescored": len(updates)}
+
+    except Exception as e:
+        logging.error(f"Error rescoring wellness for {day}: {e}")
+        raise HTTPException(status_code=500, detail=f"Error rescoring wellness: {e}")
@@ -0,0 +1,294 @@
+"""
+Cache shared by the service modules, with a backend chosen by `CACHE_BACKEND`.
+
+- "memory": per-process LRU with TTLs (single worker, development)
+- "redis": entries live in Redis so every worker and pod sees the same data;
+  a short-lived in-process near cache absorbs hot reads and is kept coherent
+  by invalidation messages broadcast over Redis pub/sub
+
+Services only use the module-level helpers below (`cache_key`, `get_entry`,
+`put`, `expire`, `delete`, `add`, `shared_lock`), so switching backends needs no service change.
+Entries carry a soft expiry: past it they are still returned (`fresh=False`)
+until the hard TTL, which lets services serve last-known data.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from contextlib import asynccontextmanager
+import orjson
+from app.config import (
+    CACHE_BACKEND,
+    REDIS_URL,
+    CACHE_PREFIX,
+    CACHE_MAX_ENTRIES,
+    CACHE_NEAR_TTL_SECONDS,
+    CACHE_NEAR_MAX_ENTRIES,
+    CACHE_LAST_KNOWN_SECONDS,
+)
+from app.utils import metrics
+
+CacheEntry = namedtuple("CacheEntry", ["value", "fresh"])
+
+metrics.describe("cache_requests_total", "Cache lookups by namespace and result (hit, stale, miss)")
+
+
+# ----------------------- BACKENDS -----------------------
+
+class MemoryBackend:
+    """Bounded LRU of key -> (expires_at, value); values are stored by reference."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get_local(self, key: str):
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        if item[0] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return item[1]
+
+    def set_local(self, key: str, value, ttl: float):
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete_local(self, key: str):
+        self._entries.pop(key, None)
+
+    async def get(self, key: str):
+        return self.get_local(key)
+
+    async def set(self, key: str, value, ttl: float):
+        self.set_local(key, value, ttl)
+
+    async def add(self, key: str, value, ttl: float) -> bool:
+        if self.get_local(key) is not None:
+            return False
+        self.set_local(key, value, ttl)
+        return True
+
+    async def update(self, key: str, change, ttl: float) -> bool:
+        """Store `change(item)` in place of the current item; False when there is none."""
+        item = self.get_local(key)
+        if item is None:
+            return False
+        self.set_local(key, change(item), ttl)
+        return True
+
+    async def delete(self, key: str):
+        self.delete_local(key)
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        self._entries.clear()
+
+
+class RedisBackend:
+    """Redis-backed entries (orjson-encoded) with a pub/sub-invalidated near cache."""
+
+    def __init__(self, url: str = REDIS_URL, client=None):
+        if client is None:
+            # Optional dependency, only needed when CACHE_BACKEND=redis
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self.client = client
+        self.channel = f"{CACHE_PREFIX}:invalidate"
+        self.origin = uuid.uuid4().hex
+        self.near = MemoryBackend(CACHE_NEAR_MAX_ENTRIES)
+        self._listener = None
+
+    async def _broadcast(self, key: str):
+        await self.client.publish(self.channel, orjson.dumps({"key": key, "origin": self.origin}))
+
+    async def get(self, key: str):
+        value = self.near.get_local(key)
+        if value is not None:
+            return value
+        raw = await self.client.get(key)
+        if raw is None:
+            return None
+        value = orjson.loads(raw)
+        self.near.set_local(key, value, CACHE_NEAR_TTL_SECONDS)
+        return value
+
+    async def set(self, key: str, value, ttl: float):
+        await self.client.set(key, orjson.dumps(value), px=int(ttl * 1000))
+        self.near.set_local(key, value, min(ttl, CACHE_NEAR_TTL_SECONDS))
+        await self._broadcast(key)
+
+    async def add(self, key: str, value, ttl: float) -> bool:
+        return bool(await self.client.set(key, orjson.dumps(value), px=int(ttl * 1000), nx=True))
+
+    async def update(self, key: str, change, ttl: float) -> bool:
+        """
+        Compare-and-set of `change(item)` against the item in Redis (not the near
+        cache): when another worker writes the key in between, WATCH aborts the
+        write and the change is reapplied to its value.
+        """
+        from redis.exceptions import WatchError
+
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    raw = await pipe.get(key)
+                    if raw is None:
+                        return False
+                    item = change(orjson.loads(raw))
+                    pipe.multi()
+                    pipe.set(key, orjson.dumps(item), px=int(ttl * 1000))
+                    await pipe.execute()
+                    break
+                except WatchError:
+                    continue
+        self.near.set_local(key, item, min(ttl, CACHE_NEAR_TTL_SECONDS))
+        await self._broadcast(key)
+        return True
+
+    async def delete(self, key: str):
+        await self.client.delete(key)
+        self.near.delete_local(key)
+        await self._broadcast(key)
+
+    async def _listen(self):
+        """Drop near-cache entries other workers have changed."""
+        while True:
+            try:
+                pubsub = self.client.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    event = orjson.loads(message["data"])
+                    if event["origin"] != self.origin:
+                        self.near.delete_local(event["key"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Until resubscribed, the near cache's short TTL bounds staleness
+                logging.error(f"Cache invalidation listener failed, resubscribing: {e}")
+                await asyncio.sleep(1)
+
+    async def start(self):
+        await self.client.ping()
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self.client.aclose()
+
+
+BACKENDS = {"memory": MemoryBackend, "redis": RedisBackend}
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if CACHE_BACKEND not in BACKENDS:
+            raise RuntimeError(f"Unknown CACHE_BACKEND {CACHE_BACKEND!r}, expected one of {sorted(BACKENDS)}")
+        _backend = BACKENDS[CACHE_BACKEND]()
+    return _backend
+
+
+async def start_cache():
+    await get_backend().start()
+    logging.info(f"Cache backend: {CACHE_BACKEND}")
+
+
+async def close_cache():
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+    _backend = None
+
+
+# ----------------------- HELPERS -----------------------
+
+def cache_key(provider: str, kind: str, user_id: str) -> str:
+    """Namespaced key, e.g. `micro-routine:jira:tickets:<user_id>`."""
+    return f"{CACHE_PREFIX}:{provider}:{kind}:{user_id}"
+
+
+def _namespace(key: str) -> str:
+    return ":".join(key.split(":")[1:3])
+
+
+async def get_entry(key: str):
+    """CacheEntry(value, fresh) or None; stale entries are still returned until their hard TTL."""
+    item = await get_backend().get(key)
+    if item is None:
+        metrics.inc("cache_requests_total", namespace=_namespace(key), result="miss")
+        return None
+    fresh = item["fresh_until"] > time.time()
+    metrics.inc("cache_requests_total", namespace=_namespace(key), result="hit" if fresh else "stale")
+    return CacheEntry(item["value"], fresh)
+
+
+async def get(key: str):
+    """The value if fresh, else None."""
+    entry = await get_entry(key)
+    return entry.value if entry and entry.fresh else None
+
+
+async def put(key: str, value, ttl: float, keep: float = None):
+    """Store `value`, fresh for `ttl` seconds and kept (as stale) for `keep` seconds in total."""
+    item = {"value": value, "fresh_until": time.time() + ttl}
+    await get_backend().set(key, item, max(ttl, keep or 0))
+
+
+async def expire(key: str):
+    """Mark an entry stale but keep it as last-known data (a concurrent `put` is never undone)."""
+    await get_backend().update(key, lambda item: {**item, "fresh_until": 0}, CACHE_LAST_KNOWN_SECONDS)
+
+
+async def replace(key: str, value) -> bool:
+    """Swap an entry's value without changing its freshness; False when nothing is cached."""
+    return await get_backend().update(key, lambda item: {**item, "value": value}, CACHE_LAST_KNOWN_SECONDS)
+
+
+async def delete(key: str):
+    await get_backend().delete(key)
+
+
+async def add(key: str, value, ttl: float) -> bool:
+    """Store only if absent (atomic across workers with Redis); True when stored."""
+    return await get_backend().add(key, {"value": value, "fresh_until": time.time() + ttl}, ttl)
+
+
+@asynccontextmanager
+async def shared_lock(key: str, ttl: float, wait: float):
+    """
+    Lock held across workers with Redis (per process with the memory backend),
+    built on `add`; it expires after `ttl` so a crashed holder can't keep it.
+    Yields True once held, or False when `wait` seconds pass first.
+    """
+    owner = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+    held = await add(key, owner, ttl)
+    while not held and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        held = await add(key, owner, ttl)
+    try:
+        yield held
+    finally:
+        # Past `ttl` the lock may belong to someone else by now
+        if held and (await get_backend().get(key) or {}).get("value") == owner:
+            await delete(key)
@@ -0,0 +1,115 @@
+"""
+Per-day interval index over calendar events.
+
+Timed events of one day become [start, end) minute intervals, sorted once and
+swept to answer meeting load questions in O(n log n): total (merged) meeting
+minutes, the longest free focus block inside the working window, back-to-back
+chains, overlapping meetings and peak concurrency. All-day events are counted
+separately and never treated as meetings.
+
+Minutes are measured from midnight in each event's own UTC offset, which is
+the offset Google returns for the user's calendar.
+"""
+from datetime import datetime
+from app.config import WORKDAY_START_HOUR, WORKDAY_END_HOUR, BACK_TO_BACK_GAP_MINUTES
+
+DAY_MINUTES = 24 * 60
+
+
+def _minute_of_day(value: datetime) -> float:
+    return value.hour * 60 + value.minute + value.second / 60
+
+
+def day_intervals(events: list, day: str) -> tuple:
+    """([(start_minute, end_minute), ...] sorted by start, all-day event count) for `day` (YYYY-MM-DD)."""
+    intervals = []
+    all_day = 0
+    for event in events:
+        start, end = event["start"], event["end"]
+        if "T" not in start:
+            # All-day events span [start, end) in dates
+            if start <= day < end or start == day:
+                all_day += 1
+            continue
+        if not start.startswith(day):
+            continue
+        start_dt = datetime.fromisoformat(start)
+        end_dt = datetime.fromisoformat(end)
+        start_minute = _minute_of_day(start_dt)
+        # Meetings running past midnight are clipped to the day
+        end_minute = _minute_of_day(end_dt) if end_dt.date() == start_dt.date() else DAY_MINUTES
+        if end_minute > start_minute:
+            intervals.append((start_minute, end_minute))
+    intervals.sort()
+    return intervals, all_day
+
+
+def _merge(intervals: list, gap: float = 0) -> list:
+    """Sweep sorted intervals into clusters [start, end, members] joined when they overlap or are `gap` apart."""
+    clusters = []
+    for start, end in intervals:
+        if clusters and start - clusters[-1][1] <= gap and (gap > 0 or start < clusters[-1][1]):
+            cluster = clusters[-1]
+            cluster[1] = max(cluster[1], end)
+            cluster[2] += 1
+        else:
+            clusters.append([start, end, 1])
+    return clusters
+
+
+def _max_concurrent(intervals: list) -> int:
+    """Peak number of simultaneous meetings, from separately sorted start/end arrays."""
+    starts = [start for start, _ in intervals]
+    ends = sorted(end for _, end in intervals)
+    peak = current = j = 0
+    for start in starts:
+        while j < len(ends) and ends[j] <= start:
+            current -= 1
+            j += 1
+        current += 1
+        peak = max(peak, current)
+    return peak
+
+
+def _longest_free_block(merged: list, window_start: float, window_end: float) -> float:
+    longest = 0
+    cursor = window_start
+    for start, end, _ in merged:
+        if end <= window_start:
+            continue
+        if start >= window_end:
+            break
+        longest = max(longest, start - cursor)
+        cursor = max(cursor, end)
+    return max(longest, window_end - cursor, 0)
+
+
+def index_day(events: list, day: str) -> dict:
+    """Meeting-load summary for `day`; the stored/cached form of the interval index."""
+    intervals, all_day = day_intervals(events, day)
+    merged = _merge(intervals)
+    chains = [cluster for cluster in _merge(intervals, gap=BACK_TO_BACK_GAP_MINUTES) if cluster[2] > 1]
+
+    return {
+        "date": day,
+        "meetings": len(intervals),
+        "all_day_events": all_day,
+        "meeting_minutes": round(float(sum(end - start for start, end, _ in merged)), 1),
+        "longest_focus_minutes": round(
+            float(_longest_free_block(merged, WORKDAY_START_HOUR * 60, WORKDAY_END_HOUR * 60)), 1
+        ),
+        "back_to_back_chains": len(chains),
+        "longest_chain": max((cluster[2] for cluster in chains), default=0),
+        "overlapping_meetings": sum(cluster[2] for cluster in merged if cluster[2] > 1),
+        "max_concurrent": _max_concurrent(intervals),
+    }
+
+
+def index_month(events: list, month: str) -> dict:
+    """Summaries for every day of `month` (YYYY-MM) that has events, keyed by date."""
+    days = {event["start"][:10] for event in events if event["start"].startswith(month)}
+    return {day: index_day(events, day) for day in sorted(days)}
+
+
+def empty_day(day: str) -> dict:
+    return index_day([], day)
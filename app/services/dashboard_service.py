@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from bson import ObjectId
+from fastapi import HTTPException
+from app.database import users_collection
+from app.utils import metrics
+from app.utils.projections import USER_GOAL_FIELDS, USER_PROFILE
+from app.utils.serializers import attendance_entity
+from app.services.google_service import (
+    calendar_day,
+    get_daily_fitness_snapshot,
+    get_month_calendar,
+    start_calendar_watch,
+)
+from app.services.jira_service import get_high_priority_tickets_for_user, register_jira_webhook
+from app.services.rate_limiter import background_priority
+from app.services.attendance_service import get_today_attendance
+from app.services.wellness_service import compute_and_store_daily_score
+from app.services.ai_agent_service import refresh_recommendations
+from app.services.resilience import degraded_providers
+
+# Push subscription opened right after a provider is connected
+PUSH_SUBSCRIBERS = {"google": start_calendar_watch, "jira": register_jira_webhook}
+
+metrics.describe("post_connect_warmup_seconds", "Duration of the warm-up job that runs after an OAuth connect")
+
+
+def _section_error(name: str, error: Exception) -> dict:
+    if isinstance(error, HTTPException):
+        return {"error": error.detail, "status_code": error.status_code}
+    logging.error(f"Dashboard section {name} failed: {error}")
+    return {"error": str(error), "status_code": 500}
+
+
+async def _run_section(name: str, fetch):
+    try:
+        return name, await fetch()
+    except Exception as e:
+        return name, e
+
+
+async def iter_dashboard(user: dict):
+    """
+    Yield `(section, payload)` pairs for the user's dashboard as they become ready.
+
+    Each upstream source is fetched exactly once, all of them concurrently; the
+    wellness score and the recommendation are then computed from that same
+    snapshot instead of fetching again. A failing source yields an `error`
+    payload for its section and the rest of the dashboard still renders.
+    """
+    user_id = str(user["_id"])
+    fetchers = {
+        "fitness": lambda: get_daily_fitness_snapshot(user_id),
+        "calendar": lambda: get_month_calendar(user_id),
+        "jira": lambda: get_high_priority_tickets_for_user(user_id),
+        "attendance": lambda: get_today_attendance(user.get("employee_id")),
+    }
+    # The authenticated user document already carries the goals
+    snapshot = {"user": {field: user[field] for field in USER_GOAL_FIELDS if field in user}}
+
+    tasks = [asyncio.create_task(_run_section(name, fetch)) for name, fetch in fetchers.items()]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            name, result = await next_done
+            if isinstance(result, Exception):
+                # Kept in the snapshot so scoring reports it instead of fetching again
+                snapshot[name] = result
+                yield name, _section_error(name, result)
+            elif name == "attendance":
+                yield name, attendance_entity(result)
+            elif name == "jira":
+                snapshot[name] = result["counts"]
+                yield name, result
+            elif name == "calendar":
+                # Scoring reads today's interval index; the section shows the month's events
+                snapshot[name] = calendar_day(result)
+                yield name, result["events"]
+            else:
+                snapshot[name] = result
+                yield name, result
+    finally:
+        # A streaming client may disconnect before every section is sent
+        for task in tasks:
+            task.cancel()
+
+    wellness, recommendation = await asyncio.gather(
+        compute_and_store_daily_score(user_id, snapshot),
+        refresh_recommendations(user_id, snapshot),
+        return_exceptions=True,
+    )
+    yield "wellness", _section_error("wellness", wellness) if isinstance(wellness, Exception) else wellness
+    yield "recommendation", (
+        _section_error("recommendation", recommendation)
+        if isinstance(recommendation, Exception)
+        else recommendation
+    )
+
+    # Providers whose sections came from last-known data
+    degraded = degraded_providers()
+    if degraded:
+        yield "degraded", degraded
+
+
+async def build_dashboard(user: dict) -> dict:
+    """The whole dashboard as one document."""
+    dashboard = {"user_id": str(user["_id"]), "generated_at": datetime.utcnow().isoformat()}
+    async for name, payload in iter_dashboard(user):
+        dashboard[name] = payload
+    return dashboard
+
+
+async def warm_user_after_connect(user_id: str, provider: str):
+    """
+    Background job enqueued by the OAuth callbacks: subscribe to the provider's
+    push notifications, then build the dashboard once so the calendar sync, Fit
+    snapshot, Jira issue store, first wellness score and recommendation are cached
+    before the user's first dashboard view.
+    """
+    background_priority()
+    started = time.perf_counter()
+
+    # Best effort: without a subscription the caches simply fall back to polling
+    try:
+        await PUSH_SUBSCRIBERS[provider](user_id)
+    except Exception as e:
+        logging.warning(f"Could not subscribe to {provider} changes for user {user_id}: {e}")
+
+    try:
+        user = await users_collection.find_one({"_id": ObjectId(user_id)}, USER_PROFILE)
+        if user is None:
+            return
+        dashboard = await build_dashboard(user)
+        # Sections of a provider that isn't connected yet are expected to fail
+        failed = [name for name, section in dashboard.items() if isinstance(section, dict) and "error" in section]
+        logging.info(f"Post-connect warm-up for user {user_id} ({provider}) done; unavailable: {failed or 'none'}")
+    except Exception as e:
+        logging.error(f"Post-connect warm-up failed for user {user_id}: {e}")
+    finally:
+        metrics.observe("post_connect_warmup_seconds", time.perf_counter() - started, provider=provider)
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+import pytz
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import UpdateOne
+from app.config import (
+    FIT_DEFAULT_TIMEZONE,
+    FIT_BACKFILL_BATCH_DAYS,
+    FIT_BACKFILL_CONCURRENCY,
+    FIT_SYNC_INTERVAL_SECONDS,
+    FIT_SYNC_USER_CONCURRENCY,
+)
+from app.database import (
+    fitness_daily_collection,
+    tokens_collection,
+    users_collection,
+    try_acquire_lease,
+)
+from app.services.google_service import get_daily_fitness_buckets
+from app.services.rate_limiter import background_priority
+from app.utils.projections import FITNESS_HISTORY, USER_TIMEZONE
+
+
+async def get_user_timezone(user_id: str) -> str:
+    user = await users_collection.find_one({"_id": ObjectId(user_id)}, USER_TIMEZONE) or {}
+    return user.get("timezone") or FIT_DEFAULT_TIMEZONE
+
+
+def _day_key(day: date) -> datetime:
+    """Time-series timeField for a local calendar day (midnight, naive)."""
+    return datetime(day.year, day.month, day.day)
+
+
+async def _store_days(user_id: str, tz: str, days: list, start: date, end: date):
+    """
+    Upsert one row per fetched day in [start, end]. Days already stored are
+    overwritten in place, so a batch cut short never leaves a gap in history.
+    """
+    synced_at = datetime.utcnow()
+    updates = [
+        UpdateOne(
+            {"user_id": user_id, "day": _day_key(d["day"])},
+            {"$set": {
+                "date": d["day"].isoformat(),
+                "tz": tz,
+                "steps": d["steps"],
+                "calories": d["calories"],
+                "active_minutes": d["active_minutes"],
+                "synced_at": synced_at,
+            }},
+            upsert=True,
+        )
+        for d in days
+        if start <= d["day"] <= end
+    ]
+    if updates:
+        await fitness_daily_collection.bulk_write(updates, ordered=False)
+
+
+async def backfill_fitness_history(user_id: str, start: date, end: date) -> int:
+    """
+    Pull daily steps/calories/active minutes for [start, end] (local days) in
+    batches of FIT_BACKFILL_BATCH_DAYS and store them. Returns days stored.
+    `end` is clamped to the user's today; a `start` after it is rejected.
+    """
+    if end < start:
+        raise HTTPException(status_code=422, detail="end must not be before start")
+
+    tz = await get_user_timezone(user_id)
+    zone = pytz.timezone(tz)
+    now = datetime.now(zone)
+    if start > now.date():
+        raise HTTPException(status_code=422, detail="start must not be in the future")
+    end = min(end, now.date())
+
+    batches = []
+    batch_start = start
+    while batch_start <= end:
+        batch_end = min(batch_start + timedelta(days=FIT_BACKFILL_BATCH_DAYS - 1), end)
+        batches.append((batch_start, batch_end))
+        batch_start = batch_end + timedelta(days=1)
+
+    semaphore = asyncio.Semaphore(FIT_BACKFILL_CONCURRENCY)
+
+    async def run(batch: tuple) -> int:
+        first, last = batch
+        async with semaphore:
+            range_start = zone.localize(datetime(first.year, first.month, first.day))
+            range_end = min(
+                zone.localize(datetime(last.year, last.month, last.day)) + timedelta(days=1),
+                now,
+            )
+            if range_start >= range_end:
+                return 0  # nothing has happened yet in this batch
+            days = await get_daily_fitness_buckets(user_id, range_start, range_end, tz)
+            await _store_days(user_id, tz, days, first, last)
+            return len(days)
+
+    stored = await asyncio.gather(*(run(batch) for batch in batches))
+    return sum(stored)
+
+
+async def get_fitness_history(user_id: str, start: date, end: date) -> list:
+    """Stored daily fitness rows for [start, end]; never calls Google Fit."""
+    cursor = fitness_daily_collection.find(
+        {"user_id": user_id, "day": {"$gte": _day_key(start), "$lte": _day_key(end)}},
+        FITNESS_HISTORY,
+    ).sort("day", 1)
+    return await cursor.to_list()
+
+
+async def sync_recent_fitness(user_id: str, days: int = 2) -> int:
+    """Re-sync the last `days` local days (yesterday gets its final totals)."""
+    tz = await get_user_timezone(user_id)
+    today = datetime.now(pytz.timezone(tz)).date()
+    return await backfill_fitness_history(user_id, today - timedelta(days=days - 1), today)
+
+
+async def sync_all_users():
+    """Daily sync for every user with a Google connection."""
+    semaphore = asyncio.Semaphore(FIT_SYNC_USER_CONCURRENCY)
+
+    async def sync(user_id: str):
+        async with semaphore:
+            try:
+                await sync_recent_fitness(user_id)
+            except Exception as e:
+                logging.error(f"Error syncing Google Fit history for user {user_id}: {e}")
+
+    user_ids = await tokens_collection.distinct("user_id", {"provider": "google"})
+    await asyncio.gather(*(sync(user_id) for user_id in user_ids))
+    return len(user_ids)
+
+
+async def fitness_sync_loop():
+    """Background task: one worker per interval runs the daily sync."""
+    background_priority()
+    while True:
+        try:
+            if await try_acquire_lease("fitness_daily_sync", FIT_SYNC_INTERVAL_SECONDS):
+                synced = await sync_all_users()
+                logging.info(f"Google Fit history synced for {synced} user(s)")
+        except Exception as e:
+            logging.error(f"Error running Google Fit history sync: {e}")
+        await asyncio.sleep(FIT_SYNC_INTERVAL_SECONDS)
@@ -1,75 +1,92 @@
-import warnings
+import asyncio
+import secrets
+import uuid
 from datetime import datetime, timedelta
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
+from urllib.parse import urlencode, quote
+from weakref import WeakValueDictionary
 import logging
 import pytz
 from fastapi import HTTPException
 from bson import ObjectId
 
-from app.database import users_collection
+from app.database import users_collection, calendar_channels_collection
 
 from app.config import (
     GOOGLE_CLIENT_ID,
     GOOGLE_CLIENT_SECRET,
     GOOGLE_BACKEND_CALLBACK,
     GOOGLE_SCOPES,
+    GOOGLE_AUTH_URI,
+    GOOGLE_TOKEN_URI,
+    GOOGLE_CALENDAR_API,
+    GOOGLE_FITNESS_API,
+    GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS,
     FRONTEND_ROOT_URL,
+    CALENDAR_WEBHOOK_URL,
+    CALENDAR_CHANNEL_TTL_SECONDS,
+    CALENDAR_EVENTS_TTL_SECONDS,
+    CALENDAR_EVENTS_POLL_TTL_SECONDS,
+    CACHE_LAST_KNOWN_SECONDS,
+    FIT_SNAPSHOT_TTL_SECONDS,
 )
+from app.services import cache
+from app.services.calendar_index import index_day, index_month
+from app.services.http_client import upstream_request
+from app.services.resilience import UpstreamUnavailable, mark_degraded
 from app.services.token_store import save_token, get_token
+from app.utils.projections import ID_ONLY
+from app.utils.timezone_utils import today_utc
 
-
-def _make_client_config():
-    """Google OAuth client config."""
-    return {
-        "web": {
-            "client_id": GOOGLE_CLIENT_ID,
-            "client_secret": GOOGLE_CLIENT_SECRET,
-            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
-            "redirect_uris": [GOOGLE_BACKEND_CALLBACK],
-        }
-    }
-
+# One lock per user (dropped once unused) so concurrent callers share a single refresh
+# round trip; Google keeps the refresh token, so workers needn't coordinate
+_refresh_locks = WeakValueDictionary()
 
 def get_google_auth_url_for_user(user_id: str) -> str:
     """Generate Google OAuth URL for frontend; state=user_id."""
-    flow = Flow.from_client_config(_make_client_config(), scopes=sorted(GOOGLE_SCOPES))
-    flow.redirect_uri = GOOGLE_BACKEND_CALLBACK
-
-    auth_url, _ = flow.authorization_url(
-        access_type="offline",
-        include_granted_scopes="true",
-        prompt="consent",
-        state=user_id,
-    )
-    return auth_url
+    params = {
+        "response_type": "code",
+        "client_id": GOOGLE_CLIENT_ID,
+        "redirect_uri": GOOGLE_BACKEND_CALLBACK,
+        "scope": " ".join(sorted(GOOGLE_SCOPES)),
+        "access_type": "offline",
+        "include_granted_scopes": "true",
+        "prompt": "consent",
+        "state": user_id,
+    }
+    return f"{GOOGLE_AUTH_URI}?{urlencode(params)}"
 
 
-def handle_google_callback(code: str, state: str) -> dict:
+async def handle_google_callback(code: str, state: str) -> dict:
     """Exchange code for tokens and save them."""
     user_id = state
-    flow = Flow.from_client_config(_make_client_config(), scopes=sorted(GOOGLE_SCOPES))
-    flow.redirect_uri = GOOGLE_BACKEND_CALLBACK
-
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore", UserWarning)
-        flow.fetch_token(code=code)
+    resp = await upstream_request(
+        "google",
+        "POST",
+        GOOGLE_TOKEN_URI,
+        user_id=user_id,
+        data={
+            "grant_type": "authorization_code",
+            "code": code,
+            "client_id": GOOGLE_CLIENT_ID,
+            "client_secret": GOOGLE_CLIENT_SECRET,
+            "redirect_uri": GOOGLE_BACKEND_CALLBACK,
+        },
+    )
+    resp.raise_for_status()
+    token_data = resp.json()
 
-    creds = flow.credentials
     token_dict = {
-        "token": creds.token,
-        "refresh_token": creds.refresh_token,
-        "token_uri": creds.token_uri,
-        "client_id": creds.client_id,
-        "client_secret": creds.client_secret,
-        "scopes": creds.scopes,
-        "expiry": creds.expiry.isoformat() if creds.expiry else None,
+        "token": token_data["access_token"],
+        "refresh_token": token_data.get("refresh_token"),
+        "token_uri": GOOGLE_TOKEN_URI,
+        "client_id": GOOGLE_CLIENT_ID,
+        "client_secret": GOOGLE_CLIENT_SECRET,
+        "scopes": token_data.get("scope", "").split(),
+        "expiry": _expiry_from(token_data),
     }
 
-    save_token(user_id, "google", token_dict)
+    await save_token(user_id, "google", token_dict)
+    # The calendar watch and first data load run in the post-connect warm-up job
     return token_dict
 
 
@@ -85,61 +102,160 @@ def make_frontend_redirect_after_success(
     return url
 
 
-# ✅ --- GOOGLE CALENDAR API ACCESS ---
+# ✅ --- GOOGLE TOKENS ---
 
 
-def _build_google_calendar_service(user_id: str):
-    """Create Google Calendar service using saved user tokens."""
-    token_doc = get_token(user_id, "google")
-    if not token_doc:
-        raise Exception("Google account not connected")
+def _expiry_from(token_data: dict):
+    expires_in = token_data.get("expires_in")
+    if not expires_in:
+        return None
+    return (datetime.utcnow() + timedelta(seconds=int(expires_in))).isoformat()
 
-    creds = Credentials(
-        token=token_doc["token"],
-        refresh_token=token_doc.get("refresh_token"),
-        token_uri=token_doc.get("token_uri"),
-        client_id=token_doc.get("client_id"),
-        client_secret=token_doc.get("client_secret"),
-        scopes=token_doc.get("scopes"),
-    )
 
-    # Refresh expired token if needed
-    if creds.expired and creds.refresh_token:
-        creds.refresh(Request())
-        save_token(
-            user_id,
+def _is_expiring(token_doc: dict) -> bool:
+    expiry = token_doc.get("expiry")
+    if not expiry:
+        return False
+    remaining = datetime.fromisoformat(expiry) - datetime.utcnow()
+    return remaining < timedelta(seconds=GOOGLE_TOKEN_REFRESH_MARGIN_SECONDS)
+
+
+async def _refresh_google_token(user_id: str, stale_token: str = None) -> dict:
+    """
+    Exchange the stored refresh token for a new access token.
+
+    Concurrent callers for the same user wait on one lock; whoever arrives
+    after a successful refresh reuses the new token.
+    """
+    lock = _refresh_locks.setdefault(user_id, asyncio.Lock())
+    async with lock:
+        token_doc = await get_token(user_id, "google")
+        if not token_doc:
+            raise Exception("Google account not connected")
+
+        # Another caller already refreshed while we were waiting
+        if token_doc.get("token") != stale_token and not _is_expiring(token_doc):
+            return token_doc
+
+        if not token_doc.get("refresh_token"):
+            raise HTTPException(status_code=401, detail="Google session expired, please reconnect Google")
+
+        resp = await upstream_request(
             "google",
-            {
-                **token_doc,
-                "token": creds.token,
-                "expiry": creds.expiry.isoformat() if creds.expiry else None,
+            "POST",
+            token_doc.get("token_uri") or GOOGLE_TOKEN_URI,
+            user_id=user_id,
+            data={
+                "grant_type": "refresh_token",
+                "refresh_token": token_doc["refresh_token"],
+                "client_id": token_doc.get("client_id") or GOOGLE_CLIENT_ID,
+                "client_secret": token_doc.get("client_secret") or GOOGLE_CLIENT_SECRET,
             },
         )
+        if resp.status_code in (400, 401):
+            # invalid_grant: the refresh token was revoked or has expired
+            raise HTTPException(status_code=401, detail="Google session expired, please reconnect Google")
+        resp.raise_for_status()
+        refreshed = resp.json()
+
+        token_doc = {
+            **token_doc,
+            "token": refreshed["access_token"],
+            "expiry": _expiry_from(refreshed),
+        }
+        await save_token(user_id, "google", token_doc)
+        return token_doc
 
-    return build("calendar", "v3", credentials=creds)
 
+async def _get_google_token(user_id: str) -> dict:
+    """Return saved Google tokens, refreshing them first if they are about to expire."""
+    token_doc = await get_token(user_id, "google")
+    if not token_doc:
+        raise Exception("Google account not connected")
+
+    if _is_expiring(token_doc) and token_doc.get("refresh_token"):
+        token_doc = await _refresh_google_token(user_id, token_doc["token"])
+    return token_doc
+
+
+async def _google_request(user_id: str, method: str, url: str, params: dict = None, json: dict = None) -> dict:
+    """Authenticated call to a Google API, retrying once after a token refresh on 401."""
+    token_doc = await _get_google_token(user_id)
+    async def send(token: str):
+        return await upstream_request(
+            "google", method, url, user_id=user_id,
+            params=params, json=json, headers={"Authorization": f"Bearer {token}"},
+        )
+
+    resp = await send(token_doc["token"])
+    if resp.status_code == 401 and token_doc.get("refresh_token"):
+        token_doc = await _refresh_google_token(user_id, token_doc["token"])
+        resp = await send(token_doc["token"])
+
+    resp.raise_for_status()
+    return resp.json() if resp.content else {}
+
+
+async def _google_get(user_id: str, url: str, params: dict = None) -> dict:
+    return await _google_request(user_id, "GET", url, params=params)
+
+
+# ✅ --- GOOGLE CALENDAR API ACCESS ---
+
+
+def _events_key(user_id: str) -> str:
+    # {"month": "YYYY-MM", "events": [...], "days": {date: day index}}; invalidated by Calendar push notifications.
+    # Expired entries are kept as last-known data for when Google is unavailable.
+    return cache.cache_key("google", "events", user_id)
+
+
+async def invalidate_events_cache(user_id: str):
+    await cache.expire(_events_key(user_id))
+
+
+async def has_calendar_watch(user_id: str) -> bool:
+    """True when the user has an unexpired Calendar watch channel."""
+    channel = await calendar_channels_collection.find_one(
+        {"user_id": user_id, "expiration": {"$gt": datetime.utcnow()}}, ID_ONLY
+    )
+    return channel is not None
+
+
+async def get_month_calendar(user_id: str) -> dict:
+    """
+    The current month's events and per-day interval index (cached until a push notification).
+    While Google is unavailable the last-known entry is returned and the request marked degraded.
+    """
+    now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+    month = now.strftime("%Y-%m")
+    cached = await cache.get_entry(_events_key(user_id))
+    if cached and cached.value["month"] != month:
+        cached = None
+    if cached and cached.fresh:
+        return cached.value
 
-def get_month_events(user_id: str):
-    """Fetch events for the current month for a given user."""
     try:
-        service = _build_google_calendar_service(user_id)
-        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
         start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         end_of_month = (start_of_month + timedelta(days=32)).replace(day=1)
 
-        events_result = (
-            service.events()
-            .list(
-                calendarId="primary",
-                timeMin=start_of_month.isoformat(),
-                timeMax=end_of_month.isoformat(),
-                singleEvents=True,
-                orderBy="startTime",
+        params = {
+            "timeMin": start_of_month.isoformat(),
+            "timeMax": end_of_month.isoformat(),
+            "singleEvents": "true",
+            "orderBy": "startTime",
+            "maxResults": 2500,
+        }
+        events = []
+        while True:
+            events_result = await _google_get(
+                user_id, f"{GOOGLE_CALENDAR_API}/calendars/primary/events", params
             )
-            .execute()
-        )
+            events.extend(events_result.get("items", []))
+            page_token = events_result.get("nextPageToken")
+            if not page_token:
+                break
+            params = {**params, "pageToken": page_token}
 
-        events = events_result.get("items", [])
         formatted_events = [
             {
                 "id": e["id"],
@@ -151,45 +267,104 @@ def get_month_events(user_id: str):
             for e in events
         ]
 
-        return formatted_events
+        # Indexed once per sync; scoring and recommendations read the day summaries
+        calendar = {"month": month, "events": formatted_events, "days": index_month(formatted_events, month)}
+
+        # Without a watch channel nothing tells us about changes, so poll more often
+        ttl = CALENDAR_EVENTS_TTL_SECONDS if await has_calendar_watch(user_id) else CALENDAR_EVENTS_POLL_TTL_SECONDS
+        await cache.put(_events_key(user_id), calendar, ttl, keep=CACHE_LAST_KNOWN_SECONDS)
 
+        return calendar
+
+    except UpstreamUnavailable as e:
+        if cached:
+            logging.warning(f"Serving last-known events for user {user_id}: {e.detail}")
+            mark_degraded("google")
+            return cached.value
+        raise e
     except Exception as e:
         logging.error(f"Error fetching events: {e}")
         raise e
 
 
-def _build_google_fitness_service(user_id: str):
-    """Create Google Fitness service using saved user tokens."""
-    token_doc = get_token(user_id, "google")
-    if not token_doc:
-        raise Exception("Google account not connected")
+async def get_month_events(user_id: str):
+    """Fetch events for the current month for a given user."""
+    return (await get_month_calendar(user_id))["events"]
 
-    creds = Credentials(
-        token=token_doc["token"],
-        refresh_token=token_doc.get("refresh_token"),
-        token_uri=token_doc.get("token_uri"),
-        client_id=token_doc.get("client_id"),
-        client_secret=token_doc.get("client_secret"),
-        scopes=token_doc.get("scopes"),
-    )
 
-    # Refresh expired token if needed
-    if creds.expired and creds.refresh_token:
-        creds.refresh(Request())
-        save_token(
+def calendar_day(calendar: dict, day: str = None) -> dict:
+    """The interval index summary for `day` (default today, UTC) from a `get_month_calendar` value."""
+    day = day or today_utc()
+    # Entries cached before the index existed carry only events
+    return calendar.get("days", {}).get(day) or index_day(calendar["events"], day)
+
+
+async def get_calendar_day(user_id: str, day: str = None) -> dict:
+    """Meeting minutes, focus blocks, back-to-back chains and overlaps for one day of the current month."""
+    return calendar_day(await get_month_calendar(user_id), day)
+
+
+async def start_calendar_watch(user_id: str) -> dict:
+    """
+    Open an `events.watch` channel so Google pushes change notifications for this user.
+
+    Google sends the channel's first ("sync") notification right away, possibly
+    before `events.watch` has returned, so the channel is stored first (without
+    its resource id) and removed again if the call fails.
+    """
+    token = secrets.token_urlsafe(32)
+    expiration = datetime.now(pytz.UTC) + timedelta(seconds=CALENDAR_CHANNEL_TTL_SECONDS)
+    channel = {
+        "user_id": user_id,
+        "channel_id": uuid.uuid4().hex,
+        "resource_id": None,
+        "token": token,
+        "expiration": expiration.replace(tzinfo=None),
+        "created_at": datetime.utcnow(),
+    }
+    await calendar_channels_collection.insert_one(channel)
+    try:
+        result = await _google_request(
             user_id,
-            "google",
-            {
-                **token_doc,
-                "token": creds.token,
-                "expiry": creds.expiry.isoformat() if creds.expiry else None,
+            "POST",
+            f"{GOOGLE_CALENDAR_API}/calendars/primary/events/watch",
+            json={
+                "id": channel["channel_id"],
+                "type": "web_hook",
+                "address": CALENDAR_WEBHOOK_URL,
+                "token": token,
+                "expiration": int(expiration.timestamp() * 1000),
             },
         )
+    except BaseException:
+        await calendar_channels_collection.delete_one({"channel_id": channel["channel_id"]})
+        raise
+
+    granted = {
+        "resource_id": result["resourceId"],
+        # Google may shorten the requested expiration; keep what it granted (naive UTC)
+        "expiration": datetime.utcfromtimestamp(int(result["expiration"]) / 1000),
+    }
+    await calendar_channels_collection.update_one({"channel_id": channel["channel_id"]}, {"$set": granted})
+    await invalidate_events_cache(user_id)
+    return {**channel, **granted}
+
 
-    return build("fitness", "v1", credentials=creds)
+async def stop_calendar_watch(channel: dict):
+    """Stop a watch channel and forget it; the channel may already be gone on Google's side."""
+    try:
+        await _google_request(
+            channel["user_id"],
+            "POST",
+            f"{GOOGLE_CALENDAR_API}/channels/stop",
+            json={"id": channel["channel_id"], "resourceId": channel["resource_id"]},
+        )
+    except Exception as e:
+        logging.warning(f"Error stopping calendar channel {channel['channel_id']}: {e}")
+    await calendar_channels_collection.delete_one({"channel_id": channel["channel_id"]})
 
 
-def _get_daily_aggregate_data(
+async def _get_daily_aggregate_data(
     user_id: str, 
     data_source_id: str, 
     value_field: str = "intVal"
@@ -203,8 +378,6 @@ def _get_daily_aggregate_data(
         value_field: The field to extract the value from ("intVal" or "fpVal").
     """
     try:
-        service = _build_google_fitness_service(user_id)
-
         # Define time range (start of day → now) in UTC
         now = datetime.utcnow().replace(tzinfo=pytz.UTC)
         start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -212,16 +385,9 @@ def _get_daily_aggregate_data(
         # Google Fit API uses nanoseconds
         dataset_id = f"{int(start_of_day.timestamp() * 1e9)}-{int(now.timestamp() * 1e9)}"
 
-        dataset = (
-            service.users()
-            .dataSources()
-            .datasets()
-            .get(
-                userId="me",
-                dataSourceId=data_source_id,
-                datasetId=dataset_id,
-            )
-            .execute()
+        dataset = await _google_get(
+            user_id,
+            f"{GOOGLE_FITNESS_API}/dataSources/{quote(data_source_id, safe=':')}/datasets/{dataset_id}",
         )
 
         total_value = 0.0
@@ -236,36 +402,98 @@ def _get_daily_aggregate_data(
         # Re-raise to be handled by the route
         raise e
 
+# Google Fit sources aggregated together: field name -> (dataSourceId, value field).
+# Same derived sources as the single-metric endpoints below, so the numbers match.
+FIT_DAILY_FIELDS = {
+    "steps": ("derived:com.google.step_count.delta:com.google.android.gms:estimated_steps", "intVal"),
+    "calories": ("derived:com.google.calories.expended:com.google.android.gms:merge_calories_expended", "fpVal"),
+    "active_minutes": ("derived:com.google.active_minutes:com.google.android.gms:merge_active_minutes", "intVal"),
+}
+
+
+async def get_daily_fitness_buckets(user_id: str, start: datetime, end: datetime, tz: str) -> list:
+    """
+    Fetch steps, calories and active minutes bucketed per local day in one
+    `dataset:aggregate` request. `start`/`end` are timezone-aware.
+    """
+    body = {
+        "aggregateBy": [{"dataSourceId": source} for source, _ in FIT_DAILY_FIELDS.values()],
+        "bucketByTime": {"period": {"type": "day", "value": 1, "timeZoneId": tz}},
+        "startTimeMillis": int(start.timestamp() * 1000),
+        "endTimeMillis": int(end.timestamp() * 1000),
+    }
+    result = await _google_request(user_id, "POST", f"{GOOGLE_FITNESS_API}/dataset:aggregate", json=body)
+
+    zone = pytz.timezone(tz)
+    days = []
+    for bucket in result.get("bucket", []):
+        day = datetime.fromtimestamp(int(bucket["startTimeMillis"]) / 1000, zone).date()
+        values = {}
+        # Datasets come back in `aggregateBy` order
+        for (name, (_, value_field)), dataset in zip(FIT_DAILY_FIELDS.items(), bucket.get("dataset", [])):
+            values[name] = sum(
+                field.get(value_field, 0)
+                for point in dataset.get("point", [])
+                for field in point.get("value", [])
+            )
+        days.append({
+            "day": day,
+            "steps": int(values.get("steps", 0)),
+            "calories": float(values.get("calories", 0.0)),
+            "active_minutes": int(values.get("active_minutes", 0)),
+        })
+    return days
+
+
+async def get_daily_fitness_snapshot(user_id: str) -> dict:
+    """Today's steps, calories and active minutes (UTC day so far) in one request, briefly cached."""
+    now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+    key = cache.cache_key("google", "fitness_today", user_id)
+    cached = await cache.get(key)
+    if cached and cached["date"] == now.date().isoformat():
+        return cached["totals"]
+
+    start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    days = await get_daily_fitness_buckets(user_id, start_of_day, now, "UTC")
+    if days:
+        today = days[-1]
+        totals = {"steps": today["steps"], "calories": today["calories"], "active_minutes": today["active_minutes"]}
+    else:
+        totals = {"steps": 0, "calories": 0.0, "active_minutes": 0}
+    await cache.put(key, {"date": now.date().isoformat(), "totals": totals}, FIT_SNAPSHOT_TTL_SECONDS)
+    return totals
+
+
 # --- NEW GOOGLE FIT SERVICE METHODS ---
 
-def get_daily_steps_from_google(user_id: str) -> int:
+async def get_daily_steps_from_google(user_id: str) -> int:
     """Fetches daily step count from Google Fit."""
-    steps = _get_daily_aggregate_data(
+    steps = await _get_daily_aggregate_data(
         user_id,
         "derived:com.google.step_count.delta:com.google.android.gms:estimated_steps",
         "intVal"
     )
     return int(steps)
 
-def get_daily_calories_from_google(user_id: str) -> float:
+async def get_daily_calories_from_google(user_id: str) -> float:
     """Fetches daily calories burned from Google Fit."""
-    calories = _get_daily_aggregate_data(
+    calories = await _get_daily_aggregate_data(
         user_id,
         "derived:com.google.calories.expended:com.google.android.gms:merge_calories_expended",
         "fpVal"
     )
     return calories
 
-def get_daily_active_minutes_from_google(user_id: str) -> int:
+async def get_daily_active_minutes_from_google(user_id: str) -> int:
     """Fetches daily active minutes from Google Fit."""
-    minutes = _get_daily_aggregate_data(
+    minutes = await _get_daily_aggregate_data(
         user_id,
         "derived:com.google.active_minutes:com.google.android.gms:merge_active_minutes",
         "intVal"
     )
     return int(minutes)
 
-def set_user_goal(user_id: str, goal_type: str, goal_value: float):
+async def set_user_goal(user_id: str, goal_type: str, goal_value: float):
     """
     Generic helper to set or update a user's fitness goal.
     goal_type → 'step_goal' | 'calorie_goal' | 'active_minute_goal'
@@ -274,7 +502,7 @@ def set_user_goal(user_id: str, goal_type: str, goal_value: float):
         if goal_value <= 0:
             raise HTTPException(status_code=400, detail="Goal must be a positive number")
 
-        result = users_collection.update_one(
+        result = await users_collection.update_one(
             {"_id": ObjectId(user_id)},  # ✅ convert string to ObjectId
             {"$set": {goal_type: goal_value}}
         )
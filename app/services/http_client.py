@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import httpx
+from app.config import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_TIMEOUT_SECONDS,
+    HTTP_CONNECT_TIMEOUT_SECONDS,
+    UPSTREAM_CALL_TIMEOUT_SECONDS,
+)
+from app.services.rate_limiter import get_limiter
+from app.services.resilience import UpstreamUnavailable, check_deadline, get_breaker, remaining
+from app.utils import metrics
+
+_client = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (installed by `httpx[http2]`)."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide pooled AsyncClient shared by Google and Jira calls.
+
+    Upstream waits are plain awaits on this client, so a worker can hold
+    thousands of slow provider requests without pinning a thread per call.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        http2 = _http2_available()
+        _client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+        )
+        logging.info(f"Upstream HTTP client created (http2={http2})")
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+def _retry_after_seconds(response: httpx.Response, default: float = 5.0) -> float:
+    try:
+        return float(response.headers.get("Retry-After", default))
+    except ValueError:  # HTTP-date form; a short fixed back-off is good enough
+        return default
+
+
+async def upstream_request(provider: str, method: str, url: str, user_id: str = None, **kwargs) -> httpx.Response:
+    """
+    Send a request to `provider` ("google" / "jira") through its circuit breaker and rate limiter.
+
+    - fails fast with UpstreamUnavailable (503) while the provider's circuit is open
+    - waits for a token (interactive callers first, bounded by the request deadline)
+    - sends with its own timeout, capped by what is left of the request deadline
+    - turns an upstream 429 into a provider-wide back-off plus a 503 with Retry-After,
+      and transport errors, timeouts and 5xx into UpstreamUnavailable (a timeout caused by
+      the request deadline running out is a 504 and is not counted against the circuit)
+    """
+    check_deadline(provider)
+    breaker = get_breaker(provider)
+    probe = breaker.before_call()
+    limiter = get_limiter(provider)
+    try:
+        await limiter.acquire(user_id)
+        check_deadline(provider)
+
+        # Inside a request each call gets its own limit, capped by what is left of
+        # the deadline; httpx timeouts apply per phase (connect, each read), so the
+        # limit is enforced around the whole request as well
+        budget = remaining()
+        call_timeout = HTTP_TIMEOUT_SECONDS if budget is None else UPSTREAM_CALL_TIMEOUT_SECONDS
+        deadline_bound = budget is not None and budget <= call_timeout
+        if deadline_bound:
+            call_timeout = budget
+        kwargs.setdefault(
+            "timeout", httpx.Timeout(call_timeout, connect=min(call_timeout, HTTP_CONNECT_TIMEOUT_SECONDS))
+        )
+        try:
+            request = get_http_client().request(method, url, **kwargs)
+            response = await (asyncio.wait_for(request, call_timeout) if budget is not None else request)
+        except (httpx.TimeoutException, asyncio.TimeoutError) as e:
+            if deadline_bound:
+                # The request ran out of time, which says nothing about the provider
+                metrics.inc("upstream_deadline_exceeded_total", provider=provider)
+                raise UpstreamUnavailable(provider, "Request deadline exceeded", status_code=504) from e
+            breaker.record_failure()
+            raise UpstreamUnavailable(provider, f"{provider} timed out") from e
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            raise UpstreamUnavailable(provider, f"{provider} is unreachable: {e}") from e
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+            raise UpstreamUnavailable(provider, f"{provider} error {response.status_code}: {response.text[:200]}")
+        breaker.record_success()
+    finally:
+        if probe:
+            breaker.release()
+
+    if response.status_code == 429:
+        retry_after = _retry_after_seconds(response)
+        limiter.penalize(retry_after)
+        raise UpstreamUnavailable(
+            provider, f"{provider} is rate limiting requests, try again shortly", retry_after=retry_after
+        )
+    return response
@@ -1,10 +1,45 @@
-import requests
+import asyncio
+import logging
 from urllib.parse import urlencode
-from app.config import JIRA_CLIENT_ID, JIRA_CLIENT_SECRET, JIRA_BACKEND_CALLBACK, JIRA_SCOPES, FRONTEND_ROOT_URL
+from weakref import WeakValueDictionary
+from app.config import (
+    JIRA_CLIENT_ID,
+    JIRA_CLIENT_SECRET,
+    JIRA_BACKEND_CALLBACK,
+    JIRA_SCOPES,
+    FRONTEND_ROOT_URL,
+    JIRA_TOKEN_URL,
+    JIRA_RESOURCES_URL,
+    JIRA_TOKEN_REFRESH_MARGIN_SECONDS,
+    TOKEN_REFRESH_LOCK_SECONDS,
+    TOKEN_REFRESH_WAIT_SECONDS,
+    JIRA_CLOUD_ID_TTL_SECONDS,
+    JIRA_WEBHOOK_URL,
+    JIRA_TICKETS_TTL_SECONDS,
+    JIRA_TICKETS_POLL_TTL_SECONDS,
+    CACHE_LAST_KNOWN_SECONDS,
+    JIRA_SYNC_PAGE_SIZE,
+    JIRA_DONE_WINDOW_DAYS,
+    JIRA_TICKETS_LIMIT,
+)
+from pymongo import UpdateOne
+from app.database import tokens_collection, jira_webhooks_collection, jira_issues_collection
+from app.services import cache
+from app.services.http_client import upstream_request
+from app.services.resilience import UpstreamUnavailable, mark_degraded
+from app.services.scoring import JIRA_COUNT_FIELDS, priority_level, ticket_state
 from app.services.token_store import save_token, get_token
-import requests
-from datetime import date
+import pytz
+from datetime import datetime, timedelta
 from fastapi import HTTPException
+from app.utils.projections import ID_ONLY, JIRA_CLOUD_ID, JIRA_TICKET
+
+# Jira drops dynamic webhooks 30 days after registration/refresh
+JIRA_WEBHOOK_LIFETIME_DAYS = 30
+
+# One lock per user (dropped once unused) so concurrent callers in this process
+# share a single refresh round trip; workers coordinate through `cache.shared_lock`
+_refresh_locks = WeakValueDictionary()
 
 # ... get_jira_auth_url_for_user (no changes) ...
 def get_jira_auth_url_for_user(user_id: str):
@@ -20,9 +55,8 @@ def get_jira_auth_url_for_user(user_id: str):
     return f"https://auth.atlassian.com/authorize?{urlencode(params)}"
 
 
-def handle_jira_callback(code: str, state: str):
+async def handle_jira_callback(code: str, state: str):
     user_id = state
-    token_url = "https://auth.atlassian.com/oauth/token"
     payload = {
         "grant_type": "authorization_code",
         "client_id": JIRA_CLIENT_ID,
@@ -30,34 +64,25 @@ def handle_jira_callback(code: str, state: str):
         "code": code,
         "redirect_uri": JIRA_BACKEND_CALLBACK
     }
-    resp = requests.post(token_url, json=payload)
+    resp = await upstream_request("jira", "POST", JIRA_TOKEN_URL, user_id=user_id, json=payload)
     resp.raise_for_status()
-    token_data = resp.json()
+    token_data = _with_expiry(resp.json())
 
     access_token = token_data.get("access_token")
     if not access_token:
         raise HTTPException(status_code=400, detail="Failed to get access token from Jira.")
 
     # Get accessible resources to extract cloud_id
-    resources_url = "https://api.atlassian.com/oauth/token/accessible-resources"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    resources_resp = requests.get(resources_url, headers=headers)
-    resources_resp.raise_for_status()
-    resources_data = resources_resp.json()
-
-    if not resources_data:
-        raise HTTPException(status_code=400, detail="No accessible Jira resources found for this user.")
-
-    cloud_id = resources_data[0].get("id")
-    if not cloud_id:
-        raise HTTPException(status_code=400, detail="Could not determine Jira Cloud ID.")
+    cloud_id = await _fetch_cloud_id(access_token)
+    await _cache_cloud_id(user_id, cloud_id)
 
     token_data["cloud_id"] = cloud_id
 
     # ✅ Add user_id into token_data before saving
     token_data["user_id"] = user_id
 
-    save_token(user_id, "jira", token_data)
+    await save_token(user_id, "jira", token_data)
+    # The webhook registration and first ticket load run in the post-connect warm-up job
 
     # ✅ Redirect back to frontend including user_id in query params
     redirect_url = make_frontend_redirect_after_success(
@@ -65,65 +90,413 @@ def handle_jira_callback(code: str, state: str):
         status="success",
         user_id=user_id
     )
-    print(f"Redirecting to: {redirect_url}") 
+    logging.debug(f"Jira connected for user {user_id}, redirecting to the frontend")
     return redirect_url
 
 
 
-def get_high_priority_tickets_for_user(user_id: str):
+def _with_expiry(token_data: dict) -> dict:
+    """Stamp an absolute `expires_at` so later callers know when to refresh."""
+    expires_in = token_data.get("expires_in")
+    if expires_in:
+        token_data["expires_at"] = (datetime.utcnow() + timedelta(seconds=int(expires_in))).isoformat()
+    return token_data
+
+
+def _is_expiring(token_data: dict) -> bool:
+    expires_at = token_data.get("expires_at")
+    if not expires_at:
+        return False
+    remaining = datetime.fromisoformat(expires_at) - datetime.utcnow()
+    return remaining < timedelta(seconds=JIRA_TOKEN_REFRESH_MARGIN_SECONDS)
+
+
+async def _refresh_jira_token(user_id: str, stale_access_token: str = None) -> dict:
     """
-    Fetches high-priority Jira tickets assigned to the authenticated user
-    using the new /rest/api/3/search/jql endpoint (required as of 2024).
+    Exchange the stored refresh token for a new access token.
+
+    Atlassian rotates refresh tokens, so two workers refreshing at once would
+    invalidate each other's token: concurrent callers for the same user, in any
+    worker, queue on one lock, and whoever arrives after a successful refresh
+    picks up the new token instead of refreshing again.
     """
-    token_data = get_token(user_id, "jira")
+    lock = _refresh_locks.setdefault(user_id, asyncio.Lock())
+    shared = cache.shared_lock(
+        cache.cache_key("jira", "refresh_lock", user_id), TOKEN_REFRESH_LOCK_SECONDS, TOKEN_REFRESH_WAIT_SECONDS
+    )
+    async with lock, shared as held:
+        token_data = await get_token(user_id, "jira")
+        if not token_data:
+            raise HTTPException(status_code=401, detail="No Jira token found. Please authenticate Jira first.")
+
+        # Another caller already refreshed while we were waiting
+        if token_data.get("access_token") != stale_access_token and not _is_expiring(token_data):
+            return token_data
+        if not held:
+            raise UpstreamUnavailable("jira", "Jira sign-in is being renewed, try again shortly", retry_after=1)
+
+        refresh_token = token_data.get("refresh_token")
+        if not refresh_token:
+            raise HTTPException(status_code=401, detail="Jira session expired. Please re-authenticate Jira.")
+
+        payload = {
+            "grant_type": "refresh_token",
+            "client_id": JIRA_CLIENT_ID,
+            "client_secret": JIRA_CLIENT_SECRET,
+            "refresh_token": refresh_token,
+        }
+        resp = await upstream_request("jira", "POST", JIRA_TOKEN_URL, user_id=user_id, json=payload)
+        if resp.status_code != 200:
+            raise HTTPException(status_code=401, detail="Jira session expired. Please re-authenticate Jira.")
+
+        # Atlassian rotates refresh tokens, so keep whatever comes back
+        refreshed = _with_expiry(resp.json())
+        token_data = {**token_data, **refreshed}
+        await save_token(user_id, "jira", token_data)
+        return token_data
+
+
+async def _get_valid_jira_token(user_id: str) -> dict:
+    """Return the stored Jira token, refreshing it first if it is about to expire."""
+    token_data = await get_token(user_id, "jira")
     if not token_data:
         raise HTTPException(status_code=401, detail="No Jira token found. Please authenticate Jira first.")
 
-    access_token = token_data.get("access_token")
-    cloud_id = token_data.get("cloud_id")
+    if _is_expiring(token_data):
+        token_data = await _refresh_jira_token(user_id, token_data.get("access_token"))
+    return token_data
 
+
+async def _fetch_cloud_id(access_token: str) -> str:
+    headers = {"Authorization": f"Bearer {access_token}"}
+    resources_resp = await upstream_request("jira", "GET", JIRA_RESOURCES_URL, headers=headers)
+    resources_resp.raise_for_status()
+    resources_data = resources_resp.json()
+
+    if not resources_data:
+        raise HTTPException(status_code=400, detail="No accessible Jira resources found for this user.")
+
+    cloud_id = resources_data[0].get("id")
     if not cloud_id:
-        raise HTTPException(status_code=400, detail="Missing Jira Cloud ID in stored token data. Please re-authenticate.")
+        raise HTTPException(status_code=400, detail="Could not determine Jira Cloud ID.")
+    return cloud_id
+
+
+async def _cache_cloud_id(user_id: str, cloud_id: str):
+    await cache.put(cache.cache_key("jira", "cloud_id", user_id), cloud_id, JIRA_CLOUD_ID_TTL_SECONDS)
+
 
-    # ✅ Correct new Jira Search JQL endpoint
-    url = f"https://api.atlassian.com/ex/jira/{cloud_id}/rest/api/3/search/jql"
+async def warm_cloud_id_cache() -> int:
+    """Preload the cloud_id cache from stored Jira tokens; returns how many were loaded."""
+    count = 0
+    async for doc in tokens_collection.find(
+        {"provider": "jira", "token.cloud_id": {"$exists": True}}, JIRA_CLOUD_ID
+    ):
+        await _cache_cloud_id(doc["user_id"], doc["token"]["cloud_id"])
+        count += 1
+    return count
 
-    headers = {
-        "Authorization": f"Bearer {access_token}",
+
+async def _resolve_cloud_id(user_id: str, token_data: dict) -> str:
+    """Resolve the user's Jira cloud_id: cache → stored token → accessible-resources."""
+    cached = await cache.get(cache.cache_key("jira", "cloud_id", user_id))
+    if cached:
+        return cached
+
+    cloud_id = token_data.get("cloud_id")
+    if not cloud_id:
+        cloud_id = await _fetch_cloud_id(token_data.get("access_token"))
+        await save_token(user_id, "jira", {**token_data, "cloud_id": cloud_id})
+
+    await _cache_cloud_id(user_id, cloud_id)
+    return cloud_id
+
+
+def _jira_headers(token_data: dict) -> dict:
+    return {
+        "Authorization": f"Bearer {token_data.get('access_token')}",
         "Accept": "application/json",
         "Content-Type": "application/json"
     }
 
-    # ✅ Proper payload format — no "queries" array
-    payload = {
-        "jql": "assignee = currentUser() AND status != Done ORDER BY priority DESC",
-        "maxResults": 5,
-        "fields": ["summary", "priority", "status"]
-    }
 
-    response = requests.post(url, headers=headers, json=payload)
+async def _jira_request(user_id: str, method: str, path: str, json: dict = None):
+    """
+    Authenticated call to the user's Jira Cloud REST API (`path` starts at /rest/...).
+    Refreshes the token once on 401; raises HTTPException on any other error.
+    """
+    token_data = await _get_valid_jira_token(user_id)
+    cloud_id = await _resolve_cloud_id(user_id, token_data)
+    url = f"https://api.atlassian.com/ex/jira/{cloud_id}{path}"
+
+    response = await upstream_request(
+        "jira", method, url, user_id=user_id, headers=_jira_headers(token_data), json=json
+    )
+
+    # Token revoked or expired early → refresh once and retry instead of forcing a reconnect
+    if response.status_code == 401:
+        token_data = await _refresh_jira_token(user_id, token_data.get("access_token"))
+        response = await upstream_request(
+            "jira", method, url, user_id=user_id, headers=_jira_headers(token_data), json=json
+        )
 
-    if response.status_code != 200:
+    if response.status_code >= 300:
         raise HTTPException(
             status_code=response.status_code,
             detail=f"Jira API error: {response.text}"
         )
+    return response
+
+
+# Only what the store keeps; `status` carries its statusCategory
+JIRA_ISSUE_FIELDS = ["summary", "priority", "status", "updated"]
+JIRA_SEARCH_PATH = "/rest/api/3/search/jql"
+
+# One lock per user (dropped once unused) so concurrent callers share a single sync
+_sync_locks = WeakValueDictionary()
+
+
+def _issue_doc(user_id: str, issue: dict, synced_at: datetime) -> dict:
+    fields = issue.get("fields", {})
+    priority = fields.get("priority") or {}
+    status = fields.get("status") or {}
+    priority_name = priority.get("name", "No Priority")
+    status_name = status.get("name", "Unknown")
+    priority_id = str(priority.get("id", ""))
+    return {
+        "user_id": user_id,
+        "key": issue.get("key"),
+        "summary": fields.get("summary"),
+        "priority": priority_name,
+        "status": status_name,
+        "state": ticket_state(status_name, (status.get("statusCategory") or {}).get("key")),
+        "priority_level": priority_level(priority_name),
+        # Jira's default scheme numbers priorities from Highest (1) down
+        "priority_rank": int(priority_id) if priority_id.isdigit() else 99,
+        "updated": fields.get("updated"),
+        "synced_at": synced_at,
+    }
+
+
+async def _store_issues(user_id: str, issues: list, synced_at: datetime) -> int:
+    await jira_issues_collection.bulk_write(
+        [
+            UpdateOne(
+                {"user_id": user_id, "key": issue.get("key")},
+                {"$set": _issue_doc(user_id, issue, synced_at)},
+                upsert=True,
+            )
+            for issue in issues
+        ],
+        ordered=False,
+    )
+    return len(issues)
+
 
-    data = response.json()
+def _synced_key(user_id: str) -> str:
+    # {"synced_at": iso}; expired by Jira webhooks/registration to force a resync.
+    # Expired entries are kept so the store can be served while Jira is unavailable.
+    return cache.cache_key("jira", "issues_synced", user_id)
 
-    issues = data.get("issues", [])
-    ticket_list = []
 
-    for issue in issues:
-        fields = issue.get("fields", {})
-        ticket_list.append({
-            "key": issue.get("key"),
-            "summary": fields.get("summary"),
-            "priority": fields.get("priority", {}).get("name", "No Priority"),
-            "status": fields.get("status", {}).get("name", "Unknown")
-        })
+async def invalidate_tickets_cache(user_id: str):
+    await cache.expire(_synced_key(user_id))
+
+
+async def sync_jira_issues(user_id: str) -> int:
+    """
+    Copy the user's assigned issues (open, or resolved within JIRA_DONE_WINDOW_DAYS)
+    into `jira_issues`, following `nextPageToken`. Token pages can only be fetched
+    one after another, so each page is written while the next one is requested.
+    Issues that dropped out of the search are removed. Returns issues stored.
+    """
+    synced_at = datetime.utcnow()
+    payload = {
+        "jql": (
+            "assignee = currentUser() AND "
+            f"(statusCategory != Done OR resolved >= -{JIRA_DONE_WINDOW_DAYS}d) ORDER BY key"
+        ),
+        "maxResults": JIRA_SYNC_PAGE_SIZE,
+        "fields": JIRA_ISSUE_FIELDS,
+    }
+    stored = 0
+    pending = None
+    try:
+        while True:
+            data = (await _jira_request(user_id, "POST", JIRA_SEARCH_PATH, json=payload)).json()
+            if pending:
+                stored += await pending
+                pending = None
+            issues = data.get("issues", [])
+            if issues:
+                pending = asyncio.create_task(_store_issues(user_id, issues, synced_at))
+            page_token = data.get("nextPageToken")
+            if not page_token or data.get("isLast"):
+                break
+            payload = {**payload, "nextPageToken": page_token}
+        if pending:
+            stored += await pending
+    except BaseException:
+        if pending:
+            pending.cancel()
+        raise
+
+    await jira_issues_collection.delete_many({"user_id": user_id, "synced_at": {"$lt": synced_at}})
+
+    # Without a webhook nothing tells us about changes, so poll more often
+    ttl = JIRA_TICKETS_TTL_SECONDS if await has_jira_webhook(user_id) else JIRA_TICKETS_POLL_TTL_SECONDS
+    await cache.put(_synced_key(user_id), {"synced_at": synced_at.isoformat()}, ttl, keep=CACHE_LAST_KNOWN_SECONDS)
+    return stored
+
+
+async def ensure_jira_issues(user_id: str) -> bool:
+    """
+    Sync the store unless it is fresh. Returns True when Jira is unavailable
+    and the last-synced issues are served instead (the request is marked degraded).
+    """
+    synced = await cache.get_entry(_synced_key(user_id))
+    if synced and synced.fresh:
+        return False
+
+    lock = _sync_locks.setdefault(user_id, asyncio.Lock())
+    async with lock:
+        # Another caller already synced while we were waiting
+        synced = await cache.get_entry(_synced_key(user_id))
+        if synced and synced.fresh:
+            return False
+        try:
+            await sync_jira_issues(user_id)
+            return False
+        except UpstreamUnavailable as e:
+            if not synced:
+                raise
+            logging.warning(f"Serving last-synced Jira issues for user {user_id}: {e.detail}")
+            mark_degraded("jira")
+            return True
 
-    return {"tickets": ticket_list}
+
+async def apply_issue_event(user_id: str, event: str, issue: dict, account_id: str = None) -> bool:
+    """
+    Apply a webhook's issue snapshot to the store of the user with Jira
+    `account_id`; an issue assigned to someone else leaves it. Returns False
+    when the payload can't be applied and the caller should force a resync instead.
+    """
+    key = issue.get("key")
+    if not key:
+        return False
+    if event == "jira:issue_deleted":
+        await jira_issues_collection.delete_one({"user_id": user_id, "key": key})
+        return True
+    fields = issue.get("fields")
+    if event in ("jira:issue_created", "jira:issue_updated") and fields:
+        assignee = (fields.get("assignee") or {}).get("accountId")
+        if account_id is not None and assignee != account_id:
+            # Reassigned (or created for someone else): no longer on this user's list
+            await jira_issues_collection.delete_one({"user_id": user_id, "key": key})
+            return True
+        await jira_issues_collection.update_one(
+            {"user_id": user_id, "key": key},
+            {"$set": _issue_doc(user_id, issue, datetime.utcnow())},
+            upsert=True,
+        )
+        return True
+    return False
+
+
+async def has_jira_webhook(user_id: str) -> bool:
+    """True when the user has an unexpired dynamic webhook registration."""
+    doc = await jira_webhooks_collection.find_one(
+        {"user_id": user_id, "expiration": {"$gt": datetime.utcnow()}}, ID_ONLY
+    )
+    return doc is not None
+
+
+def _count_where(*conditions) -> dict:
+    return {"$sum": {"$cond": [{"$and": list(conditions)}, 1, 0]}}
+
+
+async def jira_issue_counts(user_id: str) -> dict:
+    """Totals by workflow state, plus open issues by priority level, from the local store."""
+    open_issue = {"$ne": ["$state", "done"]}
+    rows = await (await jira_issues_collection.aggregate([
+        {"$match": {"user_id": user_id}},
+        {"$group": {
+            "_id": None,
+            "total_tickets": {"$sum": 1},
+            "completed_tickets": _count_where({"$eq": ["$state", "done"]}),
+            "in_progress_tickets": _count_where({"$eq": ["$state", "in_progress"]}),
+            "high": _count_where(open_issue, {"$eq": ["$priority_level", "high"]}),
+            "medium": _count_where(open_issue, {"$eq": ["$priority_level", "medium"]}),
+            "low": _count_where(open_issue, {"$eq": ["$priority_level", "low"]}),
+        }},
+        {"$project": {"_id": 0}},
+    ])).to_list()
+    return rows[0] if rows else {**dict.fromkeys(JIRA_COUNT_FIELDS, 0), "high": 0, "medium": 0, "low": 0}
+
+
+async def get_high_priority_tickets_for_user(user_id: str):
+    """
+    The user's highest-priority open Jira tickets and issue counts, read from the
+    local issue store. The store is synced through /rest/api/3/search/jql when
+    stale and kept current by Jira issue webhooks; while Jira is unavailable the
+    last-synced issues are returned with `degraded: true`.
+    """
+    degraded = await ensure_jira_issues(user_id)
+    tickets, counts = await asyncio.gather(
+        jira_issues_collection.find({"user_id": user_id, "state": {"$ne": "done"}}, JIRA_TICKET)
+        .sort([("priority_rank", 1), ("key", 1)])
+        .limit(JIRA_TICKETS_LIMIT)
+        .to_list(),
+        jira_issue_counts(user_id),
+    )
+    result = {"tickets": tickets, "counts": counts}
+    if degraded:
+        result["degraded"] = True
+    return result
+
+
+async def register_jira_webhook(user_id: str) -> dict:
+    """Register a dynamic webhook for issues assigned to this user (expires after 30 days)."""
+    myself = (await _jira_request(user_id, "GET", "/rest/api/3/myself")).json()
+    account_id = myself["accountId"]
+
+    response = await _jira_request(user_id, "POST", "/rest/api/3/webhook", json={
+        "url": JIRA_WEBHOOK_URL,
+        "webhooks": [{
+            "events": ["jira:issue_created", "jira:issue_updated", "jira:issue_deleted"],
+            "jqlFilter": f'assignee = "{account_id}"',
+        }],
+    })
+    results = response.json().get("webhookRegistrationResult", [])
+    webhook_ids = [r["createdWebhookId"] for r in results if "createdWebhookId" in r]
+    if not webhook_ids:
+        raise HTTPException(status_code=400, detail=f"Jira webhook registration failed: {results}")
+
+    doc = {
+        "user_id": user_id,
+        "cloud_id": await _resolve_cloud_id(user_id, await get_token(user_id, "jira")),
+        "webhook_ids": webhook_ids,
+        "account_id": account_id,
+        "expiration": datetime.utcnow() + timedelta(days=JIRA_WEBHOOK_LIFETIME_DAYS),
+    }
+    await jira_webhooks_collection.update_one({"user_id": user_id}, {"$set": doc}, upsert=True)
+    await invalidate_tickets_cache(user_id)
+    return doc
+
+
+async def refresh_jira_webhook(doc: dict) -> dict:
+    """Extend a registration's expiry before Jira drops it."""
+    response = await _jira_request(
+        doc["user_id"], "PUT", "/rest/api/3/webhook/refresh", json={"webhookIds": doc["webhook_ids"]}
+    )
+    expiration_date = response.json().get("expirationDate")
+    expiration = (
+        datetime.fromisoformat(expiration_date.replace("Z", "+00:00")).astimezone(pytz.UTC).replace(tzinfo=None)
+        if expiration_date
+        else datetime.utcnow() + timedelta(days=JIRA_WEBHOOK_LIFETIME_DAYS)
+    )
+    await jira_webhooks_collection.update_one({"user_id": doc["user_id"]}, {"$set": {"expiration": expiration}})
+    return {**doc, "expiration": expiration}
 
 
 def make_frontend_redirect_after_success(
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import httpx
+from app.config import WARMUP_UPSTREAM_URLS, WARMUP_RETRY_SECONDS, WRITE_BEHIND_ENABLED
+from app.database import ensure_indexes, warm_pool, close_database
+from app.services.http_client import get_http_client, close_http_client
+from app.services.cache import start_cache, close_cache
+from app.services.jira_service import warm_cloud_id_cache
+from app.services.webhook_service import renewal_loop
+from app.services.fitness_history_service import fitness_sync_loop
+from app.services.write_behind import flush_write_buffers, write_behind_loop
+
+_state = {"ready": False, "draining": False}
+# Warm-up steps that have succeeded; error details only go to the log
+_components = {"mongo": False, "cache": False, "background_jobs": False}
+_warmup_task = None
+_background_tasks = []
+
+
+async def _warm_upstream_pools():
+    """Open pooled (TLS) connections to the upstream hosts; failures are not fatal."""
+    client = get_http_client()
+
+    async def touch(url: str):
+        try:
+            await client.head(url, timeout=5)
+        except httpx.HTTPError as e:
+            logging.warning(f"Warm-up request to {url} failed: {e}")
+
+    await asyncio.gather(*(touch(url) for url in WARMUP_UPSTREAM_URLS))
+
+
+async def warm_up():
+    """Warm Mongo, the cache backend, upstream HTTP pools and caches, then start background jobs; retries until they are reachable."""
+    while True:
+        try:
+            await ensure_indexes()
+            await warm_pool()
+            _components["mongo"] = True
+            await start_cache()
+            _components["cache"] = True
+            await _warm_upstream_pools()
+            cloud_ids = await warm_cloud_id_cache()
+            _start_background_jobs()
+            _components["background_jobs"] = True
+            _state["ready"] = True
+            logging.info(f"Warm-up complete ({cloud_ids} Jira cloud ids cached)")
+            return
+        except Exception as e:
+            logging.error(f"Warm-up failed, retrying in {WARMUP_RETRY_SECONDS}s: {e}")
+            await asyncio.sleep(WARMUP_RETRY_SECONDS)
+
+
+def _start_background_jobs():
+    """Periodic jobs that need Mongo: push-subscription renewal, Fit history sync and write-behind flushes."""
+    if not _background_tasks:
+        _background_tasks.append(asyncio.create_task(renewal_loop()))
+        _background_tasks.append(asyncio.create_task(fitness_sync_loop()))
+        if WRITE_BEHIND_ENABLED:
+            _background_tasks.append(asyncio.create_task(write_behind_loop()))
+
+
+async def startup():
+    """Start warm-up in the background so /healthz answers while it runs."""
+    global _warmup_task
+    _warmup_task = asyncio.create_task(warm_up())
+
+
+async def shutdown():
+    """Stop reporting ready, flush buffered writes, then release pooled upstream and Mongo connections."""
+    _state["ready"] = False
+    _state["draining"] = True
+
+    for task in (_warmup_task, *_background_tasks):
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    await flush_write_buffers()
+    await close_http_client()
+    await close_cache()
+    await close_database()
+    logging.info("Shutdown complete, connections closed")
+
+
+def readiness() -> dict:
+    """Public readiness view: flags only, never error text (the probe is unauthenticated)."""
+    return {**_state, "components": dict(_components)}
@@ -0,0 +1,193 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextvars import ContextVar
+from app.config import (
+    RATE_LIMITS,
+    RATE_LIMIT_MAX_WAIT_INTERACTIVE_SECONDS,
+    RATE_LIMIT_MAX_WAIT_BACKGROUND_SECONDS,
+)
+from app.utils import metrics
+from app.services.resilience import UpstreamUnavailable, clear_deadline, remaining
+
+# Priority classes: lower value is served first
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+MAX_WAIT = {
+    INTERACTIVE: RATE_LIMIT_MAX_WAIT_INTERACTIVE_SECONDS,
+    BACKGROUND: RATE_LIMIT_MAX_WAIT_BACKGROUND_SECONDS,
+}
+
+# Inherited by tasks created from the current context
+_priority = ContextVar("upstream_priority", default=INTERACTIVE)
+
+metrics.describe("upstream_queue_depth", "Requests waiting for an upstream rate-limit token")
+metrics.describe("upstream_throttled_total", "Requests rejected after waiting the maximum time for a token")
+metrics.describe("upstream_queued_total", "Requests that had to wait for a token")
+metrics.describe("upstream_429_total", "429 responses received from the provider")
+
+
+def background_priority():
+    """
+    Mark upstream calls made from the current task (and tasks it spawns) as
+    background work, which also isn't bound by the scheduling request's deadline.
+    """
+    _priority.set(BACKGROUND)
+    clear_deadline()
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class TokenBucket:
+    """Classic token bucket; `reserve` may drive tokens negative to queue a caller."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+    def reserve(self) -> float:
+        """Claim the next token and return how long to wait before using it."""
+        self._refill()
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def release(self):
+        """Give back a reservation that was abandoned."""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+    def penalize(self, seconds: float):
+        """Stop handing out tokens for `seconds` (e.g. after a 429 with Retry-After)."""
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+    @property
+    def idle(self) -> bool:
+        self._refill()
+        return self.tokens >= self.burst
+
+
+class ProviderLimiter:
+    """
+    Provider-wide token bucket with a priority queue in front of it, plus a
+    token bucket per user so one user's burst can't starve everybody else.
+    """
+
+    def __init__(self, provider: str, rate: float, burst: int, user_rate: float, user_burst: int):
+        self.provider = provider
+        self.bucket = TokenBucket(rate, burst)
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.user_buckets = {}
+        self._waiters = []  # heap of [priority, seq, future]
+        self._seq = itertools.count()
+        self._timer = None
+        self._calls = 0
+
+    def _user_bucket(self, user_id: str) -> TokenBucket:
+        self._calls += 1
+        if self._calls % 1000 == 0:
+            # Forget users whose bucket has refilled; they're indistinguishable from new ones
+            self.user_buckets = {k: b for k, b in self.user_buckets.items() if not b.idle}
+        bucket = self.user_buckets.get(user_id)
+        if bucket is None:
+            bucket = self.user_buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+        return bucket
+
+    def _throttled(self, priority: int, retry_after: float):
+        metrics.inc("upstream_throttled_total", provider=self.provider, priority=PRIORITY_NAMES[priority])
+        raise UpstreamUnavailable(
+            self.provider, f"{self.provider} request rate limit reached, try again shortly", retry_after=retry_after
+        )
+
+    def _update_depth(self):
+        depth = sum(1 for _, _, fut in self._waiters if not fut.done())
+        metrics.set_gauge("upstream_queue_depth", depth, provider=self.provider)
+
+    def _dispatch(self):
+        """Hand tokens to queued waiters in priority order as they become available."""
+        self._timer = None
+        while self._waiters:
+            fut = self._waiters[0][2]
+            if fut.done():  # timed out / cancelled
+                heapq.heappop(self._waiters)
+                continue
+            wait = self.bucket.wait_time()
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                break
+            self.bucket.take()
+            heapq.heappop(self._waiters)
+            fut.set_result(None)
+        self._update_depth()
+
+    async def acquire(self, user_id: str = None):
+        priority = current_priority()
+        max_wait = MAX_WAIT[priority]
+        budget = remaining()
+        if budget is not None:
+            # Never queue past the request's own deadline
+            max_wait = max(min(max_wait, budget), 0)
+        deadline = time.monotonic() + max_wait
+
+        # 1) Per-user bucket (FIFO within one user)
+        if user_id:
+            user_bucket = self._user_bucket(user_id)
+            delay = user_bucket.reserve()
+            if delay > max_wait:
+                user_bucket.release()
+                self._throttled(priority, delay)
+            if delay:
+                metrics.inc("upstream_queued_total", provider=self.provider, priority=PRIORITY_NAMES[priority])
+                await asyncio.sleep(delay)
+
+        # 2) Provider bucket, interactive before background
+        if not self._waiters and self.bucket.wait_time() == 0:
+            self.bucket.take()
+            return
+
+        metrics.inc("upstream_queued_total", provider=self.provider, priority=PRIORITY_NAMES[priority])
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [priority, next(self._seq), fut])
+        self._update_depth()
+        if self._timer is None:
+            self._dispatch()
+
+        try:
+            await asyncio.wait_for(fut, timeout=max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            self._update_depth()
+            self._throttled(priority, self.bucket.wait_time() + len(self._waiters) / self.bucket.rate)
+
+    def penalize(self, retry_after: float):
+        metrics.inc("upstream_429_total", provider=self.provider)
+        self.bucket.penalize(retry_after)
+
+
+_limiters = {
+    provider: ProviderLimiter(provider, **limits)
+    for provider, limits in RATE_LIMITS.items()
+}
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    return _limiters[provider]
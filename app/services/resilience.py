@@ -0,0 +1,190 @@
+"""
+Request deadline budgets and per-provider circuit breakers.
+
+Every API request gets a deadline (`RequestBudget` middleware); each upstream
+call made on its behalf may only use what is left of it. A provider that keeps
+failing has its circuit opened so callers fail fast instead of waiting on it,
+and services fall back to their last-known cached data, marking the response
+as degraded.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from fastapi import HTTPException
+from app.config import (
+    REQUEST_DEADLINE_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_OPEN_SECONDS,
+)
+from app.utils import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Monotonic deadline of the current request (None outside requests)
+_deadline = ContextVar("request_deadline", default=None)
+# Providers that were answered from cache during the current request
+_degraded = ContextVar("degraded_providers", default=None)
+
+metrics.describe("upstream_circuit_state", "Circuit state per provider (0 closed, 1 half-open, 2 open)")
+metrics.describe("upstream_circuit_rejected_total", "Upstream calls rejected because the circuit was open")
+metrics.describe("upstream_failures_total", "Upstream calls that failed (transport error, timeout or 5xx)")
+metrics.describe("upstream_deadline_exceeded_total", "Upstream calls skipped or cut short by the request deadline")
+metrics.describe("degraded_responses_total", "Answers served from last-known data because a provider was unavailable")
+
+
+class UpstreamUnavailable(HTTPException):
+    """A provider can't answer right now (circuit open, failure, throttled or out of time)."""
+
+    def __init__(self, provider: str, detail: str, status_code: int = 503, retry_after: float = None):
+        headers = {"Retry-After": str(max(1, int(retry_after + 0.999)))} if retry_after is not None else None
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
+        self.provider = provider
+
+
+# ----------------------- DEADLINES -----------------------
+
+def remaining() -> float:
+    """Seconds left in the current request's budget, or None when there is no deadline."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline(provider: str):
+    left = remaining()
+    if left is not None and left <= 0:
+        metrics.inc("upstream_deadline_exceeded_total", provider=provider)
+        raise UpstreamUnavailable(provider, "Request deadline exceeded", status_code=504)
+
+
+def clear_deadline():
+    """Background work outlives the request that scheduled it, so it runs without its deadline."""
+    _deadline.set(None)
+
+
+# ----------------------- DEGRADED RESPONSES -----------------------
+
+def mark_degraded(provider: str):
+    """Record that the current request was answered from last-known data for `provider`."""
+    metrics.inc("degraded_responses_total", provider=provider)
+    providers = _degraded.get()
+    if providers is not None:
+        providers.add(provider)
+
+
+def degraded_providers() -> list:
+    return sorted(_degraded.get() or ())
+
+
+# ----------------------- CIRCUIT BREAKERS -----------------------
+
+class CircuitBreaker:
+    """
+    Closed → counts consecutive failures; opens at the threshold.
+    Open → rejects every call until `open_seconds` have passed.
+    Half-open → lets a single probe through; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, provider: str, failure_threshold: int, open_seconds: float):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._publish()
+
+    def _publish(self):
+        metrics.set_gauge("upstream_circuit_state", STATE_VALUES[self.state], provider=self.provider)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logging.warning(f"Circuit for {self.provider}: {self.state} → {state}")
+            self.state = state
+            self._publish()
+
+    def _reject(self, retry_after: float):
+        metrics.inc("upstream_circuit_rejected_total", provider=self.provider)
+        raise UpstreamUnavailable(
+            self.provider, f"{self.provider} is currently unavailable, try again shortly", retry_after=retry_after
+        )
+
+    def before_call(self) -> bool:
+        """
+        Raise UpstreamUnavailable instead of letting a call through to an unhealthy
+        provider. Returns True when this call is the half-open probe; only that call
+        may `release()` the probe slot.
+        """
+        if self.state == OPEN:
+            left = self.opened_at + self.open_seconds - time.monotonic()
+            if left > 0:
+                self._reject(left)
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probing:
+                self._reject(1)
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self._set_state(CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        metrics.inc("upstream_failures_total", provider=self.provider)
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def release(self):
+        """End the probe call (answered, throttled or cancelled) so the next one may probe."""
+        self._probing = False
+
+
+_breakers = {}
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    if provider not in _breakers:
+        _breakers[provider] = CircuitBreaker(provider, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_OPEN_SECONDS)
+    return _breakers[provider]
+
+
+# ----------------------- MIDDLEWARE -----------------------
+
+class RequestBudget:
+    """
+    Pure ASGI middleware: starts each HTTP request's deadline and reports
+    providers answered from cache in an `X-Degraded` response header.
+    """
+
+    def __init__(self, app, seconds: float = REQUEST_DEADLINE_SECONDS):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        deadline_token = _deadline.set(time.monotonic() + self.seconds)
+        providers = set()
+        degraded_token = _degraded.set(providers)
+
+        async def send_with_flag(message):
+            if message["type"] == "http.response.start" and providers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-degraded", ",".join(sorted(providers)).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_flag)
+        finally:
+            _deadline.reset(deadline_token)
+            _degraded.reset(degraded_token)
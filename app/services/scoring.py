@@ -0,0 +1,167 @@
+"""
+Pure scoring rules shared by the per-request path and the batch engine.
+
+Nothing here fetches or stores anything: every function takes plain numbers
+(already-fetched Fit totals, ticket counts, calendar day summaries, goals) and returns
+scores. `app.services.batch_scoring` applies the same rules to NumPy columns.
+"""
+import numpy as np
+
+
+# ✅ Weightage Configuration
+WEIGHTS = {
+    "fitness": 0.4,
+    "jira": 0.4,
+    "calendar": 0.2
+}
+
+# 🎯 Goals assumed when the user hasn't set one
+WELLNESS_GOAL_DEFAULTS = {"step_goal": 8000, "calorie_goal": 2200, "active_minute_goal": 30}
+RECOMMENDATION_GOAL_DEFAULTS = {"step_goal": 8000, "calorie_goal": 2000, "active_minute_goal": 60}
+
+DONE_STATUSES = ("done", "resolved")
+IN_PROGRESS_STATUSES = ("in progress", "in-review")
+JIRA_COUNT_FIELDS = ("total_tickets", "completed_tickets", "in_progress_tickets")
+
+# Recommendation rules: name -> (priority, message template)
+RULES = {
+    "jira_high": (1, "⚡ {high} high-priority task(s) pending — complete them first!"),
+    "jira_medium": (2, "📋 {medium} medium-priority task(s) left — plan before meetings."),
+    "jira_low": (4, "🧩 {low} low-priority tasks can wait till you have free time."),
+    "calendar_busy": (1, "📅 {meeting_minutes:.0f} min of meetings, longest focus block {longest_focus_minutes:.0f} min — block 1h for deep work."),
+    "calendar_balanced": (3, "🗓 Balanced meeting day — schedule short recovery breaks."),
+    "calendar_light": (4, "🌤 Light meeting day — perfect for deep work."),
+    "calendar_back_to_back": (2, "🔁 {back_to_back_chains} back-to-back meeting chain(s) — leave 5 minutes between calls."),
+    "fitness_steps": (2, "🚶 Only {steps}/{step_goal} steps — take a 10-min walk."),
+    "fitness_active": (2, "⏱️ Only {active_minutes}/{active_minute_goal} active minutes — move a bit!"),
+}
+# Calendar thresholds (minutes within the day / working window)
+BUSY_MEETING_MINUTES = 360
+BALANCED_MEETING_MINUTES = 120
+MIN_FOCUS_MINUTES = 60
+HEAVY_MEETING_MINUTES = 240
+MAX_MEETING_MINUTES = 480
+FULL_FOCUS_MINUTES = 120
+
+GENERAL_RECOMMENDATION = {
+    "priority": 5,
+    "type": "general",
+    "message": "🌿 No major issues — stay consistent today!"
+}
+
+
+def round_score(value) -> float:
+    """Round to two places with np.round, so scalar and batch results agree exactly."""
+    return float(np.round(value, 2))
+
+
+def goals_with_defaults(user_doc: dict, defaults: dict) -> dict:
+    return {name: user_doc.get(name, default) for name, default in defaults.items()}
+
+
+# ----------------------- COMPONENT SCORES -----------------------
+
+def fitness_score(steps, calories, active_minutes, step_goal, calorie_goal, active_goal) -> float:
+    steps_ratio = min(steps / step_goal, 1.0)
+    calories_ratio = min(calories / calorie_goal, 1.0)
+    active_ratio = min(active_minutes / active_goal, 1.0)
+    return round_score((steps_ratio * 0.5 + calories_ratio * 0.3 + active_ratio * 0.2) * 100)
+
+
+def ticket_state(status: str, status_category: str = None) -> str:
+    """"done", "in_progress" or "todo", from Jira's status category with the status name as fallback."""
+    name = status.lower()
+    if status_category == "done" or name in DONE_STATUSES:
+        return "done"
+    if status_category == "indeterminate" or name in IN_PROGRESS_STATUSES:
+        return "in_progress"
+    return "todo"
+
+
+def jira_score(total_tickets, completed_tickets, in_progress_tickets) -> float:
+    if total_tickets == 0:
+        return 100.0
+    completion_ratio = completed_tickets / total_tickets
+    progress_ratio = in_progress_tickets / total_tickets
+    return round_score((completion_ratio * 0.8 + progress_ratio * 0.2) * 100)
+
+
+def calendar_score(meeting_minutes, longest_focus_minutes, back_to_back_chains, overlapping_meetings) -> float:
+    """
+    60% meeting load (full marks up to 4h, down to 40 at 8h) and 40% focus
+    (full marks for a 2h free block, 40 with none), minus 5 per back-to-back
+    chain (max 20) and 2.5 per double-booked meeting (max 10).
+    """
+    load = 100 - (min(max(meeting_minutes, HEAVY_MEETING_MINUTES), MAX_MEETING_MINUTES) - HEAVY_MEETING_MINUTES) * 0.25
+    focus = 40 + 60 * min(longest_focus_minutes / FULL_FOCUS_MINUTES, 1.0)
+    penalty = min(back_to_back_chains * 5, 20) + min(overlapping_meetings * 2.5, 10)
+    return round_score(min(max(load * 0.6 + focus * 0.4 - penalty, 0.0), 100.0))
+
+
+def total_score(fitness, jira, calendar) -> float:
+    return round_score(fitness * WEIGHTS["fitness"] + jira * WEIGHTS["jira"] + calendar * WEIGHTS["calendar"])
+
+
+# ----------------------- RECOMMENDATION RULES -----------------------
+
+def priority_level(priority: str):
+    """"high" (incl. Highest), "medium" or "low" (incl. Lowest); None for other schemes."""
+    for level in ("High", "Medium", "Low"):
+        if level in priority:
+            return level.lower()
+    return None
+
+
+def matching_rules(
+    high, medium, low,
+    meeting_minutes, longest_focus_minutes, back_to_back_chains,
+    steps, step_goal, active_minutes, active_minute_goal,
+) -> list:
+    """Names of the rules that fire, in the order they are considered."""
+    fired = []
+    if high > 0:
+        fired.append("jira_high")
+    elif medium > 0:
+        fired.append("jira_medium")
+    elif low > 0:
+        fired.append("jira_low")
+
+    if meeting_minutes >= BUSY_MEETING_MINUTES or longest_focus_minutes < MIN_FOCUS_MINUTES:
+        fired.append("calendar_busy")
+    elif meeting_minutes >= BALANCED_MEETING_MINUTES:
+        fired.append("calendar_balanced")
+    else:
+        fired.append("calendar_light")
+    if back_to_back_chains > 0:
+        fired.append("calendar_back_to_back")
+
+    if steps < 0.7 * step_goal:
+        fired.append("fitness_steps")
+    if active_minutes < 0.7 * active_minute_goal:
+        fired.append("fitness_active")
+    return fired
+
+
+def render_rule(rule: str, **values) -> dict:
+    priority, template = RULES[rule]
+    return {"priority": priority, "type": rule.split("_")[0], "message": template.format(**values)}
+
+
+def top_recommendation(
+    high, medium, low,
+    meeting_minutes, longest_focus_minutes, back_to_back_chains,
+    steps, step_goal, active_minutes, active_minute_goal,
+) -> dict:
+    """The highest-priority rule that fires; earlier rules win ties."""
+    values = dict(
+        high=high, medium=medium, low=low,
+        meeting_minutes=meeting_minutes, longest_focus_minutes=longest_focus_minutes,
+        back_to_back_chains=back_to_back_chains,
+        steps=steps, step_goal=step_goal,
+        active_minutes=active_minutes, active_minute_goal=active_minute_goal,
+    )
+    fired = matching_rules(**values)
+    if not fired:
+        return dict(GENERAL_RECOMMENDATION)
+    rule = min(fired, key=lambda name: RULES[name][0])
+    return render_rule(rule, **values)
@@ -1,9 +1,10 @@
 from datetime import datetime
 from app.database import tokens_collection
+from app.utils.projections import TOKEN_VALUE
 
-def save_token(user_id: str, provider: str, token_data: dict):
+async def save_token(user_id: str, provider: str, token_data: dict):
     """Upserts the OAuth token for the given user and provider."""
-    tokens_collection.update_one(
+    await tokens_collection.update_one(
         {"user_id": user_id, "provider": provider},
         {
             "$set": {
@@ -14,9 +15,9 @@ def save_token(user_id: str, provider: str, token_data: dict):
         upsert=True
     )
 
-def get_token(user_id: str, provider: str):
+async def get_token(user_id: str, provider: str):
     """Retrieve stored token for user/provider if it exists."""
-    record = tokens_collection.find_one({"user_id": user_id, "provider": provider})
+    record = await tokens_collection.find_one({"user_id": user_id, "provider": provider}, TOKEN_VALUE)
     return record.get("token") if record else None
 
 
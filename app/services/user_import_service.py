@@ -0,0 +1,223 @@
+"""
+Admin bulk operations on users: streamed CSV/NDJSON import and goal updates.
+
+Rows are validated and written in batches of USER_IMPORT_BATCH_SIZE: one `$in`
+lookup for already-registered emails, bcrypt on a dedicated thread pool (so
+logins keep the default threadpool), then one unordered `bulk_write`. A bad
+row never stops the import; it is reported with its row number instead.
+"""
+import asyncio
+import csv
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import orjson
+from bson import ObjectId
+from fastapi import HTTPException
+from pydantic import ValidationError
+from pymongo import InsertOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config import USER_IMPORT_BATCH_SIZE, USER_IMPORT_HASH_WORKERS, USER_IMPORT_MAX_ERRORS
+from app.database import users_collection
+from app.schemas.user_schema import BulkGoalUpdate, UserImportRow
+from app.utils.auth_utils import hash_password
+from app.utils.projections import USER_EMAIL
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+_hash_pool = None
+
+
+def _get_hash_pool() -> ThreadPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ThreadPoolExecutor(max_workers=USER_IMPORT_HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _hash_pool
+
+
+# ----------------------- PARSING -----------------------
+
+async def _lines(chunks):
+    """Split a byte stream into decoded lines without buffering the whole body."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+async def _rows(chunks, fmt: str):
+    """
+    Yield `(row_number, fields)` per non-empty line; `fields` is a ValueError for
+    lines that can't be parsed. CSV needs a header line and no quoted newlines.
+    """
+    header = None
+    row_number = 0
+    async for line in _lines(chunks):
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = [name.strip() for name in next(csv.reader([line]))]
+            continue
+        row_number += 1
+        try:
+            if fmt == "ndjson":
+                fields = orjson.loads(line)
+                if not isinstance(fields, dict):
+                    raise ValueError("Expected a JSON object")
+            else:
+                values = next(csv.reader([line]))
+                if len(values) != len(header):
+                    raise ValueError(f"Expected {len(header)} columns, got {len(values)}")
+                fields = dict(zip(header, values))
+        except (ValueError, csv.Error) as e:
+            fields = ValueError(f"Unparseable row: {e}")
+        yield row_number, fields
+
+
+# ----------------------- IMPORT -----------------------
+
+def _fail(report: dict, row_number: int, email, error: str):
+    report["failed"] += 1
+    if len(report["errors"]) < USER_IMPORT_MAX_ERRORS:
+        report["errors"].append({"row": row_number, "email": email, "error": error})
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors())
+
+
+async def _import_batch(batch: list, seen_emails: set, report: dict):
+    rows = []
+    for row_number, fields in batch:
+        if isinstance(fields, Exception):
+            _fail(report, row_number, None, str(fields))
+            continue
+        try:
+            # Empty CSV cells mean "not provided"
+            row = UserImportRow.model_validate({k: v for k, v in fields.items() if v not in ("", None)})
+        except ValidationError as e:
+            _fail(report, row_number, fields.get("email"), _validation_message(e))
+            continue
+        if row.email in seen_emails:
+            _fail(report, row_number, row.email, "Duplicate email in import")
+            continue
+        seen_emails.add(row.email)
+        rows.append((row_number, row))
+
+    existing = {
+        doc["email"]
+        for doc in await users_collection.find(
+            {"email": {"$in": [row.email for _, row in rows]}}, USER_EMAIL
+        ).to_list()
+    }
+    for row_number, row in rows:
+        if row.email in existing:
+            _fail(report, row_number, row.email, "Email already registered")
+    rows = [(row_number, row) for row_number, row in rows if row.email not in existing]
+    if not rows:
+        return
+
+    loop = asyncio.get_running_loop()
+    hashes = await asyncio.gather(
+        *(loop.run_in_executor(_get_hash_pool(), hash_password, row.password) for _, row in rows)
+    )
+
+    now = datetime.utcnow()
+    documents = [
+        {**row.model_dump(exclude={"password"}, exclude_none=True), "password": hashed, "created_at": now, "updated_at": now}
+        for (_, row), hashed in zip(rows, hashes)
+    ]
+    try:
+        result = await users_collection.bulk_write([InsertOne(doc) for doc in documents], ordered=False)
+        report["inserted"] += result.inserted_count
+    except BulkWriteError as e:
+        report["inserted"] += e.details.get("nInserted", 0)
+        for write_error in e.details.get("writeErrors", []):
+            row_number, row = rows[write_error["index"]]
+            _fail(report, row_number, row.email, write_error.get("errmsg", "Write failed"))
+
+
+async def import_users(chunks, fmt: str) -> dict:
+    """
+    Import users from a CSV (header line) or NDJSON byte stream. Returns
+    counts and per-row errors (the first USER_IMPORT_MAX_ERRORS of them).
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=415, detail=f"Unsupported import format; use one of {IMPORT_FORMATS}")
+
+    report = {"inserted": 0, "failed": 0, "errors": []}
+    seen_emails = set()
+    batch = []
+    try:
+        async for row in _rows(chunks, fmt):
+            batch.append(row)
+            if len(batch) >= USER_IMPORT_BATCH_SIZE:
+                await _import_batch(batch, seen_emails, report)
+                batch = []
+        if batch:
+            await _import_batch(batch, seen_emails, report)
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Import must be UTF-8: {e}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error importing users after {report['inserted']} inserted: {e}")
+        raise HTTPException(status_code=500, detail=f"Error importing users: {e}")
+
+    report["errors"].sort(key=lambda error: error["row"])
+    report["errors_truncated"] = report["failed"] > len(report["errors"])
+    return report
+
+
+# ----------------------- GOALS -----------------------
+
+async def bulk_update_goals(update: BulkGoalUpdate) -> dict:
+    """
+    Apply per-department goal defaults, then per-user goals, each as one
+    unordered `bulk_write`. Department defaults only fill goals a user hasn't
+    set unless `overwrite` is true.
+    """
+    invalid = [user_id for user_id in update.users if not ObjectId.is_valid(user_id)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid user_id(s): {invalid}")
+
+    now = datetime.utcnow()
+    department_ops = []
+    for department_id, goals in update.departments.items():
+        values = goals.model_dump(exclude_none=True)
+        if update.overwrite and values:
+            department_ops.append(UpdateMany({"department_id": department_id}, {"$set": {**values, "updated_at": now}}))
+        elif values:
+            department_ops += [
+                UpdateMany(
+                    {"department_id": department_id, field: {"$exists": False}},
+                    {"$set": {field: value, "updated_at": now}},
+                )
+                for field, value in values.items()
+            ]
+    user_ops = [
+        UpdateOne({"_id": ObjectId(user_id)}, {"$set": {**values, "updated_at": now}})
+        for user_id, goals in update.users.items()
+        if (values := goals.model_dump(exclude_none=True))
+    ]
+    if not department_ops and not user_ops:
+        raise HTTPException(status_code=400, detail="No goals to update")
+
+    try:
+        summary = {"department_updates": 0, "users_matched": 0, "users_modified": 0}
+        # Users second, so their own goals win over the department defaults
+        if department_ops:
+            result = await users_collection.bulk_write(department_ops, ordered=False)
+            summary["department_updates"] = result.modified_count
+        if user_ops:
+            result = await users_collection.bulk_write(user_ops, ordered=False)
+            summary["users_matched"] = result.matched_count
+            summary["users_modified"] = result.modified_count
+        return summary
+    except Exception as e:
+        logging.error(f"Error updating goals in bulk: {e}")
+        raise HTTPException(status_code=500, detail=f"Error updating goals: {e}")
@@ -0,0 +1,139 @@
+import asyncio
+import hmac
+import logging
+from datetime import datetime, timedelta
+import jwt
+from app.config import (
+    JIRA_CLIENT_SECRET,
+    SUBSCRIPTION_RENEW_BEFORE_SECONDS,
+    SUBSCRIPTION_RENEW_INTERVAL_SECONDS,
+)
+from app.database import calendar_channels_collection, jira_webhooks_collection
+from app.services.google_service import (
+    invalidate_events_cache,
+    start_calendar_watch,
+    stop_calendar_watch,
+)
+from app.services.jira_service import (
+    apply_issue_event,
+    invalidate_tickets_cache,
+    refresh_jira_webhook,
+)
+from app.services.rate_limiter import background_priority
+from app.utils.projections import CALENDAR_CHANNEL, JIRA_WEBHOOK
+
+# How long a worker holds a subscription while renewing it
+RENEW_CLAIM_SECONDS = 300
+
+
+# ----------------------- GOOGLE CALENDAR -----------------------
+
+async def handle_calendar_notification(
+    channel_id: str, channel_token: str, resource_id: str, resource_state: str
+) -> bool:
+    """
+    Invalidate the cached events of the user who owns the channel.
+    Returns False for unknown channels or a token/resource mismatch; a channel
+    whose `events.watch` call hasn't returned yet has no resource id to compare.
+    """
+    channel = await calendar_channels_collection.find_one({"channel_id": channel_id}, CALENDAR_CHANNEL)
+    if (
+        not channel
+        or not hmac.compare_digest(channel["token"], channel_token or "")
+        or channel["resource_id"] not in (None, resource_id)
+    ):
+        return False
+
+    # "sync" only confirms that the channel was created
+    if resource_state != "sync":
+        await invalidate_events_cache(channel["user_id"])
+    return True
+
+
+# ----------------------- JIRA -----------------------
+
+def verify_jira_signature(authorization: str) -> bool:
+    """Jira signs webhooks for OAuth apps with a JWT using the app's client secret."""
+    if not authorization or not authorization.startswith("Bearer "):
+        return False
+    try:
+        jwt.decode(
+            authorization[len("Bearer "):],
+            JIRA_CLIENT_SECRET,
+            algorithms=["HS256"],
+            options={"verify_aud": False},
+        )
+    except jwt.InvalidTokenError:
+        return False
+    return True
+
+
+async def handle_jira_event(payload: dict) -> list:
+    """Apply the issue to the stored issues of every user whose webhook matched (or force a resync)."""
+    webhook_ids = payload.get("matchedWebhookIds", [])
+    event = payload.get("webhookEvent")
+    issue = payload.get("issue") or {}
+
+    user_ids = []
+    async for doc in jira_webhooks_collection.find({"webhook_ids": {"$in": webhook_ids}}, JIRA_WEBHOOK):
+        user_id = doc["user_id"]
+        if not await apply_issue_event(user_id, event, issue, doc.get("account_id")):
+            await invalidate_tickets_cache(user_id)
+        user_ids.append(user_id)
+    return user_ids
+
+
+# ----------------------- RENEWAL -----------------------
+
+async def _claim_expiring(collection, projection: dict):
+    """Atomically claim one subscription that expires soon, so only one worker renews it."""
+    now = datetime.utcnow()
+    return await collection.find_one_and_update(
+        {
+            "expiration": {"$lt": now + timedelta(seconds=SUBSCRIPTION_RENEW_BEFORE_SECONDS)},
+            "renewing_until": {"$not": {"$gt": now}},
+        },
+        {"$set": {"renewing_until": now + timedelta(seconds=RENEW_CLAIM_SECONDS)}},
+        projection=projection,
+    )
+
+
+async def renew_expiring_subscriptions() -> int:
+    """Renew Calendar channels and Jira webhooks before they expire; returns how many were renewed."""
+    renewed = 0
+
+    while channel := await _claim_expiring(calendar_channels_collection, CALENDAR_CHANNEL):
+        try:
+            # Open the replacement first so no notification window is missed
+            await start_calendar_watch(channel["user_id"])
+            await stop_calendar_watch(channel)
+            renewed += 1
+        except Exception as e:
+            logging.error(f"Error renewing calendar channel for user {channel['user_id']}: {e}")
+            if channel["expiration"] < datetime.utcnow():
+                # Already dead on Google's side (e.g. user disconnected) → stop retrying
+                await calendar_channels_collection.delete_one({"channel_id": channel["channel_id"]})
+
+    while webhook := await _claim_expiring(jira_webhooks_collection, JIRA_WEBHOOK):
+        try:
+            await refresh_jira_webhook(webhook)
+            renewed += 1
+        except Exception as e:
+            logging.error(f"Error refreshing Jira webhook for user {webhook['user_id']}: {e}")
+            if webhook["expiration"] < datetime.utcnow():
+                await jira_webhooks_collection.delete_one({"user_id": webhook["user_id"]})
+
+    return renewed
+
+
+async def renewal_loop():
+    """Background task: periodically renew push subscriptions."""
+    background_priority()
+    while True:
+        try:
+            renewed = await renew_expiring_subscriptions()
+            if renewed:
+                logging.info(f"Renewed {renewed} push subscription(s)")
+        except Exception as e:
+            logging.error(f"Error renewing push subscriptions: {e}")
+        await asyncio.sleep(SUBSCRIPTION_RENEW_INTERVAL_SECONDS)
@@ -1,43 +1,67 @@
-from datetime import date, datetime, timedelta
+import asyncio
+from datetime import datetime, timedelta
 from fastapi import HTTPException
 import logging
 from statistics import mean
-from app.database import wellness_collection, tokens_collection
+from app.config import (
+    WELLNESS_FITNESS_TTL_MINUTES,
+    WELLNESS_JIRA_TTL_MINUTES,
+    WELLNESS_CALENDAR_TTL_MINUTES,
+)
+from bson import ObjectId
+from app.database import wellness_collection, users_collection
+from app.utils.projections import USER_GOALS, WELLNESS_DAILY, WELLNESS_SCORES
+from app.utils.timezone_utils import today_utc
 from app.services.google_service import (
     get_daily_steps_from_google,
     get_daily_calories_from_google,
     get_daily_active_minutes_from_google,
-    get_month_events,
+    get_calendar_day,
 )
 from app.services.jira_service import get_high_priority_tickets_for_user
+from app.services.resilience import UpstreamUnavailable, mark_degraded
+from app.services.write_behind import wellness_writes
+from app.services.scoring import (
+    WEIGHTS,
+    WELLNESS_GOAL_DEFAULTS,
+    goals_with_defaults,
+    fitness_score,
+    JIRA_COUNT_FIELDS,
+    jira_score,
+    calendar_score,
+    total_score,
+)
 
-
-# ✅ Weightage Configuration
-WEIGHTS = {
-    "fitness": 0.4,
-    "jira": 0.4,
-    "calendar": 0.2
+# ⏳ How long each stored component stays fresh
+COMPONENT_TTLS = {
+    "fitness": timedelta(minutes=WELLNESS_FITNESS_TTL_MINUTES),
+    "jira": timedelta(minutes=WELLNESS_JIRA_TTL_MINUTES),
+    "calendar": timedelta(minutes=WELLNESS_CALENDAR_TTL_MINUTES),
 }
 
 
 # ----------------------- FITNESS SCORING -----------------------
 
-def calculate_fitness_score(user_doc: dict, user_id: str):
-    """Calculate fitness score based on Google Fit data vs goals."""
-    try:
-        steps = get_daily_steps_from_google(user_id)
-        calories = get_daily_calories_from_google(user_id)
-        active_minutes = get_daily_active_minutes_from_google(user_id)
-
-        step_goal = user_doc.get("step_goal", 8000)
-        calorie_goal = user_doc.get("calorie_goal", 2200)
-        active_goal = user_doc.get("active_minute_goal", 30)
+async def calculate_fitness_score(user_doc: dict, user_id: str, fitness: dict = None):
+    """Calculate fitness score based on Google Fit data vs goals.
 
-        steps_ratio = min(steps / step_goal, 1.0)
-        calories_ratio = min(calories / calorie_goal, 1.0)
-        active_ratio = min(active_minutes / active_goal, 1.0)
-
-        score = round((steps_ratio * 0.5 + calories_ratio * 0.3 + active_ratio * 0.2) * 100, 2)
+    `fitness` is an already-fetched daily snapshot; without it Google Fit is queried.
+    """
+    try:
+        if fitness is not None:
+            steps, calories, active_minutes = fitness["steps"], fitness["calories"], fitness["active_minutes"]
+        else:
+            steps, calories, active_minutes = await asyncio.gather(
+                get_daily_steps_from_google(user_id),
+                get_daily_calories_from_google(user_id),
+                get_daily_active_minutes_from_google(user_id),
+            )
+
+        goals = goals_with_defaults(user_doc, WELLNESS_GOAL_DEFAULTS)
+        score = fitness_score(
+            steps, calories, active_minutes,
+            goals["step_goal"], goals["calorie_goal"], goals["active_minute_goal"],
+        )
 
         return {
             "steps": steps,
@@ -46,6 +70,8 @@ def calculate_fitness_score(user_doc: dict, user_id: str):
             "score": score
         }
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logging.error(f"Error calculating fitness score for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Error calculating fitness score: {e}")
@@ -53,30 +79,15 @@ def calculate_fitness_score(user_doc: dict, user_id: str):
 
 # ----------------------- JIRA SCORING -----------------------
 
-def calculate_jira_score(user_id: str):
-    """Calculate Jira productivity score based on high-priority tickets."""
+async def calculate_jira_score(user_id: str, counts: dict = None):
+    """Calculate Jira productivity score from the stored issue counts (open and recently resolved)."""
     try:
-        jira_data = get_high_priority_tickets_for_user(user_id)
-        tickets = jira_data.get("tickets", [])
-
-        total_tickets = len(tickets)
-        if total_tickets == 0:
-            return {"tickets": [], "score": 100.0}
-
-        completed_tickets = sum(1 for t in tickets if t["status"].lower() in ["done", "resolved"])
-        in_progress = sum(1 for t in tickets if t["status"].lower() in ["in progress", "in-review"])
+        if counts is None:
+            jira_data = await get_high_priority_tickets_for_user(user_id)
+            counts = jira_data["counts"]
 
-        completion_ratio = completed_tickets / total_tickets
-        progress_ratio = in_progress / total_tickets
-
-        score = round((completion_ratio * 0.8 + progress_ratio * 0.2) * 100, 2)
-
-        return {
-            "total_tickets": total_tickets,
-            "completed_tickets": completed_tickets,
-            "in_progress_tickets": in_progress,
-            "score": score
-        }
+        counts = {field: counts[field] for field in JIRA_COUNT_FIELDS}
+        return {**counts, "score": jira_score(**counts)}
 
     except HTTPException as e:
         raise e
@@ -87,27 +98,19 @@ def calculate_jira_score(user_id: str):
 
 # ----------------------- CALENDAR SCORING -----------------------
 
-def calculate_calendar_score(user_id: str):
-    """Calculate calendar score based on user's meeting balance."""
+async def calculate_calendar_score(user_id: str, day: dict = None):
+    """Calculate calendar score from today's meeting load, focus time and back-to-back chains."""
     try:
-        events = get_month_events(user_id)
-        today_str = date.today().isoformat()
-        today_events = [e for e in events if e["start"].startswith(today_str)]
-
-        total_meetings = len(today_events)
-        if total_meetings == 0:
-            return {"meetings": 0, "score": 100.0}
-
-        # 4–6 meetings/day ideal
-        if total_meetings <= 2:
-            score = 70.0
-        elif 3 <= total_meetings <= 6:
-            score = 100.0
-        else:
-            score = max(60.0, 120 - total_meetings * 10)
-
-        return {"meetings": total_meetings, "score": round(score, 2)}
+        if day is None:
+            day = await get_calendar_day(user_id, today_utc())
+        score = calendar_score(
+            day["meeting_minutes"], day["longest_focus_minutes"],
+            day["back_to_back_chains"], day["overlapping_meetings"],
+        )
+        return {**day, "score": score}
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logging.error(f"Error calculating calendar score for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Error calculating calendar score: {e}")
@@ -115,52 +118,98 @@ def calculate_calendar_score(user_id: str):
 
 # ----------------------- DAILY AGGREGATION -----------------------
 
-async def compute_and_store_daily_score(user_id: str):
-    """Compute or reuse wellness score (only recompute after 6 hours)."""
+def _stale_components(record: dict, now: datetime) -> list:
+    """Return the components whose stored value is missing or past its TTL."""
+    if not record:
+        return list(COMPONENT_TTLS)
+
+    updated = record.get("component_updated", {})
+    # Records written before per-component timestamps share one `last_updated`
+    fallback = record.get("last_updated")
+
+    stale = []
+    for name, ttl in COMPONENT_TTLS.items():
+        stamp = updated.get(name) or fallback
+        if name not in record or not stamp or now - datetime.fromisoformat(stamp) >= ttl:
+            stale.append(name)
+    return stale
+
+
+def _total_score(record: dict) -> float:
+    return total_score(*(record[name]["score"] for name in WEIGHTS))
+
+
+async def compute_and_store_daily_score(user_id: str, snapshot: dict = None):
+    """Compute today's wellness score, recomputing only the components whose TTL has expired.
+
+    `snapshot` carries data the caller already fetched (`user`, `fitness`, `jira`
+    issue counts, `calendar` day index). Components present in it are rescored from it
+    regardless of TTL, since doing so costs no upstream call; a source stored
+    as an exception failed to fetch and is raised rather than fetched again.
+    When a provider is unavailable, today's stored record is served with `degraded: true`.
+    """
+    snapshot = snapshot or {}
     try:
-        user_doc = tokens_collection.find_one({"user_id": user_id})
-        print(user_doc)
-        if not user_doc:
+        if not ObjectId.is_valid(user_id):
+            raise HTTPException(status_code=400, detail="Invalid user_id")
+
+        # Only the goals are needed for scoring
+        user_doc = snapshot.get("user")
+        if user_doc is None:
+            user_doc = await users_collection.find_one({"_id": ObjectId(user_id)}, USER_GOALS)
+        if user_doc is None:
             raise HTTPException(status_code=404, detail="User not found")
 
-        today_str = date.today().isoformat()
-        existing_record = wellness_collection.find_one({"user_id": user_id, "date": today_str})
-
-        if existing_record:
-            last_updated = existing_record.get("last_updated")
-            if last_updated:
-                last_updated_dt = datetime.fromisoformat(last_updated)
-                if datetime.utcnow() - last_updated_dt < timedelta(hours=6):
-                    # ⏳ Reuse existing score if within 6 hours
-                    return existing_record
-
-        # 🔄 Compute fresh scores
-        fitness_data = calculate_fitness_score(user_doc, user_id)
-        jira_data = calculate_jira_score(user_id)
-        calendar_data = calculate_calendar_score(user_id)
-
-        total_score = round(
-            fitness_data["score"] * WEIGHTS["fitness"]
-            + jira_data["score"] * WEIGHTS["jira"]
-            + calendar_data["score"] * WEIGHTS["calendar"],
-            2,
-        )
-
-        record = {
-            "user_id": user_id,
-            "date": today_str,
-            "fitness": fitness_data,
-            "jira": jira_data,
-            "calendar": calendar_data,
-            "total_score": total_score,
-            "last_updated": datetime.utcnow().isoformat(),
+        today_str = today_utc()
+        key = {"user_id": user_id, "date": today_str}
+        existing_record = wellness_writes.overlay(key, await wellness_collection.find_one(key, WELLNESS_DAILY))
+
+        now = datetime.utcnow()
+        stale = _stale_components(existing_record, now)
+        stale += [name for name in COMPONENT_TTLS if name in snapshot and name not in stale]
+        if not stale:
+            # ⏳ Every component is still fresh
+            return existing_record
+
+        # 🔄 Recompute only the stale components, concurrently
+        calculators = {
+            "fitness": lambda: calculate_fitness_score(user_doc, user_id, snapshot.get("fitness")),
+            "jira": lambda: calculate_jira_score(user_id, snapshot.get("jira")),
+            "calendar": lambda: calculate_calendar_score(user_id, snapshot.get("calendar")),
         }
+        try:
+            for name in stale:
+                if isinstance(snapshot.get(name), Exception):
+                    raise snapshot[name]
+            results = await asyncio.gather(*(calculators[name]() for name in stale))
+        except UpstreamUnavailable as e:
+            if not existing_record:
+                raise
+            # 🛟 Last stored score beats an error while a provider is down
+            mark_degraded(e.provider)
+            return {**existing_record, "degraded": True}
+        now_iso = now.isoformat()
+        record = {**(existing_record or {}), "user_id": user_id, "date": today_str}
+        # Pin the old shared timestamp on components we keep, so bumping
+        # `last_updated` below doesn't extend their freshness
+        component_updated = {
+            name: record.get("component_updated", {}).get(name) or record.get("last_updated")
+            for name in COMPONENT_TTLS
+        }
+        for name, result in zip(stale, results):
+            record[name] = result
+            component_updated[name] = now_iso
 
-        wellness_collection.update_one(
-            {"user_id": user_id, "date": today_str},
-            {"$set": record},
-            upsert=True,
-        )
+        record["component_updated"] = component_updated
+        record["total_score"] = _total_score(record)
+        record["last_updated"] = now_iso
+
+        updates = {name: record[name] for name in stale}
+        updates.update({f"component_updated.{name}": stamp for name, stamp in component_updated.items()})
+        updates["total_score"] = record["total_score"]
+        updates["last_updated"] = now_iso
+
+        await wellness_writes.upsert(key, updates)
 
         return record
 
@@ -176,7 +225,9 @@ async def compute_and_store_daily_score(user_id: str):
 async def compute_overall_wellness_score(user_id: str):
     """Compute the user's overall average wellness score."""
     try:
-        records = list(wellness_collection.find({"user_id": user_id}))
+        # Averages read many days; write this user's buffered day out first
+        await wellness_writes.flush(user_id=user_id)
+        records = await wellness_collection.find({"user_id": user_id}, WELLNESS_SCORES).to_list()
         if not records:
             raise HTTPException(status_code=404, detail="No wellness data found for user")
 
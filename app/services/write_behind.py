@@ -0,0 +1,186 @@
+"""
+Opt-in write-behind for per-day documents (wellness scores, attendance).
+
+With WRITE_BEHIND_ENABLED, `upsert` only records the `$set` in memory,
+coalesced per document key (e.g. `(user_id, date)`), so a burst of rescoring
+or check-ins for the same day becomes one write. Pending writes are flushed
+as one unordered `bulk_write` when WRITE_BEHIND_MAX_BATCH documents are
+pending or every WRITE_BEHIND_FLUSH_SECONDS, and on shutdown before the
+Mongo client closes. Readers in this process see pending writes through
+`overlay`; other workers see them once flushed. A crash loses at most one
+flush interval of writes, which is the trade-off of turning it on.
+
+Disabled (the default), `upsert` is a plain `update_one(..., upsert=True)`.
+"""
+import asyncio
+import logging
+import time
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config import WRITE_BEHIND_ENABLED, WRITE_BEHIND_MAX_BATCH, WRITE_BEHIND_FLUSH_SECONDS
+from app.database import attendance_collection, wellness_collection
+from app.utils import metrics
+
+metrics.describe("write_behind_pending", "Documents with buffered writes, by buffer")
+metrics.describe("write_behind_coalesced_total", "Upserts merged into an already-pending write, by buffer")
+metrics.describe("write_behind_flush_seconds", "Duration of one write-behind bulk_write, by buffer")
+metrics.describe("write_behind_batch_size", "Documents written per write-behind flush, by buffer")
+metrics.describe("write_behind_failures_total", "Failed write-behind flushes/writes, by buffer and outcome")
+
+
+def _apply_set(doc: dict, fields: dict) -> dict:
+    """`doc` with a `$set` (dotted paths allowed) applied, without mutating it."""
+    doc = dict(doc)
+    for path, value in fields.items():
+        *parents, leaf = path.split(".")
+        target = doc
+        for name in parents:
+            target[name] = dict(target.get(name) or {})
+            target = target[name]
+        target[leaf] = value
+    return doc
+
+
+class WriteBuffer:
+    def __init__(self, name: str, collection, key_fields: tuple, enabled: bool = WRITE_BEHIND_ENABLED):
+        self.name = name
+        self.collection = collection
+        self.key_fields = key_fields
+        self.enabled = enabled
+        self._pending = {}  # key tuple -> merged $set
+        self._inflight = {}  # key tuple -> $set being written by the current flush
+        self._lock = asyncio.Lock()
+        self._flush_task = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _key(self, doc: dict) -> tuple:
+        return tuple(doc[field] for field in self.key_fields)
+
+    def _report_pending(self):
+        metrics.set_gauge("write_behind_pending", len(self._pending), buffer=self.name)
+
+    async def upsert(self, key: dict, fields: dict):
+        """
+        `$set` `fields` on the document matching `key` (all of `key_fields`),
+        creating it if missing. Returns the new `_id` when written through and
+        a document was created; None otherwise.
+        """
+        if not self.enabled:
+            result = await self.collection.update_one(key, {"$set": fields}, upsert=True)
+            return result.upserted_id
+
+        pending_key = self._key(key)
+        if pending_key in self._pending:
+            metrics.inc("write_behind_coalesced_total", buffer=self.name)
+        self._pending[pending_key] = {**self._pending.get(pending_key, {}), **fields}
+        self._report_pending()
+        if len(self._pending) >= WRITE_BEHIND_MAX_BATCH and not (self._flush_task and not self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._flush_in_background())
+
+    async def update(self, key: dict, fields: dict, projection: dict):
+        """
+        `$set` `fields` on an existing document only; returns it after the
+        update (with `projection`), or None when there is no such document.
+        """
+        if not self.enabled:
+            return await self.collection.find_one_and_update(
+                key, {"$set": fields}, projection=projection, return_document=True
+            )
+        current = self.overlay(key, await self.collection.find_one(key, projection))
+        if current is None:
+            return None
+        await self.upsert(key, fields)
+        return _apply_set(current, fields)
+
+    def overlay(self, key: dict, doc):
+        """`doc` as stored (or None) with this process's pending write for `key` applied."""
+        pending_key = self._key(key)
+        # A flush in progress is neither pending nor (yet) readable from Mongo
+        writes = [w for w in (self._inflight.get(pending_key), self._pending.get(pending_key)) if w is not None]
+        if not writes:
+            return doc
+        doc = doc if doc is not None else dict(key)
+        for fields in writes:
+            doc = _apply_set(doc, fields)
+        return doc
+
+    async def flush(self, **match) -> int:
+        """
+        Write pending documents (only those whose key fields equal `match`, if
+        given) in one unordered bulk_write. Flushes never overlap, so an older
+        value can't land after a newer one. Returns documents written.
+        """
+        async with self._lock:
+            keys = [
+                key for key in self._pending
+                if all(key[self.key_fields.index(field)] == value for field, value in match.items())
+            ]
+            if not keys:
+                return 0
+            batch = {key: self._pending.pop(key) for key in keys}
+            self._inflight = batch
+            self._report_pending()
+
+            operations = [
+                UpdateOne(dict(zip(self.key_fields, key)), {"$set": fields}, upsert=True)
+                for key, fields in batch.items()
+            ]
+            started = time.perf_counter()
+            try:
+                await self.collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as e:
+                # Rejected documents won't succeed on retry; the rest were written
+                errors = e.details.get("writeErrors", [])
+                metrics.inc("write_behind_failures_total", len(errors), buffer=self.name, outcome="dropped")
+                logging.error(f"Write-behind {self.name}: dropped {len(errors)} rejected write(s): {errors[:3]}")
+            except Exception as e:
+                # Mongo unreachable: keep the batch, under anything written since
+                for key, fields in batch.items():
+                    self._pending[key] = {**fields, **self._pending.get(key, {})}
+                self._report_pending()
+                metrics.inc("write_behind_failures_total", buffer=self.name, outcome="requeued")
+                logging.error(f"Write-behind {self.name}: flush of {len(batch)} document(s) failed, requeued: {e}")
+                raise
+            finally:
+                self._inflight = {}
+                metrics.observe("write_behind_flush_seconds", time.perf_counter() - started, buffer=self.name)
+                metrics.observe("write_behind_batch_size", len(batch), buffer=self.name)
+            return len(batch)
+
+    async def _flush_in_background(self):
+        try:
+            await self.flush()
+        except Exception:
+            pass  # requeued and logged; the interval flush retries
+
+
+wellness_writes = WriteBuffer("wellness", wellness_collection, ("user_id", "date"))
+attendance_writes = WriteBuffer("attendance", attendance_collection, ("employee_id", "date"))
+WRITE_BUFFERS = (wellness_writes, attendance_writes)
+
+
+async def flush_write_buffers(attempts: int = 3):
+    """Flush everything pending; called on shutdown before the Mongo client closes."""
+    for buffer in WRITE_BUFFERS:
+        for attempt in range(1, attempts + 1):
+            try:
+                await buffer.flush()
+                break
+            except Exception:
+                if attempt == attempts:
+                    logging.error(f"Write-behind {buffer.name}: {len(buffer)} document(s) lost on shutdown")
+                else:
+                    await asyncio.sleep(attempt)
+
+
+async def write_behind_loop():
+    """Background task: flush the buffers every WRITE_BEHIND_FLUSH_SECONDS."""
+    while True:
+        await asyncio.sleep(WRITE_BEHIND_FLUSH_SECONDS)
+        for buffer in WRITE_BUFFERS:
+            try:
+                await buffer.flush()
+            except Exception:
+                pass  # requeued and logged; retried next interval
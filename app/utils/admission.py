@@ -0,0 +1,121 @@
+"""
+Admission control: every route belongs to a cost class with its own
+concurrency cap and queue. When a class is saturated, new requests queue
+briefly; past the queue depth (or the queue timeout) they are shed with a
+fast 503 + Retry-After, so a stampede on aggregate routes can't starve
+cheap ones like attendance check-ins.
+"""
+import asyncio
+import time
+from app.config import (
+    ADMISSION_LIMITS,
+    ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ADMISSION_RETRY_AFTER_SECONDS,
+)
+from app.utils import metrics
+from app.utils.responses import FastJSONResponse
+
+# Path prefix -> cost class; the longest matching prefix wins, default "cheap"
+ROUTE_COST_CLASSES = {
+    "/api/ai": "aggregate",
+    "/api/wellness": "aggregate",
+    "/api/dashboard": "aggregate",
+    "/api/admin": "aggregate",
+    "/api/google": "upstream",
+    "/api/jira": "upstream",
+    "/permissions/google/callback": "upstream",
+    "/permissions/jira/callback": "upstream",
+}
+DEFAULT_COST_CLASS = "cheap"
+# Never shed: probes, metrics and provider push notifications
+EXEMPT_PREFIXES = ("/healthz", "/readyz", "/metrics", "/webhooks")
+
+metrics.describe("admission_in_flight", "Requests currently admitted, by cost class")
+metrics.describe("admission_queued", "Requests waiting for admission, by cost class")
+metrics.describe("admission_rejected_total", "Requests shed with 503, by cost class and reason")
+metrics.describe("admission_wait_seconds", "Time admitted requests spent queued, by cost class")
+
+
+def cost_class(path: str) -> str:
+    matches = [prefix for prefix in ROUTE_COST_CLASSES if path.startswith(prefix)]
+    return ROUTE_COST_CLASSES[max(matches, key=len)] if matches else DEFAULT_COST_CLASS
+
+
+class CostClass:
+    def __init__(self, name: str, concurrency: int, queue: int):
+        self.name = name
+        self.queue = queue
+        self.slots = asyncio.Semaphore(concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+
+    def _publish(self):
+        metrics.set_gauge("admission_in_flight", self.in_flight, cost_class=self.name)
+        metrics.set_gauge("admission_queued", self.waiting, cost_class=self.name)
+
+    async def admit(self) -> str:
+        """Take a slot; returns None when admitted, else the reason the request is shed."""
+        if self.slots.locked():
+            if self.waiting >= self.queue:
+                return "queue_full"
+            self.waiting += 1
+            self._publish()
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(self.slots.acquire(), ADMISSION_QUEUE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                return "queue_timeout"
+            finally:
+                self.waiting -= 1
+            metrics.observe("admission_wait_seconds", time.perf_counter() - started, cost_class=self.name)
+        else:
+            await self.slots.acquire()
+        self.in_flight += 1
+        self._publish()
+        return None
+
+    def release(self):
+        self.in_flight -= 1
+        self.slots.release()
+        self._publish()
+
+
+class AdmissionControl:
+    """Pure ASGI middleware applying the per-class caps to HTTP requests."""
+
+    def __init__(self, app, limits: dict = ADMISSION_LIMITS):
+        self.app = app
+        self.classes = {name: CostClass(name, **limit) for name, limit in limits.items()}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            return await self.app(scope, receive, send)
+
+        cls = self.classes[cost_class(scope["path"])]
+        rejected = await cls.admit()
+        if rejected:
+            metrics.inc("admission_rejected_total", cost_class=cls.name, reason=rejected)
+            response = FastJSONResponse(
+                {"detail": "Server is busy, try again shortly"},
+                status_code=503,
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
+            )
+            return await response(scope, receive, send)
+
+        # The slot is freed once the response is fully sent, so background tasks
+        # that run after it (cache warm-ups, revalidation) don't hold it
+        released = False
+
+        async def send_and_release(message):
+            nonlocal released
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and not released:
+                released = True
+                cls.release()
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            if not released:
+                released = True
+                cls.release()
@@ -5,6 +5,7 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.config import JWT_SECRET, JWT_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.database import users_collection
+from app.utils.projections import USER_PROFILE
 
 security = HTTPBearer()
 
@@ -29,13 +30,19 @@ def decode_access_token(token: str):
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
     payload = decode_access_token(token)
     user_id = payload.get("user_id")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
-    user = users_collection.find_one({"_id": __import__("bson").ObjectId(user_id)})
+    user = await users_collection.find_one({"_id": __import__("bson").ObjectId(user_id)}, USER_PROFILE)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
+
+async def require_admin(current_user=Depends(get_current_user)):
+    # `is_admin` is set only in the database; `role` is the job title and comes from imports
+    if current_user.get("is_admin") is not True:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
@@ -0,0 +1,81 @@
+"""
+Response compression for large JSON bodies: brotli when the client accepts it
+and the optional `brotli` package is installed, otherwise gzip.
+
+Only complete bodies of at least `COMPRESSION_MIN_BYTES` are compressed;
+streamed responses (e.g. the NDJSON dashboard) pass through untouched so
+their sections still arrive as soon as they are ready.
+"""
+import gzip
+from starlette.datastructures import Headers, MutableHeaders
+from app.config import COMPRESSION_MIN_BYTES, GZIP_LEVEL, BROTLI_QUALITY
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+ENCODERS = {"gzip": lambda body: gzip.compress(body, compresslevel=GZIP_LEVEL)}
+if brotli is not None:
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+# Preferred first
+ENCODING_PREFERENCE = ("br", "gzip")
+
+
+def accepted_encoding(accept_encoding: str):
+    """The preferred encoding we support from an Accept-Encoding header, or None."""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            if params and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip().lower())
+    return next((enc for enc in ENCODING_PREFERENCE if enc in ENCODERS and (enc in accepted or "*" in accepted)), None)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing complete response bodies above a size threshold."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = accepted_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        pending_start = None
+
+        async def send_compressed(message):
+            nonlocal pending_start
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows whether to compress
+                pending_start = message
+                return
+            if message["type"] != "http.response.body" or pending_start is None:
+                await send(message)
+                return
+
+            start, pending_start = pending_start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=list(start["headers"]))
+            if message.get("more_body") or len(body) < self.minimum_size or "content-encoding" in headers:
+                await send(start)
+                await send(message)
+                return
+
+            compressed = ENCODERS[encoding](body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
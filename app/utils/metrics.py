@@ -0,0 +1,61 @@
+"""
+Minimal in-process metrics registry rendered in Prometheus text format at /metrics.
+Values are per worker process.
+"""
+from collections import defaultdict
+
+_counters = defaultdict(float)
+_gauges = {}
+_summaries = defaultdict(lambda: [0, 0.0])  # key -> [count, sum]
+_help = {}
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted(labels.items()))
+
+
+def describe(name: str, text: str):
+    _help[name] = text
+
+
+def inc(name: str, value: float = 1, **labels):
+    _counters[_key(name, labels)] += value
+
+
+def set_gauge(name: str, value: float, **labels):
+    _gauges[_key(name, labels)] = value
+
+
+def observe(name: str, value: float, **labels):
+    """Record one observation into a count/sum summary (e.g. latencies, batch sizes)."""
+    summary = _summaries[_key(name, labels)]
+    summary[0] += 1
+    summary[1] += value
+
+
+def _format(name: str, labels: tuple, value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{k}="{v}"' for k, v in labels)
+        return f"{name}{{{rendered}}} {value}"
+    return f"{name} {value}"
+
+
+def render() -> str:
+    lines = []
+    for kind, series in (("counter", _counters), ("gauge", _gauges)):
+        for name in sorted({name for name, _ in series}):
+            if name in _help:
+                lines.append(f"# HELP {name} {_help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (series_name, labels), value in series.items():
+                if series_name == name:
+                    lines.append(_format(name, labels, value))
+    for name in sorted({name for name, _ in _summaries}):
+        if name in _help:
+            lines.append(f"# HELP {name} {_help[name]}")
+        lines.append(f"# TYPE {name} summary")
+        for (series_name, labels), (count, total) in _summaries.items():
+            if series_name == name:
+                lines.append(_format(f"{name}_count", labels, count))
+                lines.append(_format(f"{name}_sum", labels, total))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,246 @@
+"""
+On-demand sampling profiler for a single request.
+
+An admin adds `X-Profile: 1` (or `?profile=1`) to a request. While it runs, a
+sampler thread records every PROFILE_SAMPLE_INTERVAL_MS what each of the
+request's tasks is doing:
+- the live stack of the task currently running on the event loop thread
+- the `await` chain of tasks that are suspended, which is where pymongo and
+  httpx time goes
+
+The tasks a request spawns (gather, create_task) are tracked through a
+contextvar and a task factory that is only installed while a profile is
+active.
+
+The result is stored in the cache for PROFILE_TTL_SECONDS under the id sent
+back in `X-Profile-Id`. It holds collapsed stacks (flamegraph.pl /
+speedscope format) and the time per category: app, pymongo, google, jira,
+http, other. Concurrent tasks are sampled separately, so the totals can
+exceed the wall time.
+
+Requests without the flag only pay for a header/query-string check.
+Profiles are per worker unless the cache backend is Redis.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from urllib.parse import parse_qs
+from bson import ObjectId
+from app.config import PROFILE_SAMPLE_INTERVAL_MS, PROFILE_TTL_SECONDS
+from app.database import users_collection
+from app.services import cache
+from app.utils.auth_utils import decode_access_token
+from app.utils.projections import USER_ADMIN
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Stack frames from these paths decide a sample's category (first match wins)
+CATEGORY_PATHS = (
+    ("pymongo", ("/pymongo/", "/bson/")),
+    ("http", ("/httpx/", "/httpcore/", "/h11/", "/h2/")),
+    ("app", (f"{os.sep}app{os.sep}",)),
+)
+# Upstream HTTP time is split by the service that made the call
+HTTP_CALLERS = {"google": "google_service.py", "jira": "jira_service.py"}
+
+_profile = contextvars.ContextVar("profile", default=None)
+# One profile per process at a time; the task factory and sampler are shared
+_active_lock = threading.Lock()
+
+
+def profile_key(profile_id: str) -> str:
+    return cache.cache_key("profile", "request", profile_id)
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    marker = "site-packages" + os.sep
+    if marker in path:
+        path = path.split(marker, 1)[1]
+    elif f"{os.sep}app{os.sep}" in path:
+        path = "app" + os.sep + path.rsplit(f"{os.sep}app{os.sep}", 1)[1]
+    else:
+        path = os.path.basename(path)
+    return f"{code.co_qualname} ({path}:{code.co_firstlineno})".replace(";", ",")
+
+
+def _category(codes: list) -> str:
+    paths = [code.co_filename for code in codes]
+    for category, markers in CATEGORY_PATHS:
+        if any(marker in path for path in paths for marker in markers):
+            if category == "http":
+                for caller, filename in HTTP_CALLERS.items():
+                    if any(path.endswith(filename) for path in paths):
+                        return caller
+            return category
+    return "other"
+
+
+def _await_chain(coro) -> list:
+    """Codes along a suspended coroutine's `await` chain, outermost first."""
+    codes = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        codes.append(frame.f_code)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return codes
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, loop, tasks: list, parents: dict, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.loop = loop
+        self.loop_thread_id = threading.get_ident()
+        self.tasks = tasks
+        self.parents = parents
+        self.interval = interval
+        self.stacks = Counter()
+        self.categories = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self._sample()
+            except Exception as e:  # the sampled objects change under us; skip the tick
+                logging.debug(f"Profiler sample skipped: {e}")
+
+    def _sample(self):
+        running = asyncio.current_task(self.loop)
+        loop_frame = sys._current_frames().get(self.loop_thread_id)
+        if self._stop_event.is_set():
+            return  # the request already finished; this would only catch the profiler itself
+        self.samples += 1
+        tasks = list(self.tasks)
+        waiting_on_children = {self.parents.get(task) for task in tasks if not task.done()}
+        for task in tasks:
+            if task.done():
+                continue
+            coro = task.get_coro()
+            if task is running:
+                codes = []
+                frame = loop_frame
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    if frame.f_code is getattr(coro, "cr_code", None):
+                        break  # the task's own coroutine; below it is the event loop
+                    frame = frame.f_back
+                codes.reverse()
+                leaf = []
+            elif task in waiting_on_children:
+                continue  # waiting on its child tasks (gather, wait_for, ...), which are sampled themselves
+            else:
+                codes = _await_chain(coro)
+                leaf = ["[await]"]
+            if not codes:
+                continue
+            # Prefix the spawning tasks' await chains, so a gather child keeps its caller
+            root = task
+            while root in self.parents:
+                root = self.parents[root]
+                codes = _await_chain(root.get_coro()) + codes
+            stack = [f"task:{root.get_name()}"] + [_frame_label(code) for code in codes] + leaf
+            self.stacks[";".join(stack)] += 1
+            self.categories[_category(codes)] += 1
+
+
+async def _admin_id(headers: dict):
+    """The caller's user id when the bearer token belongs to an admin, else None."""
+    authorization = headers.get(b"authorization", b"").decode()
+    if not authorization.startswith("Bearer "):
+        return None
+    try:
+        user_id = decode_access_token(authorization[len("Bearer "):]).get("user_id")
+        user = await users_collection.find_one({"_id": ObjectId(user_id)}, USER_ADMIN)
+    except Exception:
+        return None
+    return user_id if user and user.get("is_admin") is True else None
+
+
+def _wants_profile(scope) -> bool:
+    query_string = scope.get("query_string", b"")
+    if b"profile" in query_string and parse_qs(query_string.decode("latin-1")).get("profile") == ["1"]:
+        return True
+    return any(name == PROFILE_HEADER and value not in (b"", b"0") for name, value in scope["headers"])
+
+
+class RequestProfiler:
+    """Pure ASGI middleware that profiles flagged requests from admins."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        admin_id = await _admin_id(dict(scope["headers"]))
+        if not admin_id or not _active_lock.acquire(blocking=False):
+            # Not allowed, or another profile is running in this process
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        loop = asyncio.get_running_loop()
+        tasks = [asyncio.current_task()]
+        parents = {}
+        previous_factory = loop.get_task_factory()
+
+        def factory(loop, coro, **kwargs):
+            task = previous_factory(loop, coro, **kwargs) if previous_factory else asyncio.Task(coro, loop=loop, **kwargs)
+            if _profile.get() == profile_id:
+                parents[task] = asyncio.current_task(loop)
+                tasks.append(task)
+            return task
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]}
+            await send(message)
+
+        token = _profile.set(profile_id)
+        loop.set_task_factory(factory)
+        sampler = _Sampler(loop, tasks, parents, PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            loop.set_task_factory(previous_factory)
+            _profile.reset(token)
+            _active_lock.release()
+            await self._store(profile_id, scope, admin_id, time.perf_counter() - started, sampler)
+
+    async def _store(self, profile_id: str, scope, admin_id: str, duration: float, sampler: _Sampler):
+        interval = PROFILE_SAMPLE_INTERVAL_MS / 1000
+        profile = {
+            "id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "profiled_by": admin_id,
+            "duration_seconds": round(duration, 4),
+            "interval_ms": PROFILE_SAMPLE_INTERVAL_MS,
+            "samples": sampler.samples,
+            "seconds_by_category": {name: round(count * interval, 4) for name, count in sampler.categories.most_common()},
+            "collapsed": "\n".join(f"{stack} {count}" for stack, count in sampler.stacks.most_common()),
+        }
+        try:
+            await cache.put(profile_key(profile_id), profile, PROFILE_TTL_SECONDS)
+        except Exception as e:
+            logging.error(f"Could not store profile {profile_id}: {e}")
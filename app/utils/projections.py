@@ -0,0 +1,66 @@
+"""
+Named Mongo projections. Every read declares the fields it needs so hot
+paths never pull whole documents (password hashes, raw token payloads, ...).
+"""
+
+
+def fields(*names: str, include_id: bool = True) -> dict:
+    """Build an inclusion projection for the given (dotted) field names."""
+    projection = {name: 1 for name in names}
+    if not include_id:
+        projection["_id"] = 0
+    return projection
+
+
+# --- users ---
+USER_GOAL_FIELDS = ("step_goal", "calorie_goal", "active_minute_goal")
+
+# Everything `user_entity` exposes; never includes the password hash
+USER_PROFILE = fields(
+    "username", "email",
+    "first_name", "last_name", "age", "gender", "date_of_birth",
+    "employee_id", "department_id", "role", "employment_type", "location", "hire_date", "status",
+    *USER_GOAL_FIELDS,
+    "is_admin",
+    "created_at", "updated_at",
+)
+USER_LOGIN = {**USER_PROFILE, "password": 1}
+USER_GOALS = fields(*USER_GOAL_FIELDS, include_id=False)
+USER_GOALS_BY_ID = fields(*USER_GOAL_FIELDS)
+USER_TIMEZONE = fields("timezone", include_id=False)
+USER_EMAIL = fields("email", include_id=False)
+USER_ADMIN = fields("is_admin", include_id=False)
+ID_ONLY = fields()
+
+# --- user_tokens ---
+TOKEN_VALUE = fields("token", include_id=False)
+TOKEN_PROVIDER = fields("provider", include_id=False)
+JIRA_CLOUD_ID = fields("user_id", "token.cloud_id", include_id=False)
+
+# --- calendar_channels / jira_webhooks ---
+CALENDAR_CHANNEL = fields("user_id", "channel_id", "resource_id", "token", "expiration")
+JIRA_WEBHOOK = fields("user_id", "cloud_id", "webhook_ids", "account_id", "expiration")
+
+# --- jira_issues ---
+JIRA_TICKET = fields("key", "summary", "priority", "status", include_id=False)
+
+# --- fitness_daily ---
+FITNESS_HISTORY = fields("date", "steps", "calories", "active_minutes", include_id=False)
+
+# --- attendance_logs ---
+ATTENDANCE_VIEW = fields("employee_id", "date", "checkin_time", "checkout_time", "mood")
+ATTENDANCE_STALE_CHECK = fields("date", "checkin_time", "checkout_time")
+
+# --- wellness_scores ---
+WELLNESS_DAILY = fields(
+    "user_id", "date", "fitness", "jira", "calendar",
+    "total_score", "component_updated", "last_updated",
+)
+WELLNESS_INPUTS = fields(
+    "user_id",
+    "fitness.steps", "fitness.calories", "fitness.active_minutes",
+    "jira.total_tickets", "jira.completed_tickets", "jira.in_progress_tickets",
+    "calendar.meeting_minutes", "calendar.longest_focus_minutes",
+    "calendar.back_to_back_chains", "calendar.overlapping_meetings", "calendar.score",
+)
+WELLNESS_SCORES = fields("fitness.score", "jira.score", "calendar.score", "total_score", include_id=False)
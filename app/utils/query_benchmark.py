@@ -0,0 +1,236 @@
+"""
+Mongo query benchmark for the service-layer reads.
+
+Runs each query for users picked evenly across the configured database,
+timing it and reading explain("executionStats") to report keys and docs
+examined against docs returned. Collection scans, in-memory sorts and
+unselective index scans are flagged, so missing indexes show up on a
+synthetic dataset (see app.utils.synthetic_data) before they show up in production:
+
+    DB_NAME=micro_routine_bench python -m app.utils.query_benchmark --samples 50
+    DB_NAME=micro_routine_bench python -m app.utils.query_benchmark --json --fail-on-scan
+
+Each query mirrors the filter, projection, sort and limit of the code named
+in its label; services are not called directly since several of them write
+(stale check-in repair, write-behind flush) or call providers.
+"""
+import argparse
+import asyncio
+import statistics
+from time import perf_counter
+import orjson
+from app.database import (
+    attendance_collection,
+    close_database,
+    db,
+    tokens_collection,
+    users_collection,
+    wellness_collection,
+)
+from app.utils.projections import (
+    ATTENDANCE_STALE_CHECK,
+    ATTENDANCE_VIEW,
+    JIRA_CLOUD_ID,
+    TOKEN_PROVIDER,
+    TOKEN_VALUE,
+    USER_GOALS_BY_ID,
+    USER_LOGIN,
+    USER_PROFILE,
+    WELLNESS_DAILY,
+    WELLNESS_INPUTS,
+    WELLNESS_SCORES,
+    fields,
+)
+from app.utils.timezone_utils import now_ist
+
+# Docs (or keys) examined per doc returned above which an index scan is flagged as unselective
+SCAN_RATIO = 10
+# Once-per-sync / startup scans over every provider token; reported, but not worth an index
+BACKGROUND_SCANS = {
+    "jira_service.warm_cloud_id_cache",
+    "fitness_history.sync_all_users: Google users",
+}
+
+
+def _find(collection, query: dict, projection: dict, sort: list = None, limit: int = 0) -> dict:
+    return {"collection": collection, "filter": query, "projection": projection, "sort": sort, "limit": limit}
+
+
+def _distinct(collection, key: str, query: dict) -> dict:
+    return {"collection": collection, "distinct": key, "query": query}
+
+
+# label -> spec for a sampled user `u` (`_id`, `user_id`, email, employee_id, department_id) and day `d`
+QUERIES = {
+    "auth_routes.login: user by email":
+        lambda u, d: _find(users_collection, {"email": u["email"]}, USER_LOGIN, limit=1),
+    "auth_utils.get_current_user: profile by id":
+        lambda u, d: _find(users_collection, {"_id": u["_id"]}, USER_PROFILE, limit=1),
+    "token_store.get_token":
+        lambda u, d: _find(tokens_collection, {"user_id": u["user_id"], "provider": "google"}, TOKEN_VALUE, limit=1),
+    "permission_routes: connected providers":
+        lambda u, d: _find(
+            tokens_collection, {"user_id": u["user_id"], "provider": {"$in": ["google", "jira"]}}, TOKEN_PROVIDER,
+        ),
+    "jira_service.warm_cloud_id_cache":
+        lambda u, d: _find(tokens_collection, {"provider": "jira", "token.cloud_id": {"$exists": True}}, JIRA_CLOUD_ID),
+    "fitness_history.sync_all_users: Google users":
+        lambda u, d: _distinct(tokens_collection, "user_id", {"provider": "google"}),
+    "attendance.get_today_attendance: latest record":
+        lambda u, d: _find(
+            attendance_collection, {"employee_id": u["employee_id"]}, ATTENDANCE_STALE_CHECK, sort=[("_id", -1)], limit=1,
+        ),
+    "attendance.get_today_attendance: today's record":
+        lambda u, d: _find(attendance_collection, {"employee_id": u["employee_id"], "date": d}, ATTENDANCE_VIEW, limit=1),
+    "wellness.compute_and_store_daily_score: today's record":
+        lambda u, d: _find(wellness_collection, {"user_id": u["user_id"], "date": d}, WELLNESS_DAILY, limit=1),
+    "wellness.compute_overall_wellness_score":
+        lambda u, d: _find(wellness_collection, {"user_id": u["user_id"]}, WELLNESS_SCORES),
+    "batch_scoring.rescore_stored_day: department users":
+        lambda u, d: _find(users_collection, {"department_id": u["department_id"]}, USER_GOALS_BY_ID),
+    "batch_scoring.rescore_stored_day: day's records":
+        lambda u, d: _find(
+            wellness_collection,
+            {"date": d, "fitness": {"$exists": True}, "jira": {"$exists": True}, "calendar": {"$exists": True}},
+            WELLNESS_INPUTS,
+        ),
+}
+
+
+async def sample_users(count: int) -> list:
+    """`count` users spread evenly over the `_id` order (deterministic for a given dataset)."""
+    total = await users_collection.estimated_document_count()
+    users = []
+    for position in sorted({n * total // count for n in range(count)}):
+        rows = await users_collection.find({}, fields("email", "employee_id", "department_id")) \
+            .sort("_id", 1).skip(position).limit(1).to_list()
+        users += [{**row, "user_id": str(row["_id"])} for row in rows]
+    return users
+
+
+async def _run(spec: dict):
+    collection = spec["collection"]
+    if "distinct" in spec:
+        return await collection.distinct(spec["distinct"], spec["query"])
+    cursor = collection.find(spec["filter"], spec["projection"])
+    if spec["sort"]:
+        cursor = cursor.sort(spec["sort"])
+    return await cursor.limit(spec["limit"]).to_list()
+
+
+def _explain_command(spec: dict) -> dict:
+    name = spec["collection"].name
+    if "distinct" in spec:
+        command = {"distinct": name, "key": spec["distinct"], "query": spec["query"]}
+    else:
+        command = {"find": name, "filter": spec["filter"], "projection": spec["projection"]}
+        if spec["sort"]:
+            command["sort"] = dict(spec["sort"])
+        if spec["limit"]:
+            command["limit"] = spec["limit"]
+    return {"explain": command, "verbosity": "executionStats"}
+
+
+def plan_stages(plan: dict) -> list:
+    """Stage names of a winning plan, outermost first (classic and slot-based engine layouts)."""
+    plan = plan.get("queryPlan", plan)
+    stages = [plan["stage"]] if "stage" in plan else []
+    for child in [plan.get("inputStage"), *plan.get("inputStages", [])]:
+        if child:
+            stages += plan_stages(child)
+    return stages
+
+
+def verdict(stages: list, returned: int, keys_examined: int, docs_examined: int) -> str:
+    if "COLLSCAN" in stages:
+        return "COLLSCAN"
+    if "SORT" in stages:
+        return "IN-MEMORY SORT"
+    if max(keys_examined, docs_examined) > SCAN_RATIO * max(returned, 1):
+        return "UNSELECTIVE"
+    return "ok"
+
+
+async def benchmark(samples: int = 20, day: str = None, only: str = None) -> list:
+    """One result row per query: latency percentiles plus mean explain counters over the sampled users."""
+    day = day or now_ist().strftime("%Y-%m-%d")
+    users = await sample_users(samples)
+    if not users:
+        raise SystemExit(f"Database {db.name!r} has no users; generate some with app.utils.synthetic_data")
+
+    results = []
+    for label, build in QUERIES.items():
+        if only and only not in label:
+            continue
+        specs = [build(user, day) for user in users]
+        timings = []
+        for spec in specs:
+            started = perf_counter()
+            await _run(spec)
+            timings.append((perf_counter() - started) * 1000)
+
+        returned = keys_examined = docs_examined = 0
+        stages = []
+        for spec in specs:
+            explain = await db.command(_explain_command(spec))
+            stats = explain["executionStats"]
+            returned += stats["nReturned"]
+            keys_examined += stats["totalKeysExamined"]
+            docs_examined += stats["totalDocsExamined"]
+            stages += [stage for stage in plan_stages(explain["queryPlanner"]["winningPlan"]) if stage not in stages]
+
+        runs = len(specs)
+        timings.sort()
+        row = {
+            "query": label,
+            "runs": runs,
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(timings[int(0.95 * (runs - 1))], 2),
+            "max_ms": round(timings[-1], 2),
+            "returned": round(returned / runs, 1),
+            "keys_examined": round(keys_examined / runs, 1),
+            "docs_examined": round(docs_examined / runs, 1),
+            "plan": " > ".join(stages),
+        }
+        row["verdict"] = verdict(stages, row["returned"], row["keys_examined"], row["docs_examined"])
+        results.append(row)
+    return results
+
+
+def format_report(results: list) -> str:
+    header = (
+        f"{'query':<56} {'p50 ms':>8} {'p95 ms':>8} {'returned':>10} "
+        f"{'keys exam.':>11} {'docs exam.':>11}  {'verdict':<14} plan"
+    )
+    lines = [header, "-" * len(header)]
+    for row in results:
+        lines.append(
+            f"{row['query']:<56} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['returned']:>10,.1f} "
+            f"{row['keys_examined']:>11,.1f} {row['docs_examined']:>11,.1f}  {row['verdict']:<14} {row['plan']}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=20, help="users to run each query for")
+    parser.add_argument("--date", help="day for the date-keyed queries (default: today, IST)")
+    parser.add_argument("--only", help="run only the queries whose label contains this text")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--fail-on-scan", action="store_true", help="exit 1 when a request-path query is flagged")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            return await benchmark(args.samples, args.date, args.only)
+        finally:
+            await close_database()
+
+    results = asyncio.run(run())
+    print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode() if args.json else format_report(results))
+    if args.fail_on_scan and any(row["verdict"] != "ok" and row["query"] not in BACKGROUND_SCANS for row in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
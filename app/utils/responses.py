@@ -0,0 +1,65 @@
+import hashlib
+import orjson
+from bson import ObjectId
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+
+def _default(obj):
+    """Types orjson doesn't know natively (datetime/date are handled by orjson itself)."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def ndjson_line(content) -> bytes:
+    """One newline-terminated JSON record, encoded like FastJSONResponse."""
+    return orjson.dumps(
+        content,
+        default=_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE,
+    )
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjson-backed JSON response that encodes ObjectId, datetime and date natively.
+
+    Returning it directly from a route skips FastAPI's jsonable_encoder pass,
+    so Mongo documents can be sent as-is without a recursive conversion.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+def content_etag(content) -> str:
+    """Weak ETag from a hash of the JSON content (weak, since compression changes the bytes)."""
+    encoded = orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS)
+    return f'W/"{hashlib.blake2b(encoded, digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def conditional_response(request: Request, content, status_code: int = 200) -> Response:
+    """
+    FastJSONResponse carrying a content-hash ETag, or an empty 304 when the
+    client's If-None-Match already names it.
+    """
+    etag = content_etag(content)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
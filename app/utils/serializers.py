@@ -1,11 +1,10 @@
-from bson import ObjectId
-
 def attendance_entity(att):
+    """Slim attendance view; ObjectId/datetime values are encoded by FastJSONResponse."""
     if not att:
         return None
 
     return {
-        "id": str(att["_id"]) if "_id" in att else None,
+        "id": att.get("_id"),
         "employee_id": att.get("employee_id"),
         "date": att.get("date"),
         "checkin_time": att.get("checkin_time"),
@@ -0,0 +1,68 @@
+import importlib
+import logging
+import time
+
+# Taken as early as possible: app.main imports this module before any router
+PROCESS_START = time.perf_counter()
+
+_import_seconds = {}  # router module -> import time
+_first_request_ms = {}  # router module -> latency of its first request
+_app_ready_seconds = None
+
+
+def timed_import(module_name: str):
+    """Import a router module and record how long the import took."""
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    _import_seconds[module_name] = time.perf_counter() - start
+    return module
+
+
+def mark_app_ready():
+    global _app_ready_seconds
+    _app_ready_seconds = time.perf_counter() - PROCESS_START
+    logging.info(f"App imported in {_app_ready_seconds * 1000:.1f} ms: {startup_report()['routers']}")
+
+
+def startup_report() -> dict:
+    """Cold-start budget: import time and first-request latency per router."""
+    return {
+        "app_ready_ms": round(_app_ready_seconds * 1000, 1) if _app_ready_seconds else None,
+        "routers": {
+            name: {
+                "import_ms": round(seconds * 1000, 1),
+                "first_request_ms": _first_request_ms.get(name),
+            }
+            for name, seconds in _import_seconds.items()
+        },
+    }
+
+
+class FirstRequestTimer:
+    """
+    ASGI middleware recording the latency of the first request each router serves.
+
+    Once every router has been timed it only costs a dict lookup per request.
+    """
+
+    def __init__(self, app, prefixes: dict):
+        self.app = app
+        # Longest prefix first so /api/google/fitness wins over /api/google
+        self.prefixes = sorted(prefixes.items(), key=lambda item: len(item[0]), reverse=True)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or len(_first_request_ms) == len(self.prefixes):
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        module_name = next((name for prefix, name in self.prefixes if path.startswith(prefix)), None)
+        if module_name is None or module_name in _first_request_ms:
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+            if _first_request_ms.setdefault(module_name, elapsed_ms) == elapsed_ms:
+                logging.info(f"First request to {module_name} took {elapsed_ms} ms")
@@ -0,0 +1,314 @@
+"""
+Deterministic synthetic dataset for exercising the Mongo queries at production scale.
+
+Fills the configured database with users spread over departments, OAuth
+tokens, a weekday attendance history and a daily wellness history per user.
+Point DB_NAME at a scratch database; the generated collections are only
+replaced with --drop:
+
+    DB_NAME=micro_routine_bench python -m app.utils.synthetic_data --users 10000 --days 365 --drop
+    DB_NAME=micro_routine_bench python -m app.utils.query_benchmark
+
+Every user draws from its own RNG seeded with (seed, user index), so the same
+seed and end date give the same documents (apart from the password hash), and
+raising --users only adds users.
+"""
+import argparse
+import asyncio
+import random
+from datetime import date, datetime, time, timedelta, timezone
+from time import perf_counter
+from zoneinfo import ZoneInfo
+from bson import ObjectId
+from app.database import (
+    attendance_collection,
+    close_database,
+    db,
+    ensure_indexes,
+    tokens_collection,
+    users_collection,
+    wellness_collection,
+)
+from app.services.scoring import WELLNESS_GOAL_DEFAULTS, calendar_score, fitness_score, jira_score, total_score
+from app.utils.auth_utils import hash_password
+from app.utils.timezone_utils import now_ist
+
+IST = ZoneInfo("Asia/Kolkata")
+GENERATED_COLLECTIONS = (users_collection, tokens_collection, attendance_collection, wellness_collection)
+# Timestamp of synthetic user ids; the rest of the id is the user index
+USER_ID_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+SYNTHETIC_PASSWORD = "synthetic-password"
+
+FIRST_NAMES = (
+    "Aarav", "Aditi", "Arjun", "Diya", "Ishaan", "Kavya", "Meera", "Neha", "Priya", "Rahul",
+    "Rohan", "Sanya", "Sneha", "Tara", "Varun", "Vikram", "Ananya", "Karan", "Nikhil", "Pooja",
+)
+LAST_NAMES = (
+    "Sharma", "Verma", "Iyer", "Nair", "Reddy", "Gupta", "Patel", "Menon", "Rao", "Das",
+    "Kulkarni", "Joshi", "Singh", "Mehta", "Chopra", "Bose", "Pillai", "Shetty", "Kapoor", "Mishra",
+)
+LOCATIONS = ("Bengaluru", "Pune", "Hyderabad", "Chennai", "Gurugram", "Remote")
+# (value, weight)
+ROLES = (("employee", 88), ("manager", 11), ("admin", 1))
+EMPLOYMENT_TYPES = (("full_time", 85), ("contract", 10), ("part_time", 5))
+MOODS = ((1, 5), (2, 10), (3, 30), (4, 35), (5, 20))
+
+GOOGLE_CONNECTED_SHARE = 0.8
+JIRA_CONNECTED_SHARE = 0.6
+# Share of working days with an attendance record; varies per user within this range
+ATTENDANCE_RANGE = (0.85, 0.98)
+# Share of days a wellness score gets computed (the user opened the app)
+WELLNESS_WEEKDAY_SHARE = 0.75
+WELLNESS_WEEKEND_SHARE = 0.2
+# Check-ins left open: a forgotten checkout, or today's still-running day
+FORGOTTEN_CHECKOUT_SHARE = 0.02
+STILL_CHECKED_IN_SHARE = 0.6
+
+
+def _object_id(when: datetime, n: int) -> ObjectId:
+    """Deterministic ObjectId that sorts by `when` (naive means UTC), like server-assigned ids do."""
+    seconds = int((when if when.tzinfo else when.replace(tzinfo=timezone.utc)).timestamp())
+    return ObjectId(seconds.to_bytes(4, "big") + n.to_bytes(8, "big"))
+
+
+def _weighted(rng: random.Random, choices: tuple):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+def department_ids(count: int) -> list:
+    return [f"DEPT{n:03d}" for n in range(count)]
+
+
+def make_user(index: int, rng: random.Random, departments: list, password_hash: str, now: datetime) -> dict:
+    first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    age = rng.randint(21, 60)
+    user = {
+        "_id": _object_id(USER_ID_EPOCH, index),
+        "username": f"{first_name.lower()}.{last_name.lower()}{index}",
+        "email": f"user{index:07d}@synthetic.example",
+        "password": password_hash,
+        "first_name": first_name,
+        "last_name": last_name,
+        "age": age,
+        "gender": rng.choice(("female", "male", "non_binary")),
+        "date_of_birth": date(now.year - age, rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+        "employee_id": f"EMP{index:07d}",
+        # Zipf-like: a few large departments, a long tail of small ones
+        "department_id": rng.choices(departments, [1 / (rank + 1) for rank in range(len(departments))])[0],
+        "role": _weighted(rng, ROLES),
+        "employment_type": _weighted(rng, EMPLOYMENT_TYPES),
+        "location": rng.choice(LOCATIONS),
+        "hire_date": (now.date() - timedelta(days=rng.randint(30, 3650))).isoformat(),
+        "status": "active" if rng.random() < 0.97 else "inactive",
+        "timezone": "Asia/Kolkata",
+        "created_at": now,
+        "updated_at": now,
+    }
+    # Most users keep the default goals
+    if rng.random() < 0.4:
+        user["step_goal"] = rng.choice((6000, 8000, 10000, 12000))
+        user["calorie_goal"] = rng.choice((1800, 2000, 2200, 2500))
+        user["active_minute_goal"] = rng.choice((30, 45, 60))
+    return user
+
+
+def make_tokens(index: int, user_id: str, rng: random.Random, now: datetime) -> list:
+    tokens = []
+    if rng.random() < GOOGLE_CONNECTED_SHARE:
+        tokens.append({
+            "_id": _object_id(now, index << 1),
+            "user_id": user_id,
+            "provider": "google",
+            "token": {
+                "token": f"ya29.synthetic-{rng.getrandbits(64):016x}",
+                "refresh_token": f"1//synthetic-{rng.getrandbits(64):016x}",
+                "token_uri": "https://oauth2.googleapis.com/token",
+                "scopes": ["https://www.googleapis.com/auth/calendar.readonly", "https://www.googleapis.com/auth/fitness.activity.read"],
+                "expiry": (now + timedelta(minutes=rng.randint(-120, 60))).isoformat(),
+            },
+            "updated_at": now,
+        })
+    if rng.random() < JIRA_CONNECTED_SHARE:
+        tokens.append({
+            "_id": _object_id(now, index << 1 | 1),
+            "user_id": user_id,
+            "provider": "jira",
+            "token": {
+                "access_token": f"synthetic-{rng.getrandbits(64):016x}",
+                "refresh_token": f"synthetic-{rng.getrandbits(64):016x}",
+                "expires_in": 3600,
+                "expires_at": (now + timedelta(minutes=rng.randint(-120, 60))).isoformat(),
+                "scope": "read:jira-work read:jira-user offline_access",
+                "token_type": "Bearer",
+                "cloud_id": f"{rng.getrandbits(128):032x}",
+                "user_id": user_id,
+            },
+            "updated_at": now,
+        })
+    return tokens
+
+
+def make_attendance(index: int, employee_id: str, rng: random.Random, days: list) -> list:
+    records = []
+    presence = rng.uniform(*ATTENDANCE_RANGE)
+    for number, day in enumerate(days):
+        if day.weekday() >= 5 or rng.random() >= presence:
+            continue
+        checkin = datetime.combine(day, time(9), IST) + timedelta(minutes=_clamp(rng.gauss(0, 40), -90, 180))
+        checkout = checkin + timedelta(minutes=_clamp(rng.gauss(510, 45), 240, 720))
+        still_open = STILL_CHECKED_IN_SHARE if day == days[-1] else FORGOTTEN_CHECKOUT_SHARE
+        records.append({
+            "_id": _object_id(checkin, index << 20 | number),
+            "employee_id": employee_id,
+            "date": day.isoformat(),
+            "checkin_time": checkin,
+            "checkout_time": None if rng.random() < still_open else checkout,
+            "mood": _weighted(rng, MOODS),
+        })
+    return records
+
+
+def _calendar_day(day: date, rng: random.Random) -> dict:
+    meetings = rng.choices(range(9), (10, 12, 16, 18, 16, 12, 8, 5, 3))[0] if day.weekday() < 5 else 0
+    meeting_minutes = float(sum(rng.choice((15, 30, 30, 45, 60, 60, 90)) for _ in range(meetings)))
+    chains = rng.randint(0, meetings // 2)
+    overlapping = rng.randint(0, 1) if meetings > 3 else 0
+    return {
+        "date": day.isoformat(),
+        "meetings": meetings,
+        "all_day_events": int(rng.random() < 0.05),
+        "meeting_minutes": meeting_minutes,
+        # Meetings fragment the free time, so the longest block shrinks faster than the total
+        "longest_focus_minutes": float(max(0, int((540 - meeting_minutes) / (1 + meetings * rng.uniform(0.2, 0.6))))),
+        "back_to_back_chains": chains,
+        "longest_chain": chains and rng.randint(2, 4),
+        "overlapping_meetings": overlapping,
+        "max_concurrent": 2 if overlapping else int(meetings > 0),
+    }
+
+
+def make_wellness(index: int, user: dict, rng: random.Random, days: list) -> list:
+    goals = {name: user.get(name, default) for name, default in WELLNESS_GOAL_DEFAULTS.items()}
+    records = []
+    for number, day in enumerate(days):
+        if rng.random() >= (WELLNESS_WEEKDAY_SHARE if day.weekday() < 5 else WELLNESS_WEEKEND_SHARE):
+            continue
+        steps = int(_clamp(rng.gauss(goals["step_goal"] * 0.85, 2500), 0, 40000))
+        calories = int(_clamp(rng.gauss(goals["calorie_goal"] * 0.9, 300), 800, 5000))
+        active_minutes = int(_clamp(rng.gauss(goals["active_minute_goal"] * 0.9, 15), 0, 240))
+        fitness = {
+            "steps": steps,
+            "calories": calories,
+            "active_minutes": active_minutes,
+            "score": fitness_score(
+                steps, calories, active_minutes,
+                goals["step_goal"], goals["calorie_goal"], goals["active_minute_goal"],
+            ),
+        }
+
+        total_tickets = rng.randint(0, 25)
+        completed = rng.randint(0, total_tickets)
+        counts = {
+            "total_tickets": total_tickets,
+            "completed_tickets": completed,
+            "in_progress_tickets": rng.randint(0, total_tickets - completed),
+        }
+        jira = {**counts, "score": jira_score(**counts)}
+
+        calendar = _calendar_day(day, rng)
+        calendar["score"] = calendar_score(
+            calendar["meeting_minutes"], calendar["longest_focus_minutes"],
+            calendar["back_to_back_chains"], calendar["overlapping_meetings"],
+        )
+
+        updated = datetime.combine(day, time(3, 30)) + timedelta(minutes=rng.randint(0, 720))
+        stamp = updated.isoformat()
+        records.append({
+            "_id": _object_id(updated, index << 20 | number),
+            "user_id": str(user["_id"]),
+            "date": day.isoformat(),
+            "fitness": fitness,
+            "jira": jira,
+            "calendar": calendar,
+            "component_updated": {"fitness": stamp, "jira": stamp, "calendar": stamp},
+            "total_score": total_score(fitness["score"], jira["score"], calendar["score"]),
+            "last_updated": stamp,
+        })
+    return records
+
+
+async def generate(users: int, days: int, departments: int = 20, seed: int = 42,
+                   end_date: date = None, batch_size: int = 5000, drop: bool = False) -> dict:
+    """Generate and insert the dataset; returns documents inserted per collection."""
+    if drop:
+        for collection in GENERATED_COLLECTIONS:
+            await collection.drop()
+    elif await users_collection.estimated_document_count():
+        raise SystemExit(f"Database {db.name!r} already has users; pass --drop to replace the generated collections")
+
+    end_date = end_date or now_ist().date()
+    history = [end_date - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    now = datetime.combine(end_date, time(9))
+    department_list = department_ids(departments)
+    password_hash = hash_password(SYNTHETIC_PASSWORD)
+
+    buffers = {collection.name: [] for collection in GENERATED_COLLECTIONS}
+    inserted = dict.fromkeys(buffers, 0)
+
+    async def flush(collection, minimum: int = 1):
+        docs = buffers[collection.name]
+        if len(docs) >= minimum:
+            await collection.insert_many(docs, ordered=False)
+            inserted[collection.name] += len(docs)
+            buffers[collection.name] = []
+
+    for index in range(users):
+        rng = random.Random(f"{seed}:{index}")
+        user = make_user(index, rng, department_list, password_hash, now)
+        buffers[users_collection.name].append(user)
+        buffers[tokens_collection.name] += make_tokens(index, str(user["_id"]), rng, now)
+        buffers[attendance_collection.name] += make_attendance(index, user["employee_id"], rng, history)
+        buffers[wellness_collection.name] += make_wellness(index, user, rng, history)
+        for collection in GENERATED_COLLECTIONS:
+            await flush(collection, batch_size)
+    for collection in GENERATED_COLLECTIONS:
+        await flush(collection)
+
+    # Indexes last: building them once is much faster than maintaining them per insert
+    await ensure_indexes()
+    return inserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365, help="history length, ending at --end-date")
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, help="last day of history (default: today, IST)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="documents per insert_many")
+    parser.add_argument("--drop", action="store_true", help="drop the generated collections first")
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            return await generate(
+                args.users, args.days, args.departments, args.seed, args.end_date, args.batch_size, args.drop,
+            )
+        finally:
+            await close_database()
+
+    started = perf_counter()
+    inserted = asyncio.run(run())
+    for name, count in inserted.items():
+        print(f"{name:<16} {count:>12,}")
+    print(f"Generated in {perf_counter() - started:.1f}s into {db.name!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,3 +3,7 @@ from zoneinfo import ZoneInfo
 
 def now_ist():
     return datetime.now(ZoneInfo("Asia/Kolkata"))
+
+def today_utc() -> str:
+    """Today's date (UTC, ISO) — the day key for calendar and wellness scoring."""
+    return datetime.utcnow().date().isoformat()
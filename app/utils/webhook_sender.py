@@ -0,0 +1,94 @@
+"""
+Local stand-in for Google Calendar push notifications and Jira issue webhooks.
+
+Builds the same headers/payloads the providers send and posts them to a
+running backend, or to a TestClient passed as `client` (tests/test_webhooks.py):
+
+    python -m app.utils.webhook_sender calendar --channel-id <id> --token <token> --resource-id <id>
+    python -m app.utils.webhook_sender jira --webhook-id 1000 --issue-key ABC-1 --status "In Progress"
+"""
+import argparse
+import logging
+import time
+import httpx
+import jwt
+from app.config import BACKEND_ROOT_URL, JIRA_CLIENT_ID, JIRA_CLIENT_SECRET
+
+
+def calendar_notification_headers(channel: dict, state: str = "exists", message_number: int = 1) -> dict:
+    return {
+        "X-Goog-Channel-ID": channel["channel_id"],
+        "X-Goog-Channel-Token": channel["token"],
+        "X-Goog-Resource-ID": channel["resource_id"],
+        "X-Goog-Resource-State": state,
+        "X-Goog-Resource-URI": "https://www.googleapis.com/calendar/v3/calendars/primary/events",
+        "X-Goog-Message-Number": str(message_number),
+    }
+
+
+def jira_issue_event(webhook_ids: list, issue: dict, event: str = "jira:issue_updated"):
+    """Return (headers, payload) for a Jira issue webhook signed like Jira signs OAuth-app webhooks."""
+    now = int(time.time())
+    token = jwt.encode({"iss": JIRA_CLIENT_ID or "local", "iat": now, "exp": now + 300}, JIRA_CLIENT_SECRET, algorithm="HS256")
+    payload = {
+        "timestamp": now * 1000,
+        "webhookEvent": event,
+        "matchedWebhookIds": webhook_ids,
+        "issue": issue,
+    }
+    return {"Authorization": f"Bearer {token}"}, payload
+
+
+def make_issue(key: str, summary: str = "", priority: str = "High", status: str = "To Do",
+               assignee: str = None) -> dict:
+    fields = {"summary": summary, "priority": {"name": priority}, "status": {"name": status}}
+    if assignee:
+        fields["assignee"] = {"accountId": assignee}
+    return {"key": key, "fields": fields}
+
+
+def send_calendar_notification(channel: dict, state: str = "exists", base_url: str = BACKEND_ROOT_URL, client=None):
+    client = client or httpx.Client(base_url=base_url)
+    return client.post("/webhooks/google/calendar", headers=calendar_notification_headers(channel, state))
+
+
+def send_jira_event(webhook_ids: list, issue: dict, event: str = "jira:issue_updated",
+                    base_url: str = BACKEND_ROOT_URL, client=None):
+    client = client or httpx.Client(base_url=base_url)
+    headers, payload = jira_issue_event(webhook_ids, issue, event)
+    return client.post("/webhooks/jira", headers=headers, json=payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BACKEND_ROOT_URL)
+    sub = parser.add_subparsers(dest="provider", required=True)
+
+    cal = sub.add_parser("calendar")
+    cal.add_argument("--channel-id", required=True)
+    cal.add_argument("--token", required=True)
+    cal.add_argument("--resource-id", required=True)
+    cal.add_argument("--state", default="exists")
+
+    jira = sub.add_parser("jira")
+    jira.add_argument("--webhook-id", type=int, action="append", required=True)
+    jira.add_argument("--issue-key", required=True)
+    jira.add_argument("--summary", default="")
+    jira.add_argument("--priority", default="High")
+    jira.add_argument("--status", default="To Do")
+    jira.add_argument("--assignee", help="Jira accountId the issue is assigned to")
+    jira.add_argument("--event", default="jira:issue_updated")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.provider == "calendar":
+        channel = {"channel_id": args.channel_id, "token": args.token, "resource_id": args.resource_id}
+        resp = send_calendar_notification(channel, args.state, args.base_url)
+    else:
+        issue = make_issue(args.issue_key, args.summary, args.priority, args.status, args.assignee)
+        resp = send_jira_event(args.webhook_id, issue, args.event, args.base_url)
+    logging.info(f"{resp.status_code} {resp.text}")
+
+
+if __name__ == "__main__":
+    main()
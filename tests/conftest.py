@@ -0,0 +1,146 @@
+"""
+Shared fixtures: an in-memory stand-in for the async Mongo client, patched into
+every app module, and a TestClient (without lifespan, so nothing dials out).
+"""
+import sys
+import mongomock
+import pytest
+from fastapi.testclient import TestClient
+import app.database
+import app.main
+from app.services import cache
+from app.services.write_behind import WRITE_BUFFERS
+
+COLLECTION_ATTRS = {
+    name: collection.name
+    for name, collection in vars(app.database).items()
+    if name.endswith("_collection")
+}
+
+
+class FakeCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self.cursor = self.cursor.sort(*args, **kwargs)
+        return self
+
+    def skip(self, count: int):
+        self.cursor = self.cursor.skip(count)
+        return self
+
+    def limit(self, count: int):
+        self.cursor = self.cursor.limit(count)
+        return self
+
+    async def to_list(self, length: int = None):
+        return list(self.cursor)
+
+    def __aiter__(self):
+        self._rows = iter(self.cursor)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    """Async facade over a mongomock collection; records reads made without a projection."""
+
+    def __init__(self, collection, unprojected: list):
+        self.collection = collection
+        self.name = collection.name
+        self.unprojected = unprojected
+
+    def _check_projection(self, method: str, args: tuple, kwargs: dict):
+        if len(args) < 2 and kwargs.get("projection") is None:
+            self.unprojected.append(f"{self.name}.{method}({args[0] if args else {}})")
+
+    def find(self, *args, **kwargs):
+        self._check_projection("find", args, kwargs)
+        return FakeCursor(self.collection.find(*args, **kwargs))
+
+    async def find_one(self, *args, **kwargs):
+        self._check_projection("find_one", args, kwargs)
+        return self.collection.find_one(*args, **kwargs)
+
+    async def find_one_and_update(self, filter, update, **kwargs):
+        self._check_projection("find_one_and_update", (filter,), kwargs)
+        return self.collection.find_one_and_update(filter, update, **kwargs)
+
+    async def aggregate(self, pipeline, **kwargs):
+        return FakeCursor(self.collection.aggregate(pipeline, **kwargs))
+
+    async def bulk_write(self, requests, ordered: bool = True):
+        # mongomock's bulk API predates pymongo's UpdateOne(sort=...), so replay the ops one by one
+        result = mongomock.results.BulkWriteResult(
+            {"nInserted": 0, "nMatched": 0, "nModified": 0, "nUpserted": 0, "nRemoved": 0, "upserted": []}, True,
+        )
+        for request in requests:
+            kind = type(request).__name__
+            if kind == "InsertOne":
+                self.collection.insert_one(request._doc)
+                result.bulk_api_result["nInserted"] += 1
+            elif kind in ("UpdateOne", "UpdateMany"):
+                update = self.collection.update_one if kind == "UpdateOne" else self.collection.update_many
+                outcome = update(request._filter, request._doc, upsert=bool(request._upsert))
+                result.bulk_api_result["nMatched"] += outcome.matched_count
+                result.bulk_api_result["nModified"] += outcome.modified_count
+                result.bulk_api_result["nUpserted"] += int(outcome.upserted_id is not None)
+            else:
+                raise NotImplementedError(kind)
+        return result
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.database = mongomock.MongoClient().db
+        self.unprojected = []
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        return FakeCollection(self.database[name], self.unprojected)
+
+
+@pytest.fixture
+def mongo(monkeypatch) -> FakeDatabase:
+    """Point every app module's collections (and the write buffers) at one in-memory database."""
+    fake = FakeDatabase()
+    for module_name, module in list(sys.modules.items()):
+        if not module_name.startswith("app."):
+            continue
+        for attr, collection_name in COLLECTION_ATTRS.items():
+            if hasattr(module, attr):
+                monkeypatch.setattr(module, attr, fake[collection_name])
+    for buffer in WRITE_BUFFERS:
+        monkeypatch.setattr(buffer, "collection", fake[buffer.collection.name])
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+    monkeypatch.setattr(cache, "_backend", cache.MemoryBackend())
+
+
+@pytest.fixture
+def client(mongo) -> TestClient:
+    return TestClient(app.main.app)
+
+
+@pytest.fixture
+def signed_in(client, mongo):
+    """Register and log in a user with an employee id; returns (user_id, auth headers)."""
+    client.post("/api/auth/signup", json={"username": "asha", "email": "asha@example.com", "password": "pw"})
+    mongo.database["users"].update_one({"email": "asha@example.com"}, {"$set": {"employee_id": "E1"}})
+    login = client.post("/api/auth/login", json={"email": "asha@example.com", "password": "pw"}).json()
+    return login["user"]["id"], {"Authorization": f"Bearer {login['access_token']}"}
@@ -0,0 +1,30 @@
+"""Admission slots cover the response, not background work scheduled by it."""
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.testclient import TestClient
+from app.utils.admission import AdmissionControl
+
+LIMITS = {"cheap": {"concurrency": 1, "queue": 0}}
+
+
+def test_slot_is_released_before_background_tasks():
+    seen = []
+    api = FastAPI()
+    api.add_middleware(AdmissionControl, limits=LIMITS)
+
+    def admission() -> AdmissionControl:
+        # add_middleware builds the stack lazily; find our instance in it
+        layer = api.middleware_stack
+        while not isinstance(layer, AdmissionControl):
+            layer = layer.app
+        return layer
+
+    @api.get("/work")
+    async def work(background_tasks: BackgroundTasks):
+        background_tasks.add_task(lambda: seen.append(admission().classes["cheap"].in_flight))
+        return {"ok": True}
+
+    with TestClient(api) as client:
+        assert client.get("/work").status_code == 200
+        assert client.get("/work").status_code == 200
+
+    assert seen == [0, 0]
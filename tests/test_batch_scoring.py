@@ -0,0 +1,118 @@
+"""The NumPy batch engine must score exactly like the scalar per-user path."""
+import asyncio
+import random
+import numpy as np
+from bson import ObjectId
+from app.services.ai_agent_service import generate_recommendations
+from app.services.batch_scoring import recommend_batch, score_batch
+from app.services.scoring import RECOMMENDATION_GOAL_DEFAULTS, WELLNESS_GOAL_DEFAULTS
+from app.services.wellness_service import (
+    _total_score,
+    calculate_calendar_score,
+    calculate_fitness_score,
+    calculate_jira_score,
+)
+
+
+def _random_inputs(rng: random.Random) -> dict:
+    total = rng.choice([0, rng.randint(1, 30)])
+    completed = rng.randint(0, total)
+    goals = {} if rng.random() < 0.3 else {
+        "step_goal": rng.choice([5000, 8000, 12000]),
+        "calorie_goal": rng.choice([1800, 2200, 2600]),
+        "active_minute_goal": rng.choice([20, 30, 60]),
+    }
+    return {
+        "user": goals,
+        "fitness": {
+            "steps": rng.randint(0, 25000),
+            "calories": rng.randint(0, 4000),
+            "active_minutes": rng.randint(0, 180),
+        },
+        "jira": {
+            "total_tickets": total,
+            "completed_tickets": completed,
+            "in_progress_tickets": rng.randint(0, total - completed),
+        },
+        "calendar": {
+            "meeting_minutes": float(rng.choice([0, rng.randint(0, 600)])),
+            "longest_focus_minutes": float(rng.randint(0, 540)),
+            "back_to_back_chains": rng.randint(0, 6),
+            "overlapping_meetings": rng.randint(0, 5),
+        },
+    }
+
+
+async def _scalar_scores(row: dict) -> dict:
+    record = {
+        "fitness": await calculate_fitness_score(row["user"], "u1", row["fitness"]),
+        "jira": await calculate_jira_score("u1", row["jira"]),
+        "calendar": await calculate_calendar_score("u1", row["calendar"]),
+    }
+    return {**{name: record[name]["score"] for name in record}, "total": _total_score(record)}
+
+
+async def _all_scalar_scores(rows: list) -> list:
+    return [await _scalar_scores(row) for row in rows]
+
+
+def test_score_batch_matches_scalar_scores():
+    rng = random.Random(39)
+    rows = [_random_inputs(rng) for _ in range(2000)]
+
+    def column(section: str, field: str, dtype=np.int64):
+        return np.array([row[section][field] for row in rows], dtype=dtype)
+
+    batch = score_batch({
+        **{field: column("fitness", field) for field in ("steps", "calories", "active_minutes")},
+        **{
+            goal: np.array([row["user"].get(goal, default) for row in rows], dtype=np.float64)
+            for goal, default in WELLNESS_GOAL_DEFAULTS.items()
+        },
+        **{field: column("jira", field) for field in rows[0]["jira"]},
+        **{field: column("calendar", field) for field in rows[0]["calendar"]},
+    })
+    scalar = asyncio.run(_all_scalar_scores(rows))
+
+    for name in ("fitness", "jira", "calendar", "total"):
+        assert batch[name].tolist() == [scores[name] for scores in scalar], name
+
+
+def test_recommend_batch_matches_scalar_recommendations():
+    rng = random.Random(139)
+    rows = [_random_inputs(rng) for _ in range(2000)]
+    for row in rows:
+        row["jira"] = {level: rng.choice([0, 0, rng.randint(1, 5)]) for level in ("high", "medium", "low")}
+
+    def column(section: str, field: str, dtype=np.int64):
+        return np.array([row[section][field] for row in rows], dtype=dtype)
+
+    batch = recommend_batch({
+        **{level: column("jira", level) for level in ("high", "medium", "low")},
+        **{field: column("calendar", field, np.float64) for field in ("meeting_minutes", "longest_focus_minutes")},
+        "back_to_back_chains": column("calendar", "back_to_back_chains"),
+        **{field: column("fitness", field) for field in ("steps", "active_minutes")},
+        **{
+            goal: np.array([row["user"].get(goal, RECOMMENDATION_GOAL_DEFAULTS[goal]) for row in rows])
+            for goal in ("step_goal", "active_minute_goal")
+        },
+    })
+
+    async def scalar():
+        user_id = str(ObjectId())
+        return [(await generate_recommendations(user_id, row))["recommendation"] for row in rows]
+
+    assert batch == asyncio.run(scalar())
+
+
+def test_rescore_requires_admin(client, mongo, signed_in):
+    _, headers = signed_in
+    users = mongo.database["users"]
+
+    assert client.post("/api/wellness/rescore?date=2026-01-05").status_code == 401
+    assert client.post("/api/wellness/rescore?date=2026-01-05", headers=headers).status_code == 403
+    # `role` is the job title, not a privilege
+    users.update_one({"email": "asha@example.com"}, {"$set": {"role": "admin"}})
+    assert client.post("/api/wellness/rescore?date=2026-01-05", headers=headers).status_code == 403
+    users.update_one({"email": "asha@example.com"}, {"$set": {"is_admin": True}})
+    assert client.post("/api/wellness/rescore?date=2026-01-05", headers=headers).status_code == 200
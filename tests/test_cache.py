@@ -0,0 +1,104 @@
+"""Redis backend shared by two workers (one fake Redis server, two clients)."""
+import asyncio
+import fakeredis
+import orjson
+import pytest
+from fakeredis.aioredis import FakeRedis
+from app.services import cache
+
+KEY = cache.cache_key("jira", "tickets", "u1")
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def workers(server, monkeypatch):
+    backends = [cache.RedisBackend(client=FakeRedis(server=server)) for _ in range(2)]
+
+    def on(worker: int):
+        monkeypatch.setattr(cache, "_backend", backends[worker])
+    return backends, on
+
+
+def run(workers, scenario):
+    backends, on = workers
+
+    async def main():
+        for backend in backends:
+            await backend.start()
+        await asyncio.sleep(0.05)  # let both listeners subscribe
+        try:
+            return await scenario(on)
+        finally:
+            for backend in backends:
+                await backend.close()
+    return asyncio.run(main())
+
+
+def test_expire_reaches_other_workers_near_cache(workers):
+    async def scenario(on):
+        on(0)
+        await cache.put(KEY, ["T-1"], ttl=60)
+        on(1)
+        warmed = await cache.get_entry(KEY)  # now held in worker 1's near cache
+        on(0)
+        await cache.expire(KEY)
+        await asyncio.sleep(0.05)
+        on(1)
+        return warmed, await cache.get_entry(KEY)
+
+    warmed, after = run(workers, scenario)
+
+    assert warmed == cache.CacheEntry(["T-1"], True)
+    assert after == cache.CacheEntry(["T-1"], False)
+
+
+def test_delete_reaches_other_workers_near_cache(workers):
+    async def scenario(on):
+        on(0)
+        await cache.put(KEY, ["T-1"], ttl=60)
+        on(1)
+        await cache.get_entry(KEY)
+        on(0)
+        await cache.delete(KEY)
+        await asyncio.sleep(0.05)
+        on(1)
+        return await cache.get_entry(KEY)
+
+    assert run(workers, scenario) is None
+
+
+def test_add_is_exclusive_across_workers(workers):
+    async def scenario(on):
+        on(0)
+        first = await cache.add("lock", "worker-0", ttl=60)
+        on(1)
+        second = await cache.add("lock", "worker-1", ttl=60)
+        return first, second, (await cache.get_entry("lock")).value
+
+    assert run(workers, scenario) == (True, False, "worker-0")
+
+
+def test_update_is_reapplied_over_a_concurrent_write(server, workers):
+    backends, _ = workers
+    # A synchronous client on the same server plays worker 1, writing between worker 0's read and write
+    other_worker = fakeredis.FakeRedis(server=server)
+    seen = []
+
+    def mark_stale(item):
+        seen.append(item["value"])
+        if len(seen) == 1:
+            other_worker.set(KEY, orjson.dumps({"value": ["T-2"], "fresh_until": 9e9}))
+        return {**item, "fresh_until": 0}
+
+    async def scenario(on):
+        on(0)
+        await cache.put(KEY, ["T-1"], ttl=60)
+        await backends[0].update(KEY, mark_stale, 60)
+        return await backends[1].get(KEY)
+
+    assert run(workers, scenario) == {"value": ["T-2"], "fresh_until": 0}
+    assert seen == [["T-1"], ["T-2"]]
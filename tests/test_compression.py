@@ -0,0 +1,82 @@
+"""Large JSON bodies are compressed (brotli preferred, then gzip); small and streamed ones are not."""
+import gzip
+import brotli
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app.utils.compression import CompressionMiddleware, accepted_encoding
+from app.utils.responses import FastJSONResponse
+
+LARGE = {"events": [{"id": f"e{i}", "title": "Standup"} for i in range(200)]}
+
+
+@pytest.fixture
+def client():
+    api = FastAPI()
+    api.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @api.get("/large")
+    async def large():
+        return FastJSONResponse(LARGE)
+
+    @api.get("/small")
+    async def small():
+        return FastJSONResponse({"ok": True})
+
+    @api.get("/stream")
+    async def stream():
+        async def lines():
+            for event in LARGE["events"]:
+                yield orjson.dumps(event) + b"\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return TestClient(api)
+
+
+def raw_get(client, path: str, accept_encoding: str):
+    """GET without letting the HTTP client decode the body."""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("GZIP", "gzip"),
+    ("*", "br"),
+    ("deflate", None),
+    ("gzip;q=0", None),
+    ("", None),
+])
+def test_accepted_encoding_prefers_brotli(header, expected):
+    assert accepted_encoding(header) == expected
+
+
+def test_large_body_is_brotli_compressed(client):
+    response, body = raw_get(client, "/large", "gzip, br")
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["content-length"] == str(len(body))
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert orjson.loads(brotli.decompress(body)) == LARGE
+
+
+def test_large_body_falls_back_to_gzip(client):
+    response, body = raw_get(client, "/large", "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert orjson.loads(gzip.decompress(body)) == LARGE
+
+
+@pytest.mark.parametrize("path, accept_encoding", [
+    ("/large", "identity"),
+    ("/small", "gzip, br"),
+    ("/stream", "gzip, br"),
+])
+def test_body_is_sent_as_is(client, path, accept_encoding):
+    response, body = raw_get(client, path, accept_encoding)
+
+    assert "content-encoding" not in response.headers
+    assert len(body) > 0
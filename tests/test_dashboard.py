@@ -0,0 +1,94 @@
+"""The dashboard fetches each source once, concurrently, and degrades section by section."""
+import asyncio
+from datetime import datetime
+import orjson
+import pytest
+from fastapi import HTTPException
+import app.services.ai_agent_service as ai_agent_service
+import app.services.dashboard_service as dashboard_service
+import app.services.google_service as google_service
+import app.services.wellness_service as wellness_service
+from app.services import cache
+from app.services.resilience import UpstreamUnavailable
+
+MONTH = {"month": datetime.utcnow().strftime("%Y-%m"), "events": [], "days": {}}
+EVENT = {"id": "e1", "title": "Standup", "start": "2026-01-05T09:00:00Z", "end": "2026-01-05T09:15:00Z",
+         "calendar": "primary"}
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    """Stub the dashboard's sources, count their calls, and fail on any second fetch from scoring."""
+    calls = []
+
+    def source(name, result):
+        async def fetch(user_id):
+            calls.append(name)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        monkeypatch.setattr(dashboard_service, name, fetch)
+
+    async def refetch(*args, **kwargs):
+        raise AssertionError("scoring fetched a source the dashboard already had")
+    for module, name in [
+        (wellness_service, "get_daily_steps_from_google"),
+        (wellness_service, "get_high_priority_tickets_for_user"),
+        (wellness_service, "get_calendar_day"),
+        (ai_agent_service, "_fetch_live_data"),
+    ]:
+        monkeypatch.setattr(module, name, refetch)
+
+    source("get_daily_fitness_snapshot", {"steps": 9000, "calories": 2000.0, "active_minutes": 45})
+    source("get_month_calendar", MONTH)
+    counts = {"total_tickets": 3, "completed_tickets": 1, "in_progress_tickets": 1, "high": 1, "medium": 1, "low": 0}
+    source("get_high_priority_tickets_for_user", {"tickets": [], "counts": counts})
+    source.calls = calls
+    return source
+
+
+def test_each_source_is_fetched_once(client, signed_in, sources):
+    _, headers = signed_in
+
+    body = client.get("/api/dashboard", headers=headers).json()
+
+    assert sorted(sources.calls) == ["get_daily_fitness_snapshot", "get_high_priority_tickets_for_user",
+                                     "get_month_calendar"]
+    assert body["fitness"]["steps"] == 9000
+    assert body["wellness"]["total_score"] > 0
+    assert body["recommendation"]["recommendation"]["type"] == "jira"
+    assert "degraded" not in body
+
+
+def test_stream_sends_every_section(client, signed_in, sources):
+    _, headers = signed_in
+
+    response = client.get("/api/dashboard", params={"stream": "true"}, headers=headers)
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    sections = [orjson.loads(line)["section"] for line in response.content.splitlines()]
+    assert sorted(sections) == ["attendance", "calendar", "fitness", "jira", "recommendation", "wellness"]
+    assert sections[-2:] == ["wellness", "recommendation"]
+
+
+def test_failing_sources_degrade_their_sections_only(client, signed_in, sources, monkeypatch):
+    user_id, headers = signed_in
+    # Google is down, but the last-known month is cached; Jira isn't connected
+    asyncio.run(cache.put(google_service._events_key(user_id), {**MONTH, "events": [EVENT]}, 0, keep=3600))
+
+    async def google_down(*args, **kwargs):
+        raise UpstreamUnavailable("google", "google is currently unavailable")
+    monkeypatch.setattr(google_service, "_google_get", google_down)
+    monkeypatch.setattr(dashboard_service, "get_month_calendar", google_service.get_month_calendar)
+    sources("get_high_priority_tickets_for_user", HTTPException(status_code=401, detail="Jira not connected"))
+
+    response = client.get("/api/dashboard", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["x-degraded"] == "google"
+    body = response.json()
+    assert body["calendar"] == [EVENT]
+    assert body["jira"] == {"error": "Jira not connected", "status_code": 401}
+    assert body["fitness"]["steps"] == 9000
+    assert body["recommendation"]["recommendation"]["type"] == "calendar"
+    assert body["degraded"] == ["google"]
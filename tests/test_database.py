@@ -0,0 +1,54 @@
+"""The Mongo client is async and takes its pool settings from MONGO_* variables."""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Settings are read at import, so inspect the client in a fresh interpreter
+PROBE = """
+import json
+from app.database import client
+options, pool = client.options, client.options.pool_options
+print(json.dumps({
+    "type": type(client).__name__,
+    "max_pool_size": pool.max_pool_size,
+    "min_pool_size": pool.min_pool_size,
+    "max_idle_seconds": pool.max_idle_time_seconds,
+    "connect_timeout": pool.connect_timeout,
+    "server_selection_timeout": options.server_selection_timeout,
+    "socket_timeout": pool.socket_timeout,
+    "wait_queue_timeout": pool.wait_queue_timeout,
+    "read_preference": options.read_preference.mongos_mode,
+}))
+"""
+
+
+def test_client_uses_pool_settings_from_environment():
+    env = {
+        **os.environ,
+        "MONGO_MAX_POOL_SIZE": "7",
+        "MONGO_MIN_POOL_SIZE": "2",
+        "MONGO_MAX_IDLE_TIME_MS": "60000",
+        "MONGO_CONNECT_TIMEOUT_MS": "1500",
+        "MONGO_SERVER_SELECTION_TIMEOUT_MS": "2500",
+        "MONGO_SOCKET_TIMEOUT_MS": "8000",
+        "MONGO_WAIT_QUEUE_TIMEOUT_MS": "1000",
+        "MONGO_READ_PREFERENCE": "secondaryPreferred",
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, cwd=Path(__file__).parent.parent,
+        capture_output=True, text=True, check=True, timeout=30,
+    ).stdout
+
+    assert json.loads(output) == {
+        "type": "AsyncMongoClient",
+        "max_pool_size": 7,
+        "min_pool_size": 2,
+        "max_idle_seconds": 60.0,
+        "connect_timeout": 1.5,
+        "server_selection_timeout": 2.5,
+        "socket_timeout": 8.0,
+        "wait_queue_timeout": 1.0,
+        "read_preference": "secondaryPreferred",
+    }
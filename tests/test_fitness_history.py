@@ -0,0 +1,66 @@
+import asyncio
+from datetime import date, datetime, timedelta
+import pytz
+from bson import ObjectId
+import app.services.fitness_history_service as fitness_history_service
+from app.config import FIT_BACKFILL_MAX_DAYS
+
+
+def _fake_buckets(steps: int):
+    async def get_daily_fitness_buckets(user_id, range_start, range_end, tz):
+        # Google answers an empty or inverted range with a 400
+        assert range_start < range_end
+        days, day = [], range_start.date()
+        while day < range_end.date():
+            days.append({"day": day, "steps": steps, "calories": 2000, "active_minutes": 30})
+            day += timedelta(days=1)
+        return days
+    return get_daily_fitness_buckets
+
+
+def test_backfill_upserts_one_row_per_day(mongo, monkeypatch):
+    user_id = str(ObjectId())
+    rows = mongo.database["fitness_daily"]
+
+    monkeypatch.setattr(fitness_history_service, "get_daily_fitness_buckets", _fake_buckets(1000))
+    asyncio.run(fitness_history_service.backfill_fitness_history(user_id, date(2025, 1, 1), date(2025, 1, 10)))
+    monkeypatch.setattr(fitness_history_service, "get_daily_fitness_buckets", _fake_buckets(5000))
+    asyncio.run(fitness_history_service.backfill_fitness_history(user_id, date(2025, 1, 6), date(2025, 1, 15)))
+
+    assert rows.count_documents({"user_id": user_id}) == 15
+    assert rows.count_documents({"user_id": user_id, "steps": 1000}) == 5
+    assert rows.find_one({"user_id": user_id, "date": "2025-01-06"})["steps"] == 5000
+
+
+def test_backfill_route_rejects_oversized_and_reversed_ranges(client, signed_in):
+    _, headers = signed_in
+    too_long = {"start": "2020-01-01", "end": (date(2020, 1, 1) + timedelta(days=FIT_BACKFILL_MAX_DAYS)).isoformat()}
+    reversed_range = {"start": "2025-02-01", "end": "2025-01-01"}
+
+    for body in (too_long, reversed_range):
+        response = client.post("/api/google/fitness/history/backfill", json=body, headers=headers)
+        assert response.status_code == 422
+
+
+def test_backfill_clamps_end_to_today(mongo, monkeypatch):
+    user_id = str(ObjectId())
+    today = datetime.now(pytz.timezone(fitness_history_service.FIT_DEFAULT_TIMEZONE)).date()
+    monkeypatch.setattr(fitness_history_service, "FIT_BACKFILL_BATCH_DAYS", 7)
+    monkeypatch.setattr(fitness_history_service, "get_daily_fitness_buckets", _fake_buckets(1000))
+
+    asyncio.run(fitness_history_service.backfill_fitness_history(
+        user_id, today - timedelta(days=3), today + timedelta(days=60),
+    ))
+
+    stored = [row["date"] for row in mongo.database["fitness_daily"].find({"user_id": user_id})]
+    assert stored and max(stored) <= today.isoformat()
+
+
+def test_backfill_route_rejects_future_start(client, signed_in):
+    _, headers = signed_in
+    start = date.today() + timedelta(days=2)
+    body = {"start": start.isoformat(), "end": (start + timedelta(days=5)).isoformat()}
+
+    response = client.post("/api/google/fitness/history/backfill", json=body, headers=headers)
+
+    assert response.status_code == 422
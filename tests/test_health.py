@@ -0,0 +1,32 @@
+import app.routes.health_routes as health_routes
+
+
+def test_readyz_reports_flags_only(client):
+    response = client.get("/readyz")
+
+    assert response.status_code == 503
+    assert response.json() == {
+        "status": "not ready",
+        "ready": False,
+        "draining": False,
+        "components": {"mongo": False, "cache": False, "background_jobs": False},
+    }
+
+
+def test_metrics_need_the_scrape_token(client, monkeypatch):
+    assert client.get("/metrics").status_code == 403
+    monkeypatch.setattr(health_routes, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+
+def test_startup_report_is_admin_only(client, mongo, signed_in):
+    _, headers = signed_in
+
+    assert client.get("/startup-report").status_code == 401
+    assert client.get("/startup-report", headers=headers).status_code == 403
+    mongo.database["users"].update_one({"email": "asha@example.com"}, {"$set": {"is_admin": True}})
+    assert client.get("/startup-report", headers=headers).status_code == 200
@@ -0,0 +1,95 @@
+"""Upstream timeouts: a slow provider counts against its circuit; running out of request time does not."""
+import asyncio
+import time
+import httpx
+import pytest
+from app.services import http_client, resilience
+
+
+def slow_transport(seconds: float) -> httpx.MockTransport:
+    async def handler(request):
+        await asyncio.sleep(seconds)
+        return httpx.Response(200)
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(http_client, "UPSTREAM_CALL_TIMEOUT_SECONDS", 0.05)
+
+    def use(transport):
+        monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=transport))
+    return use
+
+
+def call_within(deadline_seconds: float):
+    async def run():
+        resilience._deadline.set(time.monotonic() + deadline_seconds)
+        try:
+            await http_client.upstream_request("google", "GET", "https://example.test/")
+        except resilience.UpstreamUnavailable as e:
+            return e
+    return asyncio.run(run())
+
+
+def test_call_timeout_counts_as_failure(upstream):
+    upstream(slow_transport(1))
+
+    error = call_within(5)
+
+    assert (error.status_code, error.detail) == (503, "google timed out")
+    assert resilience.get_breaker("google").failures == 1
+
+
+def test_exhausted_deadline_is_not_a_failure(upstream):
+    upstream(slow_transport(1))
+
+    error = call_within(0.02)
+
+    assert (error.status_code, error.detail) == (504, "Request deadline exceeded")
+    assert resilience.get_breaker("google").failures == 0
+
+
+def test_fast_call_succeeds(upstream):
+    upstream(slow_transport(0))
+
+    assert call_within(5) is None
+    assert resilience.get_breaker("google").state == resilience.CLOSED
+
+
+def test_only_the_probe_frees_the_half_open_slot(upstream, monkeypatch):
+    hold = asyncio.Event()
+
+    async def handler(request):
+        if request.url.path == "/fail":
+            return httpx.Response(500)
+        await hold.wait()
+        return httpx.Response(200)
+    upstream(httpx.MockTransport(handler))
+    monkeypatch.setitem(resilience._breakers, "google", resilience.CircuitBreaker("google", 1, 0))
+    breaker = resilience.get_breaker("google")
+
+    async def scenario():
+        resilience._deadline.set(time.monotonic() + 2)  # a wrongly admitted second probe times out
+        # Started while the circuit was closed; still waiting when the circuit opens
+        slow = asyncio.create_task(http_client.upstream_request("google", "GET", "https://example.test/slow"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(resilience.UpstreamUnavailable):
+            await http_client.upstream_request("google", "GET", "https://example.test/fail")
+        assert breaker.state == resilience.OPEN
+
+        probe = asyncio.create_task(http_client.upstream_request("google", "GET", "https://example.test/probe"))
+        await asyncio.sleep(0.01)
+        assert breaker.state == resilience.HALF_OPEN
+        slow.cancel()
+        await asyncio.gather(slow, return_exceptions=True)
+
+        with pytest.raises(resilience.UpstreamUnavailable) as second_probe:
+            await http_client.upstream_request("google", "GET", "https://example.test/other")
+        hold.set()
+        await probe
+        return second_probe.value
+
+    assert "currently unavailable" in asyncio.run(scenario()).detail
+    assert breaker.state == resilience.CLOSED
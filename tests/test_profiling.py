@@ -0,0 +1,46 @@
+"""Request profiler: only admins' flagged requests are profiled."""
+import pytest
+from app.utils.profiling import _wants_profile
+
+
+def scope(query: bytes = b"", headers: list = ()) -> dict:
+    return {"type": "http", "query_string": query, "headers": list(headers)}
+
+
+@pytest.mark.parametrize("query, wanted", [
+    (b"profile=1", True),
+    (b"date=2026-01-05&profile=1", True),
+    (b"user_profile=1", False),
+    (b"xprofile=1", False),
+    (b"profile=10", False),
+    (b"profile=0", False),
+    (b"", False),
+])
+def test_query_flag_is_matched_exactly(query, wanted):
+    assert _wants_profile(scope(query)) is wanted
+
+
+def test_header_flag():
+    assert _wants_profile(scope(headers=[(b"x-profile", b"1")]))
+    assert not _wants_profile(scope(headers=[(b"x-profile", b"0")]))
+
+
+def test_admin_request_is_profiled_and_stored(client, mongo, signed_in):
+    _, headers = signed_in
+    mongo.database["users"].update_one({"email": "asha@example.com"}, {"$set": {"is_admin": True}})
+
+    response = client.get("/permissions/status", headers={**headers, "X-Profile": "1"})
+
+    profile_id = response.headers["X-Profile-Id"]
+    stored = client.get(f"/api/admin/profiles/{profile_id}", headers=headers)
+    assert stored.status_code == 200
+    assert (stored.json()["path"], stored.json()["profiled_by"]) == ("/permissions/status", signed_in[0])
+
+
+def test_non_admin_and_lookalike_flags_are_not_profiled(client, mongo, signed_in):
+    _, headers = signed_in
+
+    assert "X-Profile-Id" not in client.get("/permissions/status", headers={**headers, "X-Profile": "1"}).headers
+    mongo.database["users"].update_one({"email": "asha@example.com"}, {"$set": {"is_admin": True}})
+    assert "X-Profile-Id" not in client.get("/permissions/status?user_profile=1", headers=headers).headers
+    assert "X-Profile-Id" in client.get("/permissions/status?profile=1", headers=headers).headers
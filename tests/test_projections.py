@@ -0,0 +1,30 @@
+"""Hot paths must declare a projection on every Mongo read (see app/utils/projections.py)."""
+import asyncio
+import app.routes.auth_routes as auth_routes
+
+
+def test_hot_routes_read_with_projections(client, mongo, signed_in):
+    user_id, headers = signed_in
+    mongo.database["wellness_scores"].insert_one({
+        "user_id": user_id, "date": "2026-01-05",
+        "fitness": {"score": 60}, "jira": {"score": 80}, "calendar": {"score": 70}, "total_score": 70,
+    })
+
+    responses = [
+        client.get("/api/attendance/today", headers=headers),
+        client.post("/api/attendance/checkin", json={"mood": 4}, headers=headers),
+        client.get("/api/attendance/today", headers=headers),
+        client.post("/api/attendance/checkout", headers=headers),
+        client.get("/permissions/status", headers=headers),
+        client.post("/api/google/fitness/steps/goal", json={"goal": 9000}, headers=headers),
+        client.get(f"/api/wellness/overall?user_id={user_id}"),
+    ]
+
+    assert [r.status_code for r in responses] == [200] * len(responses)
+    assert mongo.unprojected == []
+
+
+def test_unprojected_read_is_reported(mongo):
+    asyncio.run(auth_routes.users_collection.find_one({"email": "nobody@example.com"}))
+
+    assert mongo.unprojected == ["users.find_one({'email': 'nobody@example.com'})"]
@@ -0,0 +1,70 @@
+"""Recommendations are served stale-while-revalidate, with one background recompute per user."""
+import asyncio
+import time
+import pytest
+from bson import ObjectId
+import app.services.ai_agent_service as ai_agent_service
+from app.config import AI_RECOMMENDATION_FRESH_SECONDS, AI_RECOMMENDATION_STALE_SECONDS
+from app.services import cache
+
+USER_ID = str(ObjectId())
+KEY = ai_agent_service._recommendation_key(USER_ID)
+CLAIM = cache.cache_key("ai", "revalidating", USER_ID)
+OLD = {"user_id": USER_ID, "recommendation": {"priority": 9, "type": "general", "message": "old"}}
+
+
+@pytest.fixture
+def live_data(monkeypatch):
+    """Count live fetches; every user has one high-priority ticket."""
+    calls = []
+
+    async def fetch(user_id):
+        calls.append(user_id)
+        return {"jira": {"high": 1, "medium": 0, "low": 0}}
+    monkeypatch.setattr(ai_agent_service, "_fetch_live_data", fetch)
+    return calls
+
+
+def cached_for(age: float):
+    asyncio.run(cache.put(KEY, {"computed_at": time.time() - age, "result": OLD}, AI_RECOMMENDATION_STALE_SECONDS))
+
+
+def get(client):
+    return client.get("/api/ai/recommendations", params={"user_id": USER_ID}).json()
+
+
+def test_fresh_entry_is_served_without_recompute(client, live_data):
+    cached_for(0)
+
+    assert get(client) == {**OLD, "source": "cached"}
+    assert live_data == []
+
+
+def test_stale_entry_is_served_and_revalidated_in_background(client, live_data):
+    cached_for(AI_RECOMMENDATION_FRESH_SECONDS + 1)
+
+    body = get(client)
+
+    assert body == {**OLD, "source": "stale"}
+    assert live_data == [USER_ID]  # the background task ran after the response
+    stored = asyncio.run(cache.get(KEY))
+    assert stored["result"]["recommendation"]["type"] == "jira"
+    assert time.time() - stored["computed_at"] < 5
+    assert asyncio.run(cache.get_entry(CLAIM)) is None
+
+
+def test_stale_entry_claimed_elsewhere_is_not_recomputed(client, live_data):
+    cached_for(AI_RECOMMENDATION_FRESH_SECONDS + 1)
+    asyncio.run(cache.add(CLAIM, True, 60))
+
+    assert get(client) == {**OLD, "source": "stale"}
+    assert live_data == []
+
+
+def test_expired_entry_is_recomputed_inline(client, live_data):
+    cached_for(AI_RECOMMENDATION_STALE_SECONDS + 1)
+
+    body = get(client)
+
+    assert (body["source"], body["recommendation"]["type"]) == ("fresh", "jira")
+    assert live_data == [USER_ID]
@@ -0,0 +1,112 @@
+"""FastJSONResponse encodes Mongo documents directly with orjson; conditional responses carry an ETag."""
+from datetime import date, datetime
+import numpy as np
+import orjson
+import pytest
+from bson import ObjectId
+import app.routes.jira_tasks as jira_tasks
+from app.utils.responses import FastJSONResponse, ndjson_line
+
+USER_ID = ObjectId("65f1c0ffee0000000000abcd")
+DOCUMENT = {
+    "_id": USER_ID,
+    "checkin": datetime(2026, 1, 5, 9, 30, 15),
+    "date": date(2026, 1, 5),
+    "steps": np.int64(8000),
+    "scores": {1: 90.5},
+}
+ENCODED = {
+    "_id": "65f1c0ffee0000000000abcd",
+    "checkin": "2026-01-05T09:30:15",
+    "date": "2026-01-05",
+    "steps": 8000,
+    "scores": {"1": 90.5},
+}
+
+
+def test_mongo_document_is_encoded_without_conversion():
+    response = FastJSONResponse(DOCUMENT)
+
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == ENCODED
+
+
+def test_ndjson_line_encodes_like_the_response():
+    line = ndjson_line(DOCUMENT)
+
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert orjson.loads(line) == ENCODED
+
+
+def test_unknown_type_is_rejected():
+    with pytest.raises(TypeError):
+        FastJSONResponse({"value": object()})
+
+
+def test_attendance_route_sends_the_stored_document(client, signed_in, mongo):
+    _, headers = signed_in
+    client.post("/api/attendance/checkin", json={"mood": 4}, headers=headers)
+    stored = mongo.database["attendance_logs"].find_one({"employee_id": "E1"})
+
+    response = client.get("/api/attendance/today", headers=headers)
+
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert body["id"] == str(stored["_id"])
+    assert datetime.fromisoformat(body["checkin_time"]) == stored["checkin_time"]
+
+
+@pytest.fixture
+def tickets(monkeypatch):
+    """Serve a fixed ticket list from the Jira route."""
+    current = {"tickets": [{"key": "T-1", "priority": "High"}] * 40, "counts": {"high": 40}}
+
+    async def get_high_priority_tickets_for_user(user_id):
+        return current
+    monkeypatch.setattr(jira_tasks, "get_high_priority_tickets_for_user", get_high_priority_tickets_for_user)
+    return current
+
+
+def get_tickets(client, **headers):
+    return client.get("/api/jira/tickets/high-priority", params={"user_id": "u1"}, headers=headers)
+
+
+def test_matching_etag_gets_an_empty_304(client, tickets):
+    first = get_tickets(client)
+    etag = first.headers["etag"]
+
+    again = get_tickets(client, **{"If-None-Match": etag})
+
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert (again.status_code, again.content) == (304, b"")
+    assert again.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("if_none_match", ['"other", {strong}', "{etag}", "*"])
+def test_etag_match_ignores_weakness_and_lists(client, tickets, if_none_match):
+    etag = get_tickets(client).headers["etag"]
+    header = if_none_match.format(etag=etag, strong=etag.removeprefix("W/"))
+
+    assert get_tickets(client, **{"If-None-Match": header}).status_code == 304
+
+
+def test_changed_content_gets_a_new_etag(client, tickets):
+    etag = get_tickets(client).headers["etag"]
+    tickets["counts"] = {"high": 41}
+
+    response = get_tickets(client, **{"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["counts"] == {"high": 41}
+
+
+def test_etag_is_the_same_for_compressed_and_plain_bodies(client, tickets):
+    compressed = get_tickets(client, **{"Accept-Encoding": "br"})
+    plain = get_tickets(client, **{"Accept-Encoding": "identity"})
+
+    assert compressed.headers["content-encoding"] == "br"
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["etag"] == plain.headers["etag"]
+    assert compressed.json() == plain.json()
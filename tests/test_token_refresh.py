@@ -0,0 +1,95 @@
+"""OAuth token refresh: one refresh across workers, and a revoked grant asks the user to reconnect."""
+import asyncio
+from datetime import datetime, timedelta
+import httpx
+import pytest
+from fastapi import HTTPException
+import app.services.google_service as google_service
+import app.services.jira_service as jira_service
+from app.services import cache
+from app.services.resilience import UpstreamUnavailable
+from app.services.token_store import get_token, save_token
+
+USER_ID = "u1"
+LOCK_KEY = cache.cache_key("jira", "refresh_lock", USER_ID)
+
+
+def _expiring() -> str:
+    return datetime.utcnow().isoformat()
+
+
+@pytest.fixture
+def token_endpoint(monkeypatch):
+    """Record token-endpoint calls and answer them with `response`."""
+    calls = []
+
+    def answer(module, response: httpx.Response):
+        async def upstream_request(provider, method, url, **kwargs):
+            calls.append(url)
+            return response
+        monkeypatch.setattr(module, "upstream_request", upstream_request)
+    answer.calls = calls
+    return answer
+
+
+def test_jira_refresh_waits_for_another_workers_refresh(mongo, token_endpoint):
+    token_endpoint(jira_service, httpx.Response(200, json={"access_token": "ours", "expires_in": 3600}))
+    stale = {"access_token": "old", "refresh_token": "r1", "expires_at": _expiring()}
+    fresh = {"access_token": "theirs", "refresh_token": "r2",
+             "expires_at": (datetime.utcnow() + timedelta(hours=1)).isoformat()}
+
+    async def scenario():
+        await save_token(USER_ID, "jira", stale)
+        # Another worker holds the refresh lock and stores its result before releasing it
+        assert await cache.add(LOCK_KEY, "other-worker", 30)
+
+        async def other_worker():
+            await asyncio.sleep(0.1)
+            await save_token(USER_ID, "jira", fresh)
+            await cache.delete(LOCK_KEY)
+        asyncio.create_task(other_worker())
+        return await jira_service._refresh_jira_token(USER_ID, "old")
+
+    assert asyncio.run(scenario())["access_token"] == "theirs"
+    assert token_endpoint.calls == []
+
+
+def test_jira_refresh_gives_up_while_lock_is_held(mongo, token_endpoint, monkeypatch):
+    token_endpoint(jira_service, httpx.Response(200, json={"access_token": "ours"}))
+    monkeypatch.setattr(jira_service, "TOKEN_REFRESH_WAIT_SECONDS", 0.1)
+
+    async def scenario():
+        await save_token(USER_ID, "jira", {"access_token": "old", "refresh_token": "r1", "expires_at": _expiring()})
+        await cache.add(LOCK_KEY, "other-worker", 30)
+        with pytest.raises(UpstreamUnavailable) as error:
+            await jira_service._refresh_jira_token(USER_ID, "old")
+        return error.value
+
+    assert asyncio.run(scenario()).status_code == 503
+    assert token_endpoint.calls == []
+
+
+def test_jira_refresh_stores_rotated_token_and_releases_lock(mongo, token_endpoint):
+    token_endpoint(jira_service, httpx.Response(200, json={"access_token": "new", "refresh_token": "r2"}))
+
+    async def scenario():
+        await save_token(USER_ID, "jira", {"access_token": "old", "refresh_token": "r1", "expires_at": _expiring()})
+        await jira_service._refresh_jira_token(USER_ID, "old")
+        return await get_token(USER_ID, "jira"), await cache.get_entry(LOCK_KEY)
+
+    stored, lock = asyncio.run(scenario())
+    assert (stored["access_token"], stored["refresh_token"]) == ("new", "r2")
+    assert lock is None
+
+
+def test_revoked_google_grant_asks_to_reconnect(mongo, token_endpoint):
+    token_endpoint(google_service, httpx.Response(400, json={"error": "invalid_grant"}))
+
+    async def scenario():
+        await save_token(USER_ID, "google", {"token": "old", "refresh_token": "r1", "expiry": _expiring()})
+        with pytest.raises(HTTPException) as error:
+            await google_service._refresh_google_token(USER_ID, "old")
+        return error.value
+
+    error = asyncio.run(scenario())
+    assert (error.status_code, error.detail) == (401, "Google session expired, please reconnect Google")
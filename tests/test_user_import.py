@@ -0,0 +1,25 @@
+"""Bulk user import: rows are stored field by field, and never with admin access."""
+import orjson
+
+
+def test_import_cannot_grant_admin(client, mongo, signed_in):
+    _, headers = signed_in
+    users = mongo.database["users"]
+    users.update_one({"email": "asha@example.com"}, {"$set": {"is_admin": True}})
+    row = {"username": "mallory", "email": "mallory@example.com", "password": "pw", "role": "admin", "is_admin": True}
+
+    response = client.post(
+        "/api/admin/users/import",
+        content=orjson.dumps(row) + b"\n",
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    stored = users.find_one({"email": "mallory@example.com"})
+    assert stored["role"] == "admin"
+    assert "is_admin" not in stored
+
+    login = client.post("/api/auth/login", json={"email": "mallory@example.com", "password": "pw"}).json()
+    mallory = {"Authorization": f"Bearer {login['access_token']}"}
+    assert client.get("/api/admin/profiles/unknown", headers=mallory).status_code == 403
+    assert client.get("/api/admin/profiles/unknown", headers=headers).status_code == 404
@@ -0,0 +1,66 @@
+"""After an OAuth connect, a background job subscribes to pushes and builds the dashboard once."""
+import asyncio
+import pytest
+import app.routes.permission_routes as permission_routes
+import app.services.dashboard_service as dashboard_service
+from app.utils import metrics
+
+WARMUP_METRIC = metrics._key("post_connect_warmup_seconds", {"provider": "jira"})
+
+
+@pytest.fixture
+def steps(monkeypatch):
+    """Record the warm-up's steps in order instead of calling Jira and building a real dashboard."""
+    done = []
+
+    async def subscribe(user_id):
+        done.append(("subscribe", user_id))
+
+    async def build_dashboard(user):
+        done.append(("dashboard", str(user["_id"])))
+        return {"jira": {"error": "Jira not connected", "status_code": 401}}
+    monkeypatch.setitem(dashboard_service.PUSH_SUBSCRIBERS, "jira", subscribe)
+    monkeypatch.setattr(dashboard_service, "build_dashboard", build_dashboard)
+    return done
+
+
+def test_callback_warms_the_user_after_redirecting(client, signed_in, steps, monkeypatch):
+    user_id, _ = signed_in
+
+    async def handle_jira_callback(code, state):
+        steps.append(("token", state))
+    monkeypatch.setattr(permission_routes, "handle_jira_callback", handle_jira_callback)
+    before = metrics._summaries[WARMUP_METRIC][0]
+
+    response = client.get("/permissions/jira/callback", params={"code": "c1", "state": user_id},
+                          follow_redirects=False)
+
+    assert response.status_code == 307 and "status=success" in response.headers["location"]
+    assert steps == [("token", user_id), ("subscribe", user_id), ("dashboard", user_id)]
+    assert metrics._summaries[WARMUP_METRIC][0] == before + 1
+
+
+def test_failed_callback_does_not_warm(client, signed_in, steps, monkeypatch):
+    user_id, _ = signed_in
+
+    async def handle_jira_callback(code, state):
+        raise ValueError("bad code")
+    monkeypatch.setattr(permission_routes, "handle_jira_callback", handle_jira_callback)
+
+    response = client.get("/permissions/jira/callback", params={"code": "c1", "state": user_id},
+                          follow_redirects=False)
+
+    assert "status=error" in response.headers["location"]
+    assert steps == []
+
+
+def test_failed_subscription_still_builds_the_dashboard(signed_in, steps, monkeypatch):
+    user_id, _ = signed_in
+
+    async def subscribe(user_id):
+        raise RuntimeError("webhook registration rejected")
+    monkeypatch.setitem(dashboard_service.PUSH_SUBSCRIBERS, "jira", subscribe)
+
+    asyncio.run(dashboard_service.warm_user_after_connect(user_id, "jira"))
+
+    assert steps == [("dashboard", user_id)]
@@ -0,0 +1,108 @@
+"""Calendar and Jira push notifications, sent with the local stand-in sender."""
+import asyncio
+import time
+import pytest
+import app.services.google_service as google_service
+import app.services.webhook_service as webhook_service
+import app.utils.webhook_sender as webhook_sender
+from app.services import cache
+
+CHANNEL = {"user_id": "u1", "channel_id": "ch-1", "token": "secret-token", "resource_id": "res-1"}
+
+
+@pytest.fixture
+def jira_secret(monkeypatch):
+    monkeypatch.setattr(webhook_service, "JIRA_CLIENT_SECRET", "test-secret")
+    monkeypatch.setattr(webhook_sender, "JIRA_CLIENT_SECRET", "test-secret")
+
+
+def test_calendar_notification_expires_cached_events(client, mongo):
+    mongo.database["calendar_channels"].insert_one(dict(CHANNEL))
+    asyncio.run(cache.put(google_service._events_key("u1"), {"events": []}, ttl=3600, keep=3600))
+
+    response = webhook_sender.send_calendar_notification(CHANNEL, client=client)
+
+    assert response.status_code == 200
+    entry = asyncio.run(cache.get_entry(google_service._events_key("u1")))
+    assert entry.value == {"events": []} and not entry.fresh
+
+
+def test_calendar_sync_message_keeps_cache(client, mongo):
+    mongo.database["calendar_channels"].insert_one(dict(CHANNEL))
+    asyncio.run(cache.put(google_service._events_key("u1"), {"events": []}, ttl=3600))
+
+    response = webhook_sender.send_calendar_notification(CHANNEL, state="sync", client=client)
+
+    assert response.status_code == 200
+    assert asyncio.run(cache.get_entry(google_service._events_key("u1"))).fresh
+
+
+def test_calendar_notification_with_wrong_token_is_rejected(client, mongo):
+    mongo.database["calendar_channels"].insert_one(dict(CHANNEL))
+
+    response = webhook_sender.send_calendar_notification({**CHANNEL, "token": "guess"}, client=client)
+
+    assert response.status_code == 404
+
+
+def test_jira_event_updates_stored_issue(client, mongo, jira_secret):
+    mongo.database["jira_webhooks"].insert_one({"user_id": "u1", "webhook_ids": [1000], "account_id": "acc-1"})
+    issue = webhook_sender.make_issue("ABC-1", "Fix login", priority="Highest", status="In Progress", assignee="acc-1")
+
+    response = webhook_sender.send_jira_event([1000], issue, client=client)
+
+    assert response.json() == {"status": "ok", "users_updated": 1}
+    stored = mongo.database["jira_issues"].find_one({"user_id": "u1", "key": "ABC-1"})
+    assert stored["state"] == "in_progress"
+    assert stored["priority_level"] == "high"
+
+
+def test_jira_event_with_bad_signature_is_rejected(client, mongo, jira_secret, monkeypatch):
+    mongo.database["jira_webhooks"].insert_one({"user_id": "u1", "webhook_ids": [1000]})
+    monkeypatch.setattr(webhook_sender, "JIRA_CLIENT_SECRET", "not-the-app-secret")
+
+    response = webhook_sender.send_jira_event([1000], webhook_sender.make_issue("ABC-1"), client=client)
+
+    assert response.status_code == 401
+    assert mongo.database["jira_issues"].count_documents({}) == 0
+
+
+def test_reassigned_jira_issue_leaves_previous_assignees_store(client, mongo, jira_secret):
+    mongo.database["jira_webhooks"].insert_one({"user_id": "u1", "webhook_ids": [1000], "account_id": "acc-1"})
+    webhook_sender.send_jira_event([1000], webhook_sender.make_issue("ABC-1", assignee="acc-1"), client=client)
+
+    reassigned = webhook_sender.make_issue("ABC-1", assignee="acc-2")
+    response = webhook_sender.send_jira_event([1000], reassigned, client=client)
+
+    assert response.status_code == 200
+    assert mongo.database["jira_issues"].count_documents({"user_id": "u1"}) == 0
+
+
+def test_calendar_sync_can_arrive_before_watch_returns(client, mongo, monkeypatch):
+    seen = {}
+
+    async def google_request(user_id, method, url, params=None, json=None):
+        # Google sends "sync" to the new channel before answering events.watch
+        stored = mongo.database["calendar_channels"].find_one({"channel_id": json["id"]})
+        channel = {"channel_id": json["id"], "token": json["token"], "resource_id": "res-9"}
+        seen["stored"] = stored is not None
+        seen["sync"] = webhook_sender.send_calendar_notification(channel, state="sync", client=client).status_code
+        return {"id": json["id"], "resourceId": "res-9", "expiration": str(int(time.time() + 3600) * 1000)}
+    monkeypatch.setattr(google_service, "_google_request", google_request)
+
+    channel = asyncio.run(google_service.start_calendar_watch("u1"))
+
+    assert seen == {"stored": True, "sync": 200}
+    stored = mongo.database["calendar_channels"].find_one({"channel_id": channel["channel_id"]})
+    assert stored["resource_id"] == "res-9"
+
+
+def test_failed_watch_leaves_no_channel(mongo, monkeypatch):
+    async def google_request(*args, **kwargs):
+        raise RuntimeError("watch refused")
+    monkeypatch.setattr(google_service, "_google_request", google_request)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(google_service.start_calendar_watch("u1"))
+
+    assert mongo.database["calendar_channels"].count_documents({}) == 0
@@ -0,0 +1,87 @@
+"""Each wellness component is recomputed on its own TTL; fresh ones are kept as stored."""
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+import app.services.wellness_service as wellness_service
+from app.utils.timezone_utils import today_utc
+
+TTLS = wellness_service.COMPONENT_TTLS
+
+
+@pytest.fixture
+def user_id(mongo):
+    return str(mongo.database["users"].insert_one({"email": "asha@example.com"}).inserted_id)
+
+
+@pytest.fixture
+def calculators(monkeypatch):
+    """Replace the three calculators; record which ones ran."""
+    ran = []
+
+    def calculator(name):
+        async def calculate(*args):
+            ran.append(name)
+            return {"score": 90.0}
+        return calculate
+    monkeypatch.setattr(wellness_service, "calculate_fitness_score", calculator("fitness"))
+    monkeypatch.setattr(wellness_service, "calculate_jira_score", calculator("jira"))
+    monkeypatch.setattr(wellness_service, "calculate_calendar_score", calculator("calendar"))
+    return ran
+
+
+def ago(delta: timedelta) -> str:
+    return (datetime.utcnow() - delta).isoformat()
+
+
+def stored_day(mongo, user_id: str, **fields):
+    mongo.database["wellness_scores"].insert_one({
+        "user_id": user_id, "date": today_utc(),
+        **{name: {"score": 50.0} for name in TTLS},
+        "total_score": 50.0,
+        **fields,
+    })
+
+
+def compute(user_id: str) -> dict:
+    return asyncio.run(wellness_service.compute_and_store_daily_score(user_id))
+
+
+def test_only_expired_components_are_recomputed(mongo, user_id, calculators):
+    kept = ago(TTLS["jira"] - timedelta(minutes=1))
+    stored_day(mongo, user_id, component_updated={
+        "fitness": ago(TTLS["fitness"] + timedelta(minutes=1)),
+        "jira": kept,
+        "calendar": ago(timedelta(minutes=1)),
+    })
+
+    record = compute(user_id)
+
+    assert calculators == ["fitness"]
+    assert (record["fitness"]["score"], record["jira"]["score"]) == (90.0, 50.0)
+    assert record["component_updated"]["jira"] == kept
+    stored = mongo.database["wellness_scores"].find_one({"user_id": user_id})
+    assert stored["component_updated"]["fitness"] == record["last_updated"]
+
+
+def test_fresh_record_is_served_as_stored(mongo, user_id, calculators):
+    stored_day(mongo, user_id, component_updated={name: ago(timedelta(minutes=1)) for name in TTLS})
+
+    assert compute(user_id)["total_score"] == 50.0
+    assert calculators == []
+
+
+def test_legacy_record_ages_from_last_updated(mongo, user_id, calculators):
+    # Older than the Jira TTL but within the calendar TTL
+    legacy = ago(TTLS["jira"] + timedelta(minutes=1))
+    stored_day(mongo, user_id, last_updated=legacy)
+
+    record = compute(user_id)
+
+    assert sorted(calculators) == ["fitness", "jira"]
+    assert record["component_updated"]["calendar"] == legacy
+
+
+def test_missing_record_computes_everything(mongo, user_id, calculators):
+    compute(user_id)
+
+    assert sorted(calculators) == sorted(TTLS)
@@ -0,0 +1,30 @@
+"""Wellness scoring keys "today" on the UTC date, like the calendar index and dashboard."""
+import asyncio
+import time
+from datetime import datetime
+import pytest
+import app.services.wellness_service as wellness_service
+from app.services.calendar_index import empty_day
+
+
+@pytest.fixture
+def far_east_host(monkeypatch):
+    # UTC+14: the host's local date is ahead of UTC for most of the day
+    monkeypatch.setenv("TZ", "Etc/GMT-14")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_calendar_score_reads_the_utc_day(far_east_host, monkeypatch):
+    requested = []
+
+    async def get_calendar_day(user_id, day=None):
+        requested.append(day)
+        return empty_day(day)
+    monkeypatch.setattr(wellness_service, "get_calendar_day", get_calendar_day)
+
+    asyncio.run(wellness_service.calculate_calendar_score("u1"))
+
+    assert requested == [datetime.utcnow().date().isoformat()]
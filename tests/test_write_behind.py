@@ -0,0 +1,54 @@
+"""Buffered writes stay visible through `overlay` until Mongo has them."""
+import asyncio
+from app.services.write_behind import WriteBuffer
+
+KEY = {"employee_id": "E1", "date": "2026-01-05"}
+
+
+class SlowCollection:
+    """bulk_write blocks until released, then succeeds or fails."""
+
+    name = "attendance"
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.written = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.started.set()
+        await self.release.wait()
+        if self.fail:
+            raise ConnectionError("mongo unreachable")
+        self.written += operations
+
+
+def run(collection):
+    async def scenario():
+        buffer = WriteBuffer("attendance", collection, ("employee_id", "date"), enabled=True)
+        await buffer.upsert(KEY, {"checkin_time": "09:00", "mood": 4})
+        flush = asyncio.create_task(buffer.flush())
+        await collection.started.wait()
+        during = buffer.overlay(KEY, None)
+        collection.release.set()
+        await asyncio.gather(flush, return_exceptions=True)
+        return buffer, during, buffer.overlay(KEY, None)
+    return asyncio.run(scenario())
+
+
+def test_overlay_sees_write_while_flush_is_in_flight():
+    collection = SlowCollection()
+
+    buffer, during, after = run(collection)
+
+    assert during == {**KEY, "checkin_time": "09:00", "mood": 4}
+    assert len(collection.written) == 1
+    assert after is None and len(buffer) == 0
+
+
+def test_failed_flush_is_requeued_and_still_visible():
+    buffer, during, after = run(SlowCollection(fail=True))
+
+    assert during == after == {**KEY, "checkin_time": "09:00", "mood": 4}
+    assert len(buffer) == 1